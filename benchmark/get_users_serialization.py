@@ -0,0 +1,155 @@
+"""Benchmark the per-row serialization cost of `GET /v1/user-management/users`.
+
+The fast path used by the router is compared against the validating path it replaced (validated
+domain and API models, response model validation and `jsonable_encoder`). Both are served by the
+same in-process ASGI app and start from the same `UserDBModel` rows, so the database is left out.
+
+Run from the repository root:
+
+    PYTHONPATH=src python benchmark/get_users_serialization.py --rows 1000
+"""
+import asyncio
+import time
+from collections.abc import AsyncIterator
+from typing import Annotated, Any
+from unittest.mock import AsyncMock
+
+import typer
+from fastapi import APIRouter, FastAPI
+
+from python_webapp.apps.user_management.api import dependencies
+from python_webapp.apps.user_management.api.api_models import (
+    GetUsersResponse,
+    UserAPIModel,
+    UserProfileAPIModel,
+)
+from python_webapp.apps.user_management.api.router import router
+from python_webapp.apps.user_management.domain import Profile, User
+from python_webapp.apps.user_management.repositories.db_models import UserDBModel
+from python_webapp.apps.user_management.repositories.user_repository import UserRepository
+from python_webapp.apps.user_management.services import UserManagementServices
+
+
+class BenchmarkContainer:
+    def __init__(self, user_management_services: UserManagementServices) -> None:
+        self._user_management_services = user_management_services
+
+    def user_management_services(self) -> UserManagementServices:
+        return self._user_management_services
+
+
+async def no_unit_of_work() -> AsyncIterator[None]:
+    """Stand in for the unit of work dependency, there is no database to open a session on."""
+    yield
+
+
+def create_app(rows: list[UserDBModel]) -> FastAPI:
+    async def get_users(offset: int, limit: int, **_: object) -> list[User]:
+        return [row.to_domain() for row in rows[offset : offset + limit]]
+
+    user_repository = AsyncMock(UserRepository)
+    user_repository.get_users = get_users
+
+    validating_router = APIRouter()
+
+    @validating_router.get("/validating/users")
+    async def get_users_validating() -> GetUsersResponse:
+        users = [
+            User(
+                id=str(row.id),
+                email=row.email,
+                profile=Profile(firstname=row.firstname, lastname=row.lastname),
+            )
+            for row in rows
+        ]
+        return GetUsersResponse(
+            users=[
+                UserAPIModel(
+                    id=user.id,
+                    email=user.email,
+                    profile=UserProfileAPIModel(
+                        firstname=user.profile.firstname,
+                        lastname=user.profile.lastname,
+                    ),
+                )
+                for user in users
+            ],
+        )
+
+    app = FastAPI()
+    app.include_router(router)
+    app.include_router(validating_router)
+    app.dependency_overrides[dependencies.read_only_unit_of_work] = no_unit_of_work
+    app.state.root_container = BenchmarkContainer(
+        UserManagementServices(
+            user_repository=user_repository,
+            page_size=len(rows),
+            max_page_size=len(rows),
+        ),
+    )
+    return app
+
+
+async def request(app: FastAPI, path: str) -> bytes:
+    """Send a GET request to the ASGI app and return the response body."""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [],
+        "client": ("127.0.0.1", 0),
+        "server": ("127.0.0.1", 80),
+    }
+    body = bytearray()
+
+    async def receive() -> dict[str, Any]:
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: dict[str, Any]) -> None:
+        if message["type"] == "http.response.body":
+            body.extend(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return bytes(body)
+
+
+async def measure(app: FastAPI, path: str, requests: int) -> float:
+    """Return mean seconds per request."""
+    await request(app, path)  # Warm up.
+
+    started_at = time.perf_counter()
+    for _ in range(requests):
+        await request(app, path)
+
+    return (time.perf_counter() - started_at) / requests
+
+
+def main(
+    rows: Annotated[int, typer.Option(help="Number of users in each response.")] = 1000,
+    requests: Annotated[int, typer.Option(help="Number of requests per path.")] = 50,
+) -> None:
+    db_rows = [
+        UserDBModel(id=i, email=f"user{i}@example.com", firstname="first", lastname="last")
+        for i in range(1, rows + 1)
+    ]
+    app = create_app(db_rows)
+
+    for name, path in (
+        ("validating", "/validating/users"),
+        ("fast", "/v1/user-management/users"),
+    ):
+        seconds = asyncio.run(measure(app=app, path=path, requests=requests))
+        typer.echo(
+            f"{name:>10}: {seconds * 1000:8.2f} ms/request, "
+            f"{seconds / rows * 1_000_000:6.2f} us/row ({rows} rows)",
+        )
+
+
+if __name__ == "__main__":
+    typer.run(main)
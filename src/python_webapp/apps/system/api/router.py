@@ -8,6 +8,7 @@ from python_webapp.apps.system.api.api_models import (
     GetSystemInfoResponse,
 )
 from python_webapp.apps.system.services import SystemServices
+from python_webapp.core.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE
 
 router = APIRouter(
     prefix="/api/v1/system",
@@ -38,3 +39,11 @@ async def get_health_reports(
         response.status_code = status.HTTP_409_CONFLICT
 
     return GetHealthReportsResponse(health_reports=health_reports)
+
+
+@router.get("/metrics", status_code=status.HTTP_200_OK, response_class=Response)
+async def get_metrics(
+    system_services: Annotated[SystemServices, Depends(dependencies.system_services)],
+) -> Response:
+    metrics = await system_services.get_metrics()
+    return Response(content=metrics, media_type=METRICS_CONTENT_TYPE)
@@ -1,6 +1,13 @@
+import asyncio
+import logging
+import time
+
 from python_webapp.apps.system.domain import SystemInfo
 from python_webapp.config import Config
 from python_webapp.core.health import HealthReport, HealthReportable
+from python_webapp.core.metrics import MetricsRegistry
+
+logger = logging.getLogger(__name__)
 
 
 class SystemServices:
@@ -8,9 +15,13 @@ class SystemServices:
         self,
         config: Config,
         health_reportables: list[HealthReportable],
+        health_report_timeout: float = 2.0,
+        metrics_registry: MetricsRegistry | None = None,
     ) -> None:
         self.config = config
         self.health_reportables = health_reportables
+        self.health_report_timeout = health_report_timeout
+        self.metrics_registry = metrics_registry or MetricsRegistry()
 
     async def get_system_info(self) -> SystemInfo:
         """Get general system information."""
@@ -20,10 +31,42 @@ class SystemServices:
         )
 
     async def get_health_reports(self) -> list[HealthReport]:
-        """Get list of health reports gathered from different components of the system."""
-        health_reports = []
-        for health_reportable in self.health_reportables:
-            health_report = await health_reportable.get_health_report()
-            health_reports.append(health_report)
+        """Get list of health reports gathered from different components of the system.
+
+        Components are checked concurrently, a component which doesn't report in time or fails
+        while reporting is reported as unhealthy.
+        """
+        health_reports = await asyncio.gather(
+            *(
+                self._get_health_report(health_reportable)
+                for health_reportable in self.health_reportables
+            ),
+        )
+
+        return list(health_reports)
+
+    async def get_metrics(self) -> str:
+        """Get metrics in Prometheus text format, aggregated across worker processes."""
+        return self.metrics_registry.render()
+
+    async def _get_health_report(self, health_reportable: HealthReportable) -> HealthReport:
+        started_at = time.perf_counter()
+        try:
+            async with asyncio.timeout(self.health_report_timeout):
+                health_report = await health_reportable.get_health_report()
+        except TimeoutError:
+            health_report = HealthReport(
+                component=health_reportable.component,
+                is_healthy=False,
+                details={"error": "timed out"},
+            )
+        except Exception:
+            logger.exception("Getting health report of `%s` failed", health_reportable.component)
+            health_report = HealthReport(
+                component=health_reportable.component,
+                is_healthy=False,
+                details={"error": "failed"},
+            )
 
-        return health_reports
+        latency_ms = (time.perf_counter() - started_at) * 1000
+        return health_report.model_copy(update={"latency_ms": latency_ms})
@@ -1,14 +1,22 @@
 from __future__ import annotations
 
+from datetime import datetime
+
 from pydantic import (
     BaseModel,
     EmailStr,
+    Field,
 )
 
 from python_webapp.apps.user_management.domain import (
     Profile,
     User,
+    UserImportRowResult,
+    UserImportSummary,
+    UserStatistics,
+    UserStatisticsMode,
 )
+from python_webapp.core.api.api_models import MessageResponse
 
 # region common
 
@@ -21,7 +29,8 @@ class UserProfileAPIModel(BaseModel):
 
     @staticmethod
     def from_domain(profile: Profile) -> UserProfileAPIModel:
-        return UserProfileAPIModel(
+        # Domain objects are already valid, so there is no need to validate them again.
+        return UserProfileAPIModel.model_construct(
             firstname=profile.firstname,
             lastname=profile.lastname,
         )
@@ -36,7 +45,7 @@ class UserAPIModel(BaseModel):
 
     @staticmethod
     def from_domain(user: User) -> UserAPIModel:
-        return UserAPIModel(
+        return UserAPIModel.model_construct(
             id=user.id,
             email=user.email,
             profile=UserProfileAPIModel.from_domain(profile=user.profile),
@@ -55,6 +64,37 @@ class CreateUserBody(BaseModel):
     profile: UserProfileAPIModel
 
 
+class CreateUserResponse(MessageResponse):
+    """Create user response model."""
+
+    user_id: str
+
+
+# endregion
+
+# region import_users
+
+
+class ImportUsersResponse(BaseModel):
+    """Import users response model."""
+
+    created: int
+    duplicates: int
+    failed: int
+    rows: list[UserImportRowResult]
+    truncated: bool
+
+    @staticmethod
+    def from_domain(summary: UserImportSummary) -> ImportUsersResponse:
+        return ImportUsersResponse(
+            created=summary.created,
+            duplicates=summary.duplicates,
+            failed=summary.failed,
+            rows=summary.rows,
+            truncated=summary.truncated,
+        )
+
+
 # endregion
 
 # region get_users
@@ -64,6 +104,58 @@ class GetUsersResponse(BaseModel):
     """Get users response model."""
 
     users: list[UserAPIModel]
+    next_cursor: str | None = None
+
+
+# endregion
+
+# region lookup_users
+
+
+class LookupUsersBody(BaseModel):
+    """Lookup users body model."""
+
+    ids: list[str] = Field(min_length=1)
+
+
+class LookupUsersResponse(BaseModel):
+    """Lookup users response model, users are in the order of the looked up IDs."""
+
+    users: list[UserAPIModel]
+    missing_ids: list[str]
+
+
+# endregion
+
+# region get_user_statistics
+
+
+class GetUserStatisticsResponse(BaseModel):
+    """Get user statistics response model.
+
+    `synced_at` is when the numbers were read from the database and `age_seconds` how long ago
+    that was, both are `None` if it's unknown.
+    """
+
+    mode: UserStatisticsMode
+    total: int
+    by_email_domain: dict[str, int]
+    synced_at: datetime | None
+    age_seconds: float | None
+
+    @staticmethod
+    def from_domain(statistics: UserStatistics, now: datetime) -> GetUserStatisticsResponse:
+        age_seconds = None
+        if statistics.synced_at is not None:
+            age_seconds = max((now - statistics.synced_at).total_seconds(), 0.0)
+
+        return GetUserStatisticsResponse.model_construct(
+            mode=statistics.mode,
+            total=statistics.total,
+            by_email_domain=statistics.by_email_domain,
+            synced_at=statistics.synced_at,
+            age_seconds=age_seconds,
+        )
 
 
 # endregion
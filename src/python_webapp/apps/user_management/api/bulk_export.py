@@ -0,0 +1,77 @@
+"""Incremental formatters for bulk user export bodies.
+
+Users are formatted one by one and written out in bounded chunks, so memory use doesn't depend on
+the number of exported users.
+"""
+import csv
+import io
+from collections.abc import AsyncIterable, AsyncIterator
+from enum import StrEnum
+from typing import Final
+
+from python_webapp.apps.user_management.api.api_models import UserAPIModel
+from python_webapp.apps.user_management.domain import User
+
+CHUNK_SIZE: Final[int] = 64 * 1024
+CSV_HEADER: Final[tuple[str, ...]] = ("id", "email", "firstname", "lastname")
+
+
+class ExportFormat(StrEnum):
+    """Format of the exported users."""
+
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+    @property
+    def media_type(self) -> str:
+        return "application/x-ndjson" if self is ExportFormat.NDJSON else "text/csv"
+
+
+def format_users(
+    users: AsyncIterable[User],
+    export_format: ExportFormat,
+    chunk_size: int = CHUNK_SIZE,
+) -> AsyncIterator[bytes]:
+    """Format users in the given format, yielding chunks of about `chunk_size` bytes."""
+    lines = format_ndjson(users) if export_format is ExportFormat.NDJSON else format_csv(users)
+    return _buffer(lines, chunk_size=chunk_size)
+
+
+async def format_ndjson(users: AsyncIterable[User]) -> AsyncIterator[bytes]:
+    """Format users as newline delimited JSON, each line having the shape of the user API model."""
+    serializer = UserAPIModel.__pydantic_serializer__
+    async for user in users:
+        yield serializer.to_json(UserAPIModel.from_domain(user)) + b"\n"
+
+
+async def format_csv(users: AsyncIterable[User]) -> AsyncIterator[bytes]:
+    """Format users as CSV with a header line, in the same shape the CSV import accepts."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+
+    writer.writerow(CSV_HEADER)
+    yield _drain(buffer)
+
+    async for user in users:
+        writer.writerow((user.id, user.email, user.profile.firstname, user.profile.lastname))
+        yield _drain(buffer)
+
+
+async def _buffer(lines: AsyncIterable[bytes], chunk_size: int) -> AsyncIterator[bytes]:
+    # Writing every line separately would mean a send per user, so lines are grouped first.
+    chunk = bytearray()
+    async for line in lines:
+        chunk += line
+        if len(chunk) >= chunk_size:
+            yield bytes(chunk)
+            chunk.clear()
+
+    if chunk:
+        yield bytes(chunk)
+
+
+def _drain(buffer: io.StringIO) -> bytes:
+    value = buffer.getvalue().encode()
+    buffer.seek(0)
+    buffer.truncate()
+    return value
@@ -0,0 +1,165 @@
+"""Incremental parsers for bulk user import bodies.
+
+Bodies are consumed chunk by chunk and only a single line is held in memory at a time.
+"""
+import csv
+from collections.abc import AsyncIterable, AsyncIterator
+from typing import Final
+
+from pydantic import ValidationError
+
+from python_webapp.apps.user_management.api.api_models import CreateUserBody
+from python_webapp.apps.user_management.domain import NewUser, Profile, UserImportRecord
+from python_webapp.apps.user_management.errors import InvalidImportError
+
+MAX_LINE_LENGTH: Final[int] = 64 * 1024
+CSV_COLUMNS: Final[frozenset[str]] = frozenset({"email", "firstname", "lastname"})
+
+
+async def iter_lines(
+    chunks: AsyncIterable[bytes],
+    max_line_length: int = MAX_LINE_LENGTH,
+) -> AsyncIterator[bytes | None]:
+    """Split a byte stream into lines.
+
+    Lines longer than `max_line_length` are dropped and `None` is yielded in their place, so the
+    line count stays correct.
+    """
+    buffer = b""
+    is_overflowed = False
+
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+
+        for line in lines:
+            if is_overflowed or len(line) > max_line_length:
+                is_overflowed = False
+                yield None
+            else:
+                yield line.removesuffix(b"\r")
+
+        if len(buffer) > max_line_length:
+            is_overflowed = True
+            buffer = b""
+
+    if is_overflowed:
+        yield None
+    elif buffer:
+        yield buffer.removesuffix(b"\r")
+
+
+async def parse_ndjson(chunks: AsyncIterable[bytes]) -> AsyncIterator[UserImportRecord]:
+    """Parse newline delimited JSON, each line having the same shape as the create user body."""
+    row = 0
+    async for line in iter_lines(chunks):
+        row += 1
+        if line is None:
+            yield UserImportRecord(row=row, error="Line is too long.")
+            continue
+
+        if not line.strip():
+            continue
+
+        try:
+            body = CreateUserBody.model_validate_json(line)
+        except ValidationError as e:
+            yield UserImportRecord(row=row, error=_format_validation_error(e))
+            continue
+
+        yield _to_record(row=row, body=body)
+
+
+async def parse_csv(chunks: AsyncIterable[bytes]) -> AsyncIterator[UserImportRecord]:
+    """Parse CSV with a header line, having `email` and optionally `firstname` and `lastname`.
+
+    Quoted values can't contain line breaks.
+    """
+    header: list[str] | None = None
+
+    row = 0
+    async for line in iter_lines(chunks):
+        row += 1
+        if line is not None and not line.strip():
+            continue
+
+        values, error = _read_csv_line(line)
+        if header is None:
+            if error is not None:
+                raise InvalidImportError(f"CSV header is invalid: {error}")
+
+            header = _parse_csv_header(values)
+            continue
+
+        if error is not None:
+            yield UserImportRecord(row=row, error=error)
+            continue
+
+        yield _parse_csv_values(row=row, header=header, values=values)
+
+
+def _read_csv_line(line: bytes | None) -> tuple[list[str], str | None]:
+    if line is None:
+        return [], "Line is too long."
+
+    try:
+        return next(csv.reader([line.decode()])), None
+    except (UnicodeDecodeError, csv.Error) as e:
+        return [], f"Line is malformed: {e}"
+
+
+def _parse_csv_header(values: list[str]) -> list[str]:
+    header = [column.strip().lower() for column in values]
+    if "email" not in header or not CSV_COLUMNS.issuperset(header):
+        raise InvalidImportError(
+            f"CSV header must have `email` and may have `firstname` and `lastname`, "
+            f"got `{','.join(header)}`!",
+        )
+
+    return header
+
+
+def _parse_csv_values(row: int, header: list[str], values: list[str]) -> UserImportRecord:
+    if len(values) != len(header):
+        return UserImportRecord(
+            row=row,
+            error=f"Expected {len(header)} values, got {len(values)}.",
+        )
+
+    fields = dict(zip(header, values, strict=True))
+    try:
+        body = CreateUserBody.model_validate(
+            {
+                "email": fields["email"],
+                "profile": {
+                    "firstname": fields.get("firstname", ""),
+                    "lastname": fields.get("lastname", ""),
+                },
+            },
+        )
+    except ValidationError as e:
+        return UserImportRecord(row=row, error=_format_validation_error(e))
+
+    return _to_record(row=row, body=body)
+
+
+def _to_record(row: int, body: CreateUserBody) -> UserImportRecord:
+    return UserImportRecord(
+        row=row,
+        user=NewUser(
+            email=body.email,
+            profile=Profile(
+                firstname=body.profile.firstname,
+                lastname=body.profile.lastname,
+            ),
+        ),
+    )
+
+
+def _format_validation_error(error: ValidationError) -> str:
+    messages = []
+    for detail in error.errors():
+        location = ".".join(str(part) for part in detail["loc"])
+        messages.append(f"{location}: {detail['msg']}" if location else detail["msg"])
+
+    return "; ".join(messages)
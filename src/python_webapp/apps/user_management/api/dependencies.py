@@ -1,7 +1,64 @@
+import time
+from collections.abc import AsyncIterator
+from math import ceil
+from typing import Final
+
 from fastapi.requests import Request
+from fastapi.responses import Response
 
 from python_webapp.apps.user_management.services import UserManagementServices
+from python_webapp.core.api.routing import call_before_response
+
+USE_PRIMARY_UNTIL_COOKIE: Final[str] = "db_use_primary_until"
 
 
 async def user_management_services(request: Request) -> UserManagementServices:
     return request.app.state.root_container.user_management_services()
+
+
+async def unit_of_work(request: Request, response: Response) -> AsyncIterator[None]:
+    """Run all database calls of the request in a single transaction.
+
+    The transaction is committed before the response is sent (code after `yield` only runs once
+    it's sent), so a failing commit is answered with an error instead of a success.
+
+    If read your writes is enabled, reads of the client are sent to the primary database for a
+    while, so they see this request's writes even if replicas lag behind.
+    """
+    root_container = request.app.state.root_container
+    read_your_writes_window = root_container.config().postgres_read_your_writes_window
+    if read_your_writes_window > 0:
+        # Set before the request is handled, code after `yield` runs after the response is sent.
+        response.set_cookie(
+            key=USE_PRIMARY_UNTIL_COOKIE,
+            value=str(time.time() + read_your_writes_window),
+            max_age=ceil(read_your_writes_window),
+            httponly=True,
+        )
+
+    sqlalchemy_manager = root_container.sqlalchemy_manager()
+    async with sqlalchemy_manager.unit_of_work():
+        call_before_response(request, sqlalchemy_manager.commit_unit_of_work)
+        yield
+
+
+async def read_only_unit_of_work(request: Request) -> AsyncIterator[None]:
+    """Run all database calls of the request in a single read only transaction.
+
+    It runs on a replica, unless the client has recently written and should read its writes.
+    """
+    sqlalchemy_manager = request.app.state.root_container.sqlalchemy_manager()
+    async with sqlalchemy_manager.unit_of_work(
+        read_only=True,
+        use_primary=_should_use_primary(request),
+    ):
+        yield
+
+
+def _should_use_primary(request: Request) -> bool:
+    try:
+        use_primary_until = float(request.cookies.get(USE_PRIMARY_UNTIL_COOKIE, 0))
+    except ValueError:
+        return False
+
+    return use_primary_until > time.time()
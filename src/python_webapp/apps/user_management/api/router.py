@@ -1,74 +1,298 @@
+from datetime import UTC, datetime
 from typing import Annotated
 
 from fastapi import (
     APIRouter,
     Body,
     Depends,
+    Header,
     Query,
+    Request,
     status,
 )
+from fastapi.responses import Response, StreamingResponse
 
-from python_webapp.apps.user_management.api import dependencies
+from python_webapp.apps.user_management.api import bulk_export, bulk_import, dependencies
 from python_webapp.apps.user_management.api.api_models import (
     CreateUserBody,
+    CreateUserResponse,
     GetUserByIDResponse,
     GetUsersResponse,
+    GetUserStatisticsResponse,
+    ImportUsersResponse,
+    LookupUsersBody,
+    LookupUsersResponse,
     UpdateUserByIDBody,
     UserAPIModel,
 )
+from python_webapp.apps.user_management.domain import (
+    UserFilter,
+    UserSortOrder,
+    UserStatisticsMode,
+)
+from python_webapp.apps.user_management.errors import UnsupportedImportFormatError
 from python_webapp.apps.user_management.services import UserManagementServices
+from python_webapp.core.api import etags
 from python_webapp.core.api.api_models import MessageResponse
+from python_webapp.core.api.responses import ModelResponse
+from python_webapp.core.api.routing import BeforeResponseRoute
 
 router = APIRouter(
     prefix="/v1/user-management",
     tags=["user_management"],
+    route_class=BeforeResponseRoute,
 )
 
 
-@router.post("/users", status_code=status.HTTP_201_CREATED)
+@router.post(
+    "/users",
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(dependencies.unit_of_work)],
+)
 async def create_user(
     user_management_services: Annotated[
         UserManagementServices,
         Depends(dependencies.user_management_services),
     ],
     body: Annotated[CreateUserBody, Body()],
-) -> MessageResponse:
-    await user_management_services.create_user(
+) -> CreateUserResponse:
+    user_id = await user_management_services.create_user(
         email=body.email,
         firstname=body.profile.firstname,
         lastname=body.profile.lastname,
     )
 
-    return MessageResponse(message="ok")
+    return CreateUserResponse(message="ok", user_id=user_id)
+
+
+@router.post(
+    "/users/import",
+    status_code=status.HTTP_200_OK,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/x-ndjson": {"schema": {"type": "string"}},
+                "text/csv": {"schema": {"type": "string"}},
+            },
+        },
+    },
+)
+async def import_users(
+    user_management_services: Annotated[
+        UserManagementServices,
+        Depends(dependencies.user_management_services),
+    ],
+    request: Request,
+) -> ImportUsersResponse:
+    """Import users from a streamed NDJSON (`application/x-ndjson`) or CSV (`text/csv`) body."""
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    if content_type in ("application/x-ndjson", "application/jsonl"):
+        records = bulk_import.parse_ndjson(request.stream())
+    elif content_type == "text/csv":
+        records = bulk_import.parse_csv(request.stream())
+    else:
+        raise UnsupportedImportFormatError(
+            f"Content type `{content_type}` is not supported, use NDJSON or CSV!",
+        )
+
+    summary = await user_management_services.import_users(records=records)
+
+    return ImportUsersResponse.from_domain(summary)
+
+
+@router.get(
+    "/users/export",
+    status_code=status.HTTP_200_OK,
+    dependencies=[Depends(dependencies.read_only_unit_of_work)],
+    response_class=StreamingResponse,
+    responses={
+        status.HTTP_200_OK: {
+            "content": {
+                "application/x-ndjson": {"schema": {"type": "string"}},
+                "text/csv": {"schema": {"type": "string"}},
+            },
+        },
+    },
+)
+async def export_users(
+    user_management_services: Annotated[
+        UserManagementServices,
+        Depends(dependencies.user_management_services),
+    ],
+    export_format: Annotated[
+        bulk_export.ExportFormat,
+        Query(alias="format"),
+    ] = bulk_export.ExportFormat.NDJSON,
+) -> StreamingResponse:
+    """Export all users as a streamed NDJSON or CSV body.
+
+    When the client disconnects, the stream is cancelled and the database query is closed with it.
+    """
+    users = user_management_services.export_users()
+
+    return StreamingResponse(
+        bulk_export.format_users(users, export_format=export_format),
+        media_type=export_format.media_type,
+        headers={"Content-Disposition": f'attachment; filename="users.{export_format}"'},
+    )
 
 
-@router.get("/users", status_code=status.HTTP_200_OK)
+@router.get(
+    "/users",
+    status_code=status.HTTP_200_OK,
+    response_model=GetUsersResponse,
+    dependencies=[Depends(dependencies.read_only_unit_of_work)],
+)
 async def get_users(
     user_management_services: Annotated[
         UserManagementServices,
         Depends(dependencies.user_management_services),
     ],
     page: Annotated[int, Query(ge=1)] = 1,
-) -> GetUsersResponse:
-    users = await user_management_services.get_users(page=page)
+    cursor: Annotated[str | None, Query()] = None,
+    page_size: Annotated[int | None, Query(ge=1)] = None,
+    sort: Annotated[UserSortOrder, Query()] = UserSortOrder.ID_ASC,
+    email: Annotated[str | None, Query(min_length=1)] = None,
+    email_prefix: Annotated[str | None, Query(min_length=1)] = None,
+    firstname: Annotated[str | None, Query(min_length=1)] = None,
+    lastname: Annotated[str | None, Query(min_length=1)] = None,
+    if_none_match: Annotated[str | None, Header()] = None,
+) -> Response:
+    """Get a page of users, optionally filtered.
+
+    Emails are matched case-insensitively (exactly or by prefix), names by case-insensitive
+    substring.
 
-    return GetUsersResponse(users=[UserAPIModel.from_domain(user) for user in users])
+    Responses have an ETag, if it's sent back in `If-None-Match` and the page hasn't changed, 304 is
+    returned after only reading IDs and versions of the page's users.
+    """
+    user_filter = None
+    if any(value is not None for value in (email, email_prefix, firstname, lastname)):
+        user_filter = UserFilter(
+            email=email,
+            email_prefix=email_prefix,
+            firstname=firstname,
+            lastname=lastname,
+        )
 
+    if if_none_match is not None:
+        version = await user_management_services.get_users_page_version(
+            page=page,
+            cursor=cursor,
+            page_size=page_size,
+            sort_order=sort,
+            user_filter=user_filter,
+        )
+        etag = etags.make_etag(version)
+        if etags.is_not_modified(if_none_match, etag):
+            return etags.not_modified_response(etag)
 
-@router.get("/users/{user_id:str}", status_code=status.HTTP_200_OK)
+    users_page = await user_management_services.get_users(
+        page=page,
+        cursor=cursor,
+        page_size=page_size,
+        sort_order=sort,
+        user_filter=user_filter,
+    )
+
+    return ModelResponse(
+        GetUsersResponse.model_construct(
+            users=[UserAPIModel.from_domain(user) for user in users_page.users],
+            next_cursor=users_page.next_cursor,
+        ),
+        headers={"ETag": etags.make_etag(users_page.version)},
+    )
+
+
+@router.post(
+    "/users/lookup",
+    status_code=status.HTTP_200_OK,
+    response_model=LookupUsersResponse,
+    dependencies=[Depends(dependencies.read_only_unit_of_work)],
+)
+async def lookup_users(
+    user_management_services: Annotated[
+        UserManagementServices,
+        Depends(dependencies.user_management_services),
+    ],
+    body: Annotated[LookupUsersBody, Body()],
+) -> Response:
+    """Get many users by ID with a single database query, instead of one request per user.
+
+    Users are returned in the order of `ids`, IDs of users which don't exist in `missing_ids`.
+    """
+    users, missing_ids = await user_management_services.get_users_by_ids(user_ids=body.ids)
+
+    return ModelResponse(
+        LookupUsersResponse.model_construct(
+            users=[UserAPIModel.from_domain(user) for user in users],
+            missing_ids=missing_ids,
+        ),
+    )
+
+
+@router.get(
+    "/users/statistics",
+    status_code=status.HTTP_200_OK,
+    dependencies=[Depends(dependencies.read_only_unit_of_work)],
+)
+async def get_user_statistics(
+    user_management_services: Annotated[
+        UserManagementServices,
+        Depends(dependencies.user_management_services),
+    ],
+    mode: Annotated[UserStatisticsMode, Query()] = UserStatisticsMode.MAINTAINED,
+) -> GetUserStatisticsResponse:
+    """Get the total number of users and their numbers by email domain, without counting them.
+
+    In `maintained` mode numbers are kept by the application and re-synced with the database
+    periodically. In `approximate` mode only the total is returned, as estimated by the database.
+    `synced_at` and `age_seconds` tell how fresh the numbers are.
+    """
+    statistics = await user_management_services.get_user_statistics(mode=mode)
+
+    return GetUserStatisticsResponse.from_domain(statistics, now=datetime.now(UTC))
+
+
+@router.get(
+    "/users/{user_id:str}",
+    status_code=status.HTTP_200_OK,
+    response_model=GetUserByIDResponse,
+    dependencies=[Depends(dependencies.read_only_unit_of_work)],
+)
 async def get_user_by_id(
     user_management_services: Annotated[
         UserManagementServices,
         Depends(dependencies.user_management_services),
     ],
     user_id: str,
-) -> GetUserByIDResponse:
+    if_none_match: Annotated[str | None, Header()] = None,
+) -> Response:
+    """Get a single user by ID.
+
+    Responses have an ETag, if it's sent back in `If-None-Match` and the user hasn't changed, 304 is
+    returned after only reading the user's version.
+    """
+    if if_none_match is not None:
+        version = await user_management_services.get_user_version_by_id(user_id=user_id)
+        etag = etags.make_etag(f"{user_id}.{version}")
+        if etags.is_not_modified(if_none_match, etag):
+            return etags.not_modified_response(etag)
+
     user = await user_management_services.get_user_by_id(user_id=user_id)
 
-    return GetUserByIDResponse(user=UserAPIModel.from_domain(user))
+    return ModelResponse(
+        GetUserByIDResponse.model_construct(user=UserAPIModel.from_domain(user)),
+        headers={"ETag": etags.make_etag(f"{user.id}.{user.version}")},
+    )
 
 
-@router.delete("/users/{user_id:str}", status_code=status.HTTP_200_OK)
+@router.delete(
+    "/users/{user_id:str}",
+    status_code=status.HTTP_200_OK,
+    dependencies=[Depends(dependencies.unit_of_work)],
+)
 async def delete_user_by_id(
     user_management_services: Annotated[
         UserManagementServices,
@@ -83,7 +307,11 @@ async def delete_user_by_id(
     return MessageResponse(message="ok")
 
 
-@router.patch("/users/{user_id:str}", status_code=status.HTTP_200_OK)
+@router.patch(
+    "/users/{user_id:str}",
+    status_code=status.HTTP_200_OK,
+    dependencies=[Depends(dependencies.unit_of_work)],
+)
 async def update_user_by_id(
     user_management_services: Annotated[
         UserManagementServices,
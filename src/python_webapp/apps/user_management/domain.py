@@ -1,3 +1,6 @@
+from datetime import datetime
+from enum import StrEnum
+
 from pydantic import BaseModel, ConfigDict, EmailStr
 
 
@@ -11,8 +14,126 @@ class Profile(BaseModel):
 
 
 class User(BaseModel):
-    """User entity."""
+    """User entity, `version` is bumped on every update."""
 
     id: str
     email: EmailStr
     profile: Profile
+    version: int = 1
+
+
+class UserSortOrder(StrEnum):
+    """Sort orders available for listing users.
+
+    Each order is backed by an index (primary key or unique email), so it can be used for keyset
+    pagination. A leading `-` means descending.
+    """
+
+    ID_ASC = "id"
+    ID_DESC = "-id"
+    EMAIL_ASC = "email"
+    EMAIL_DESC = "-email"
+
+    @property
+    def field(self) -> str:
+        return self.value.removeprefix("-")
+
+    @property
+    def is_descending(self) -> bool:
+        return self.value.startswith("-")
+
+
+class UserFilter(BaseModel):
+    """Filters for listing users, users have to match all given filters.
+
+    Emails are matched case-insensitively, names by case-insensitive substring. Every filter is
+    backed by an index.
+    """
+
+    model_config = ConfigDict(frozen=True)
+
+    email: str | None = None
+    email_prefix: str | None = None
+    firstname: str | None = None
+    lastname: str | None = None
+
+
+class UsersPage(BaseModel):
+    """A page of users with the cursor pointing to the next page (if any).
+
+    `version` changes whenever users of the page, their versions or existence of a next page
+    change.
+    """
+
+    users: list[User]
+    next_cursor: str | None = None
+    version: str = ""
+
+
+class UserStatisticsMode(StrEnum):
+    """How user statistics are computed.
+
+    `maintained` counts are kept in memory, adjusted by writes and re-synced from the database
+    periodically. `approximate` total is the planner's row estimate of the users table, so it's
+    only as fresh as the last vacuum or analyze of the table.
+    """
+
+    MAINTAINED = "maintained"
+    APPROXIMATE = "approximate"
+
+
+class UserStatistics(BaseModel):
+    """User counts and when they were last read from the database.
+
+    Counts by email domain are only available in `maintained` mode. `synced_at` is `None` if it's
+    unknown when the numbers were computed.
+    """
+
+    mode: UserStatisticsMode
+    total: int
+    by_email_domain: dict[str, int] = {}
+    synced_at: datetime | None = None
+
+
+class NewUser(BaseModel):
+    """Data needed to create a user."""
+
+    email: EmailStr
+    profile: Profile
+
+
+class UserImportRecord(BaseModel):
+    """A single parsed record of a bulk import, holding either a new user or a parsing error."""
+
+    row: int
+    user: NewUser | None = None
+    error: str | None = None
+
+
+class UserImportStatus(StrEnum):
+    CREATED = "created"
+    DUPLICATE = "duplicate"
+    FAILED = "failed"
+
+
+class UserImportRowResult(BaseModel):
+    """Result of importing a single record."""
+
+    row: int
+    status: UserImportStatus
+    email: str | None = None
+    error: str | None = None
+
+
+class UserImportSummary(BaseModel):
+    """Result of a bulk import.
+
+    Only duplicate and failed rows are listed in `rows` (up to a limit, see `truncated`), the
+    counters always cover the whole import.
+    """
+
+    created: int = 0
+    duplicates: int = 0
+    failed: int = 0
+    rows: list[UserImportRowResult] = []
+    truncated: bool = False
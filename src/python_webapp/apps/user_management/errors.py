@@ -25,3 +25,47 @@ class UserNotFoundError(AppError):
             code="user_management:user_not_found",
             message=message,
         )
+
+
+class InvalidCursorError(AppError):
+    """Error to raise when a pagination cursor is malformed or doesn't match the query."""
+
+    def __init__(self, message: str) -> None:
+        super().__init__(
+            status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            code="user_management:invalid_cursor",
+            message=message,
+        )
+
+
+class TooManyUserIDsError(AppError):
+    """Error to raise when more users are looked up at once than allowed."""
+
+    def __init__(self, message: str) -> None:
+        super().__init__(
+            status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            code="user_management:too_many_user_ids",
+            message=message,
+        )
+
+
+class InvalidImportError(AppError):
+    """Error to raise when a bulk import body can't be processed at all."""
+
+    def __init__(self, message: str) -> None:
+        super().__init__(
+            status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            code="user_management:invalid_import",
+            message=message,
+        )
+
+
+class UnsupportedImportFormatError(AppError):
+    """Error to raise when a bulk import body has an unsupported content type."""
+
+    def __init__(self, message: str) -> None:
+        super().__init__(
+            status=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            code="user_management:unsupported_import_format",
+            message=message,
+        )
@@ -1,4 +1,4 @@
-from sqlalchemy import String
+from sqlalchemy import Index, Integer, String, func, literal_column
 from sqlalchemy.orm import (
     Mapped,
     mapped_column,
@@ -15,6 +15,27 @@ class UserDBModel(Base):
     """User database ORM model."""
 
     __tablename__ = "user"
+    __table_args__ = (
+        # Serves case-insensitive email equality and prefix filters.
+        Index(
+            "ix_user_lower_email",
+            func.lower(literal_column("email")).label("lower_email"),
+            postgresql_ops={"lower_email": "text_pattern_ops"},
+        ),
+        # Serve case-insensitive name substring filters (`ILIKE '%...%'`).
+        Index(
+            "ix_user_firstname_trgm",
+            "firstname",
+            postgresql_using="gin",
+            postgresql_ops={"firstname": "gin_trgm_ops"},
+        ),
+        Index(
+            "ix_user_lastname_trgm",
+            "lastname",
+            postgresql_using="gin",
+            postgresql_ops={"lastname": "gin_trgm_ops"},
+        ),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
 
@@ -23,15 +44,20 @@ class UserDBModel(Base):
     firstname: Mapped[str] = mapped_column(String(), nullable=True, default=None)
     lastname: Mapped[str] = mapped_column(String(), nullable=True, default=None)
 
+    # Bumped on every update, so clients can revalidate cached users cheaply (ETags).
+    version: Mapped[int] = mapped_column(Integer(), nullable=False, default=1, server_default="1")
+
     def __repr__(self) -> str:
         return self.email
 
     def to_domain(self) -> User:
-        return User(
+        # Stored data is validated on the way in, so validating every row again is skipped.
+        return User.model_construct(
             id=str(self.id),
             email=self.email,
-            profile=Profile(
-                firstname=self.firstname,
-                lastname=self.lastname,
+            profile=Profile.model_construct(
+                firstname=self.firstname or "",
+                lastname=self.lastname or "",
             ),
+            version=self.version,
         )
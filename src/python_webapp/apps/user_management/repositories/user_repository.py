@@ -3,16 +3,42 @@ from abc import (
     ABC,
     abstractmethod,
 )
+from collections.abc import AsyncIterator, Callable
+from datetime import datetime
+from functools import partial
 
 from sqlalchemy import (
+    Insert,
+    Select,
+    String,
+    TextClause,
+    bindparam,
     delete,
     exists,
+    func,
     select,
+    text,
     update,
 )
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.compiler import SQLCompiler
+from sqlalchemy.sql.dml import ReturningDelete
+from sqlalchemy.sql.elements import BindParameter
+from sqlalchemy.sql.functions import FunctionElement
 
-from python_webapp.apps.user_management.domain import User
+from python_webapp.apps.user_management.domain import (
+    NewUser,
+    Profile,
+    User,
+    UserFilter,
+    UserSortOrder,
+)
 from python_webapp.apps.user_management.repositories.db_models import UserDBModel
+from python_webapp.core.batching import BatchLoader, BatchWriter
+from python_webapp.core.cache import TTLCache
+from python_webapp.core.health import HealthReport, HealthReportable
+from python_webapp.core.metrics import MetricsRegistry
 from python_webapp.managers.sqlalchemy_manager import SQLAlchemyManager
 
 
@@ -24,12 +50,48 @@ class UserRepository(ABC):
         """Check if user with this email exists."""
 
     @abstractmethod
-    async def create_user(self, email: str, firstname: str, lastname: str) -> None:
-        """Create user."""
+    async def create_user(self, email: str, firstname: str, lastname: str) -> str | None:
+        """Create user and return its ID.
+
+        Returns `None` if a user with the same email already exists.
+        """
 
     @abstractmethod
-    async def get_users(self, offset: int, limit: int) -> list[User]:
-        """Get list of users."""
+    async def create_users_bulk(self, users: list[NewUser]) -> list[str | None]:
+        """Create users in a single statement and return their IDs in the same order.
+
+        ID is `None` for users whose email already exists (or is repeated earlier in `users`).
+        """
+
+    @abstractmethod
+    async def get_users(
+        self,
+        offset: int,
+        limit: int,
+        sort_order: UserSortOrder = UserSortOrder.ID_ASC,
+        after: str | None = None,
+        user_filter: UserFilter | None = None,
+    ) -> list[User]:
+        """Get list of users.
+
+        If `after` is given, only users whose sort key comes after it are returned (keyset
+        pagination). If `user_filter` is given, only users matching it are returned.
+        """
+
+    @abstractmethod
+    async def get_user_versions(
+        self,
+        offset: int,
+        limit: int,
+        sort_order: UserSortOrder = UserSortOrder.ID_ASC,
+        after: str | None = None,
+        user_filter: UserFilter | None = None,
+    ) -> list[tuple[str, int]]:
+        """Get IDs and versions of the same users `get_users` returns, without fetching them."""
+
+    @abstractmethod
+    def stream_users(self, fetch_size: int) -> AsyncIterator[User]:
+        """Stream all users ordered by ID, fetching them in batches of `fetch_size`."""
 
     @abstractmethod
     async def get_user_by_id(
@@ -38,12 +100,23 @@ class UserRepository(ABC):
     ) -> User | None:
         """Get a single user by ID."""
 
+    @abstractmethod
+    async def get_users_by_ids(self, user_ids: list[str]) -> list[User]:
+        """Get users by IDs with a single query, in no particular order.
+
+        Users which don't exist are left out.
+        """
+
+    @abstractmethod
+    async def get_user_version_by_id(self, user_id: str) -> int | None:
+        """Get version of a single user by ID, without fetching the user."""
+
     @abstractmethod
     async def delete_user_by_id(
         self,
         user_id: str,
-    ) -> None:
-        """Delete a single user by ID."""
+    ) -> str | None:
+        """Delete a single user by ID and return its email, `None` if it didn't exist."""
 
     @abstractmethod
     async def update_user_by_id(
@@ -52,60 +125,357 @@ class UserRepository(ABC):
         firstname: str | None = None,
         lastname: str | None = None,
     ) -> None:
-        """Update a single user by ID."""
+        """Update a single user by ID and bump its version."""
+
+    @abstractmethod
+    async def count_users_by_email_domain(self) -> dict[str, int]:
+        """Count all users by lowercase domain of their email."""
+
+    @abstractmethod
+    async def estimate_user_count(self) -> tuple[int, datetime | None] | None:
+        """Get the database's estimate of the number of users and when it was computed.
+
+        Returns `None` if the database doesn't keep an estimate (or hasn't computed it yet).
+        """
+
+    def on_unit_of_work_commit(self, callback: Callable[[], None]) -> None:
+        """Call `callback` after the current unit of work is committed (not on rollback)."""
+        callback()
+
+    def on_unit_of_work_end(self, callback: Callable[[], None]) -> None:
+        """Call `callback` after writes of the current unit of work are committed or rolled back."""
+        callback()
+
+
+class EmailDomain(FunctionElement):
+    """Lowercase part of an email after the `@`, compiled for each supported dialect."""
+
+    type = String()
+    name = "email_domain"
+    inherit_cache = True
+
+
+@compiles(EmailDomain)
+def _compile_email_domain(element: EmailDomain, compiler: SQLCompiler, **kwargs: object) -> str:
+    email = compiler.process(element.clauses, **kwargs)
+    return f"lower(substr({email}, instr({email}, '@') + 1))"
+
+
+@compiles(EmailDomain, "postgresql")
+def _compile_email_domain_postgresql(
+    element: EmailDomain,
+    compiler: SQLCompiler,
+    **kwargs: object,
+) -> str:
+    email = compiler.process(element.clauses, **kwargs)
+    return f"lower(split_part({email}, '@', 2))"
+
+
+def get_email_domain(email: str) -> str:
+    """Get the domain of an email the same way `EmailDomain` does in the database."""
+    return email.partition("@")[2].lower()
 
 
 class SQLAlchemyUserRepository(UserRepository):
-    """User repository implementation using SQLAlchemy."""
+    """User repository implementation using SQLAlchemy.
+
+    Fixed statements are built once with bound parameters and reused, so their construction and
+    cache key generation are skipped and compiled forms are always found in the engine cache.
+
+    If `coalesce_get_by_id` is set, concurrent `get_user_by_id` calls are folded into batched
+    `get_users_by_ids` queries, run in their own read only unit of work. Calls in a write unit of
+    work aren't coalesced, as they may have to see its uncommitted writes. Coalesced reads don't
+    run in the caller's unit of work, so they don't share its snapshot or session (e.g. an ETag
+    check and the read after it may see different data), which is why it's off by default.
+
+    If `create_batch_window` is set, concurrent `create_user` calls are collected for up to that
+    many seconds (or `create_batch_max_size` users) and inserted with a single `create_users_bulk`
+    statement, committed in its own unit of work. This gives up atomicity with the caller's unit of
+    work: the user is committed even if the caller's unit of work is rolled back afterwards (and
+    `on_unit_of_work_commit` callbacks of a rolled back caller aren't called for it). Pending users
+    are written when the database manager is torn down.
+    """
+
+    # PostgreSQL allows at most 65535 bind parameters per statement and every row takes 3, so
+    # bigger bulk inserts are split into multiple statements.
+    bulk_insert_max_rows = 65535 // 3
+
+    _exists_by_email_statement: Select = (
+        exists(1).where(UserDBModel.email == bindparam("email")).select()
+    )
+
+    # Let the unique constraint detect duplicates, so creation is a single round trip and
+    # concurrent inserts with the same email can't both succeed.
+    _create_statement: Insert = (
+        insert(UserDBModel)
+        .values(
+            email=bindparam("email"),
+            firstname=bindparam("firstname"),
+            lastname=bindparam("lastname"),
+        )
+        .on_conflict_do_nothing(index_elements=[UserDBModel.email])
+        .returning(UserDBModel.id)
+    )
+
+    _stream_statement: Select = select(
+        UserDBModel.id,
+        UserDBModel.email,
+        UserDBModel.firstname,
+        UserDBModel.lastname,
+        UserDBModel.version,
+    ).order_by(UserDBModel.id)
+
+    _get_by_id_statement: Select = select(UserDBModel).where(
+        UserDBModel.id == bindparam("user_id"),
+    )
+
+    _get_by_ids_statement: Select = select(UserDBModel).where(
+        UserDBModel.id.in_(bindparam("user_ids", expanding=True)),
+    )
+
+    _get_version_by_id_statement: Select = select(UserDBModel.version).where(
+        UserDBModel.id == bindparam("user_id"),
+    )
+
+    _delete_by_id_statement: ReturningDelete[tuple[str]] = (
+        delete(UserDBModel)
+        .where(UserDBModel.id == bindparam("user_id"))
+        .returning(UserDBModel.email)
+    )
+
+    _count_by_email_domain_statement: Select = select(
+        EmailDomain(UserDBModel.email).label("email_domain"),
+        func.count(),
+    ).group_by("email_domain")
+
+    # `reltuples` is updated by vacuum, analyze and index builds, it's -1 until the first of them.
+    _estimate_count_statement: TextClause = text(
+        "SELECT c.reltuples::bigint, greatest("
+        "s.last_vacuum, s.last_autovacuum, s.last_analyze, s.last_autoanalyze) "
+        "FROM pg_class AS c LEFT JOIN pg_stat_user_tables AS s ON s.relid = c.oid "
+        "WHERE c.oid = to_regclass(:table_name)",
+    )
 
     def __init__(
         self,
         sqlalchemy_manager: SQLAlchemyManager,
+        coalesce_get_by_id: bool = False,
+        batch_max_size: int = 100,
+        create_batch_window: float = 0.0,
+        create_batch_max_size: int = 100,
+        metrics_registry: MetricsRegistry | None = None,
     ) -> None:
         self.sqlalchemy_manager = sqlalchemy_manager
+        self.coalesce_get_by_id = coalesce_get_by_id
+        self.create_batch_window = create_batch_window
+        self.metrics_registry = metrics_registry
+
+        # Reads going to the primary database and to replicas aren't batched together.
+        self._user_loaders = {
+            use_primary: BatchLoader(
+                partial(self._load_users_batch, use_primary),
+                max_batch_size=batch_max_size,
+            )
+            for use_primary in (False, True)
+        }
+        self._user_creator = BatchWriter(
+            self._create_users_batch,
+            max_delay=create_batch_window,
+            max_batch_size=create_batch_max_size,
+        )
+        if create_batch_window > 0:
+            self.sqlalchemy_manager.on_teardown(self._user_creator.close)
+
+        if self.metrics_registry is not None:
+            self._create_batch_size = self.metrics_registry.histogram(
+                "user_create_batch_size",
+                "Number of users inserted by a single batched insert.",
+                buckets=(1, 2, 5, 10, 20, 50, 100, 200, 500),
+            )
+
+        self._get_users_statements = {
+            (sort_order, has_after): self._build_get_users_statement(
+                select(UserDBModel),
+                sort_order,
+                has_after,
+            )
+            for sort_order in UserSortOrder
+            for has_after in (False, True)
+        }
+        self._get_user_versions_statements = {
+            (sort_order, has_after): self._build_get_users_statement(
+                select(UserDBModel.id, UserDBModel.version),
+                sort_order,
+                has_after,
+            )
+            for sort_order in UserSortOrder
+            for has_after in (False, True)
+        }
+
+    def on_unit_of_work_commit(self, callback: Callable[[], None]) -> None:
+        self.sqlalchemy_manager.on_unit_of_work_commit(callback)
+
+    def on_unit_of_work_end(self, callback: Callable[[], None]) -> None:
+        self.sqlalchemy_manager.on_unit_of_work_end(callback)
 
     async def exists_user_by_email(self, email: str) -> bool:
-        async with self.sqlalchemy_manager.get_async_session() as session:
-            statement = exists(1).where(UserDBModel.email == email).select()
-            return await session.scalar(statement)
+        async with self.sqlalchemy_manager.session(read_only=True) as session:
+            return await session.scalar(self._exists_by_email_statement, {"email": email})
 
     async def create_user(
         self,
         email: str,
         firstname: str,
         lastname: str,
-    ) -> None:
-        async with self.sqlalchemy_manager.get_async_session() as session:
-            db_model = UserDBModel(
-                email=email,
-                firstname=firstname,
-                lastname=lastname,
+    ) -> str | None:
+        if self.create_batch_window > 0:
+            return await self._user_creator.write(
+                NewUser.model_construct(
+                    email=email,
+                    profile=Profile.model_construct(firstname=firstname, lastname=lastname),
+                ),
+            )
+
+        async with self.sqlalchemy_manager.session() as session:
+            user_id = await session.scalar(
+                self._create_statement,
+                {"email": email, "firstname": firstname, "lastname": lastname},
             )
 
-            session.add(db_model)
-            await session.commit()
+            if user_id is None:
+                return None
+
+            return str(user_id)
+
+    async def create_users_bulk(self, users: list[NewUser]) -> list[str | None]:
+        if not users:
+            return []
+
+        created_ids: dict[str, str] = {}
+        async with self.sqlalchemy_manager.session() as session:
+            for start in range(0, len(users), self.bulk_insert_max_rows):
+                statement = (
+                    insert(UserDBModel)
+                    .values(
+                        [
+                            {
+                                UserDBModel.email.key: user.email,
+                                UserDBModel.firstname.key: user.profile.firstname,
+                                UserDBModel.lastname.key: user.profile.lastname,
+                            }
+                            for user in users[start : start + self.bulk_insert_max_rows]
+                        ],
+                    )
+                    .on_conflict_do_nothing(index_elements=[UserDBModel.email])
+                    .returning(UserDBModel.id, UserDBModel.email)
+                )
+                result = await session.execute(statement)
+                created_ids.update((email, str(user_id)) for user_id, email in result)
 
-    async def get_users(self, offset: int = 0, limit: int = 30) -> list[User]:
-        async with self.sqlalchemy_manager.get_async_session() as session:
-            statement = select(UserDBModel).offset(offset).limit(limit)
-            db_objects = await session.scalars(statement)
+        # Popping makes repeated emails resolve to `None` after their first occurrence.
+        return [created_ids.pop(user.email, None) for user in users]
+
+    async def get_users(
+        self,
+        offset: int = 0,
+        limit: int = 30,
+        sort_order: UserSortOrder = UserSortOrder.ID_ASC,
+        after: str | None = None,
+        user_filter: UserFilter | None = None,
+    ) -> list[User]:
+        async with self.sqlalchemy_manager.session(read_only=True) as session:
+            params = self._get_users_params(offset, limit, sort_order, after)
+            statement = self._apply_user_filter(
+                self._get_users_statements[(sort_order, after is not None)],
+                params,
+                user_filter,
+            )
+            db_objects = await session.scalars(statement, params)
             return [obj.to_domain() for obj in db_objects]
 
+    async def get_user_versions(
+        self,
+        offset: int = 0,
+        limit: int = 30,
+        sort_order: UserSortOrder = UserSortOrder.ID_ASC,
+        after: str | None = None,
+        user_filter: UserFilter | None = None,
+    ) -> list[tuple[str, int]]:
+        async with self.sqlalchemy_manager.session(read_only=True) as session:
+            params = self._get_users_params(offset, limit, sort_order, after)
+            statement = self._apply_user_filter(
+                self._get_user_versions_statements[(sort_order, after is not None)],
+                params,
+                user_filter,
+            )
+            result = await session.execute(statement, params)
+            return [(str(user_id), version) for user_id, version in result]
+
+    async def stream_users(self, fetch_size: int) -> AsyncIterator[User]:
+        async with self.sqlalchemy_manager.session(read_only=True) as session:
+            # Plain columns through a server-side cursor, so no ORM objects are kept around and
+            # memory stays flat no matter how many users there are.
+            result = await session.stream(
+                self._stream_statement,
+                execution_options={"yield_per": fetch_size},
+            )
+            async for user_id, email, firstname, lastname, version in result:
+                yield User.model_construct(
+                    id=str(user_id),
+                    email=email,
+                    profile=Profile.model_construct(
+                        firstname=firstname or "",
+                        lastname=lastname or "",
+                    ),
+                    version=version,
+                )
+
     async def get_user_by_id(self, user_id: str) -> User | None:
-        async with self.sqlalchemy_manager.get_async_session() as session:
-            statement = select(UserDBModel).where(UserDBModel.id == int(user_id))
-            db_obj = await session.scalar(statement)
+        if not _is_valid_user_id(user_id):
+            return None
+
+        if self.coalesce_get_by_id:
+            use_primary = self.sqlalchemy_manager.get_detached_read_use_primary()
+            if use_primary is not None:
+                return await self._user_loaders[use_primary].load(user_id)
+
+        async with self.sqlalchemy_manager.session(read_only=True) as session:
+            db_obj = await session.scalar(self._get_by_id_statement, {"user_id": int(user_id)})
 
             if db_obj is None:
                 return None
 
             return db_obj.to_domain()
 
-    async def delete_user_by_id(self, user_id: str) -> None:
-        async with self.sqlalchemy_manager.get_async_session() as session:
-            statement = delete(UserDBModel).where(UserDBModel.id == int(user_id))
-            await session.execute(statement)
-            await session.commit()
+    async def get_users_by_ids(self, user_ids: list[str]) -> list[User]:
+        # Non-numeric IDs can't exist, leaving them out keeps them from failing the whole batch.
+        ids = sorted({int(user_id) for user_id in user_ids if _is_valid_user_id(user_id)})
+        if not ids:
+            return []
+
+        async with self.sqlalchemy_manager.session(read_only=True) as session:
+            db_objects = await session.scalars(
+                self._get_by_ids_statement,
+                {"user_ids": _pad_to_power_of_two(ids)},
+            )
+            return [obj.to_domain() for obj in db_objects]
+
+    async def get_user_version_by_id(self, user_id: str) -> int | None:
+        if not _is_valid_user_id(user_id):
+            return None
+
+        async with self.sqlalchemy_manager.session(read_only=True) as session:
+            return await session.scalar(
+                self._get_version_by_id_statement,
+                {"user_id": int(user_id)},
+            )
+
+    async def delete_user_by_id(self, user_id: str) -> str | None:
+        if not _is_valid_user_id(user_id):
+            return None
+
+        async with self.sqlalchemy_manager.session() as session:
+            return await session.scalar(self._delete_by_id_statement, {"user_id": int(user_id)})
 
     async def update_user_by_id(
         self,
@@ -113,7 +483,10 @@ class SQLAlchemyUserRepository(UserRepository):
         firstname: str | None = None,
         lastname: str | None = None,
     ) -> None:
-        async with self.sqlalchemy_manager.get_async_session() as session:
+        if not _is_valid_user_id(user_id):
+            return
+
+        async with self.sqlalchemy_manager.session() as session:
             values = {}
             if firstname is not None:
                 values[UserDBModel.firstname.key] = firstname
@@ -124,6 +497,321 @@ class SQLAlchemyUserRepository(UserRepository):
             if not values:
                 return
 
-            statement = update(UserDBModel).where(UserDBModel.id == int(user_id)).values(**values)
+            statement = (
+                update(UserDBModel)
+                .where(UserDBModel.id == int(user_id))
+                .values(**values, version=UserDBModel.version + 1)
+            )
             await session.execute(statement)
-            await session.commit()
+
+    async def count_users_by_email_domain(self) -> dict[str, int]:
+        async with self.sqlalchemy_manager.session(read_only=True) as session:
+            result = await session.execute(self._count_by_email_domain_statement)
+            return dict(result.tuples().all())
+
+    async def estimate_user_count(self) -> tuple[int, datetime | None] | None:
+        async with self.sqlalchemy_manager.session(read_only=True) as session:
+            if session.get_bind().dialect.name != "postgresql":
+                return None
+
+            row = (
+                await session.execute(
+                    self._estimate_count_statement,
+                    {"table_name": f'"{UserDBModel.__tablename__}"'},
+                )
+            ).first()
+
+        if row is None or row[0] < 0:
+            return None
+
+        return row[0], row[1]
+
+    async def _create_users_batch(self, users: list[NewUser]) -> list[str | None]:
+        if self.metrics_registry is not None:
+            self._create_batch_size.observe(value=len(users))
+
+        async with self.sqlalchemy_manager.unit_of_work():
+            return await self.create_users_bulk(users=users)
+
+    async def _load_users_batch(self, use_primary: bool, user_ids: list[str]) -> dict[str, User]:
+        async with self.sqlalchemy_manager.unit_of_work(read_only=True, use_primary=use_primary):
+            users = await self.get_users_by_ids(user_ids=user_ids)
+
+        return {user.id: user for user in users}
+
+    @staticmethod
+    def _get_users_params(
+        offset: int,
+        limit: int,
+        sort_order: UserSortOrder,
+        after: str | None,
+    ) -> dict[str, int | str]:
+        params: dict[str, int | str] = {"offset": offset, "limit": limit}
+        if after is not None:
+            params["after"] = int(after) if sort_order.field == "id" else after
+
+        return params
+
+    @staticmethod
+    def _apply_user_filter(
+        statement: Select,
+        params: dict[str, int | str],
+        user_filter: UserFilter | None,
+    ) -> Select:
+        """Add criteria of the filter to the statement and their values to `params`.
+
+        Criteria match the expressions of the search indexes, `lower(email)` for emails and
+        `ILIKE` for names, so they are served by index scans.
+        """
+        if user_filter is None:
+            return statement
+
+        lower_email = func.lower(UserDBModel.email)
+        if user_filter.email is not None:
+            statement = statement.where(lower_email == bindparam("email"))
+            params["email"] = user_filter.email.lower()
+
+        if user_filter.email_prefix is not None:
+            statement = statement.where(lower_email.like(bindparam("email_prefix"), escape="\\"))
+            params["email_prefix"] = f"{_escape_like(user_filter.email_prefix.lower())}%"
+
+        if user_filter.firstname is not None:
+            statement = statement.where(
+                UserDBModel.firstname.ilike(bindparam("firstname"), escape="\\"),
+            )
+            params["firstname"] = f"%{_escape_like(user_filter.firstname)}%"
+
+        if user_filter.lastname is not None:
+            statement = statement.where(
+                UserDBModel.lastname.ilike(bindparam("lastname"), escape="\\"),
+            )
+            params["lastname"] = f"%{_escape_like(user_filter.lastname)}%"
+
+        return statement
+
+    @staticmethod
+    def _build_get_users_statement(
+        statement: Select,
+        sort_order: UserSortOrder,
+        has_after: bool,
+    ) -> Select:
+        column = UserDBModel.id if sort_order.field == "id" else UserDBModel.email
+
+        if has_after:
+            # Untyped, so it takes the type of the sort column (the ID is bound as an integer).
+            after: BindParameter[int | str] = bindparam("after")
+            statement = statement.where(
+                column < after if sort_order.is_descending else column > after,
+            )
+
+        return (
+            statement.order_by(column.desc() if sort_order.is_descending else column.asc())
+            .offset(bindparam("offset"))
+            .limit(bindparam("limit"))
+        )
+
+
+def _is_valid_user_id(user_id: str) -> bool:
+    # IDs are integers, users with other IDs can't exist. `isdigit` alone accepts e.g. "²".
+    return user_id.isascii() and user_id.isdigit()
+
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _pad_to_power_of_two(values: list[int]) -> list[int]:
+    # Expanded `IN` lists only come in a few lengths, so their prepared statements are reused.
+    size = 1 << (len(values) - 1).bit_length()
+    return values + values[-1:] * (size - len(values))
+
+
+class CachingUserRepository(HealthReportable, UserRepository):
+    """User repository which caches users by ID in front of another repository.
+
+    Missing users are cached too (with a shorter TTL), and entries are invalidated on writes going
+    through this repository. Writes made by other processes are only picked up after TTL.
+
+    Cache misses are read from the primary database, since a lagging replica could return the
+    user as it was before an invalidation. Misses inside a unit of work which reads from a
+    replica are returned without being cached.
+    """
+
+    component = "user_cache"
+
+    def __init__(
+        self,
+        user_repository: UserRepository,
+        sqlalchemy_manager: SQLAlchemyManager,
+        max_size: int,
+        ttl: float,
+        negative_ttl: float,
+    ) -> None:
+        self.user_repository = user_repository
+        self.sqlalchemy_manager = sqlalchemy_manager
+        self.negative_ttl = negative_ttl
+
+        self._cache: TTLCache[str, User | None] = TTLCache(max_size=max_size, ttl=ttl)
+        # Bumped on every invalidation, so reads racing with a write don't cache stale users.
+        self._generation = 0
+
+    async def exists_user_by_email(self, email: str) -> bool:
+        return await self.user_repository.exists_user_by_email(email=email)
+
+    async def create_user(self, email: str, firstname: str, lastname: str) -> str | None:
+        user_id = await self.user_repository.create_user(
+            email=email,
+            firstname=firstname,
+            lastname=lastname,
+        )
+        if user_id is not None:
+            self._invalidate(user_id)
+
+        return user_id
+
+    async def create_users_bulk(self, users: list[NewUser]) -> list[str | None]:
+        user_ids = await self.user_repository.create_users_bulk(users=users)
+        for user_id in user_ids:
+            if user_id is not None:
+                self._invalidate(user_id)
+
+        return user_ids
+
+    async def get_users(
+        self,
+        offset: int = 0,
+        limit: int = 30,
+        sort_order: UserSortOrder = UserSortOrder.ID_ASC,
+        after: str | None = None,
+        user_filter: UserFilter | None = None,
+    ) -> list[User]:
+        return await self.user_repository.get_users(
+            offset=offset,
+            limit=limit,
+            sort_order=sort_order,
+            after=after,
+            user_filter=user_filter,
+        )
+
+    async def get_user_versions(
+        self,
+        offset: int = 0,
+        limit: int = 30,
+        sort_order: UserSortOrder = UserSortOrder.ID_ASC,
+        after: str | None = None,
+        user_filter: UserFilter | None = None,
+    ) -> list[tuple[str, int]]:
+        return await self.user_repository.get_user_versions(
+            offset=offset,
+            limit=limit,
+            sort_order=sort_order,
+            after=after,
+            user_filter=user_filter,
+        )
+
+    def stream_users(self, fetch_size: int) -> AsyncIterator[User]:
+        return self.user_repository.stream_users(fetch_size=fetch_size)
+
+    async def get_user_by_id(self, user_id: str) -> User | None:
+        is_hit, user = self._cache.get(user_id)
+        if is_hit:
+            return user
+
+        generation = self._generation
+        async with self.sqlalchemy_manager.unit_of_work(read_only=True, use_primary=True):
+            is_cacheable = self.sqlalchemy_manager.reads_use_primary()
+            user = await self.user_repository.get_user_by_id(user_id=user_id)
+
+        if is_cacheable and generation == self._generation:
+            self._cache.set(user_id, user, ttl=None if user else self.negative_ttl)
+
+        return user
+
+    async def get_users_by_ids(self, user_ids: list[str]) -> list[User]:
+        users: list[User] = []
+        missing_ids: list[str] = []
+        for user_id in dict.fromkeys(user_ids):
+            is_hit, user = self._cache.get(user_id)
+            if not is_hit:
+                missing_ids.append(user_id)
+            elif user is not None:
+                users.append(user)
+
+        if not missing_ids:
+            return users
+
+        generation = self._generation
+        async with self.sqlalchemy_manager.unit_of_work(read_only=True, use_primary=True):
+            is_cacheable = self.sqlalchemy_manager.reads_use_primary()
+            fetched_users = {
+                user.id: user
+                for user in await self.user_repository.get_users_by_ids(user_ids=missing_ids)
+            }
+
+        if is_cacheable and generation == self._generation:
+            for user_id in missing_ids:
+                user = fetched_users.get(user_id)
+                self._cache.set(user_id, user, ttl=None if user else self.negative_ttl)
+
+        return users + list(fetched_users.values())
+
+    async def get_user_version_by_id(self, user_id: str) -> int | None:
+        # Cached users are invalidated on update, so their version is current too.
+        is_hit, user = self._cache.get(user_id)
+        if is_hit:
+            return user.version if user else None
+
+        return await self.user_repository.get_user_version_by_id(user_id=user_id)
+
+    async def delete_user_by_id(self, user_id: str) -> str | None:
+        email = await self.user_repository.delete_user_by_id(user_id=user_id)
+        self._invalidate(user_id)
+        return email
+
+    async def update_user_by_id(
+        self,
+        user_id: str,
+        firstname: str | None = None,
+        lastname: str | None = None,
+    ) -> None:
+        await self.user_repository.update_user_by_id(
+            user_id=user_id,
+            firstname=firstname,
+            lastname=lastname,
+        )
+        self._invalidate(user_id)
+
+    async def count_users_by_email_domain(self) -> dict[str, int]:
+        return await self.user_repository.count_users_by_email_domain()
+
+    async def estimate_user_count(self) -> tuple[int, datetime | None] | None:
+        return await self.user_repository.estimate_user_count()
+
+    async def get_health_report(self) -> HealthReport:
+        """Get cache statistics as a health report."""
+        return HealthReport(
+            component=self.component,
+            is_healthy=True,
+            details={
+                "size": len(self._cache),
+                "hits": self._cache.hits,
+                "misses": self._cache.misses,
+                "evictions": self._cache.evictions,
+            },
+        )
+
+    def on_unit_of_work_commit(self, callback: Callable[[], None]) -> None:
+        self.user_repository.on_unit_of_work_commit(callback)
+
+    def on_unit_of_work_end(self, callback: Callable[[], None]) -> None:
+        self.user_repository.on_unit_of_work_end(callback)
+
+    def _invalidate(self, user_id: str) -> None:
+        self._invalidate_now(user_id)
+        # Until the write is committed (or rolled back), concurrent reads may cache the old user
+        # and reads in the same unit of work may cache the new one, so it's invalidated again.
+        self.user_repository.on_unit_of_work_end(partial(self._invalidate_now, user_id))
+
+    def _invalidate_now(self, user_id: str) -> None:
+        self._generation += 1
+        self._cache.delete(user_id)
@@ -1,22 +1,39 @@
 """User management services."""
 
+import binascii
+import hashlib
+import json
 import logging
-from typing import (
-    Final,
-)
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections.abc import AsyncIterable, AsyncIterator
+from functools import partial
 
 from pydantic import (
     EmailStr,
 )
 
-from python_webapp.apps.user_management.domain import User
+from python_webapp.apps.user_management.domain import (
+    User,
+    UserFilter,
+    UserImportRecord,
+    UserImportRowResult,
+    UserImportStatus,
+    UserImportSummary,
+    UserSortOrder,
+    UsersPage,
+    UserStatistics,
+    UserStatisticsMode,
+)
 from python_webapp.apps.user_management.errors import (
     DuplicateEmailError,
+    InvalidCursorError,
+    TooManyUserIDsError,
     UserNotFoundError,
 )
 from python_webapp.apps.user_management.repositories.user_repository import (
     UserRepository,
 )
+from python_webapp.apps.user_management.statistics import UserStatisticsTracker
 
 logger = logging.getLogger(__name__)
 
@@ -24,41 +41,161 @@ logger = logging.getLogger(__name__)
 class UserManagementServices:
     """User management application services."""
 
-    PAGE_SIZE: Final[int] = 20
-
     def __init__(
         self,
         user_repository: UserRepository,
+        page_size: int = 20,
+        max_page_size: int = 100,
+        import_chunk_size: int = 1000,
+        import_max_reported_rows: int = 1000,
+        export_fetch_size: int = 1000,
+        user_statistics_tracker: UserStatisticsTracker | None = None,
     ) -> None:
         self.user_repository = user_repository
+        self.page_size = page_size
+        self.max_page_size = max_page_size
+        self.import_chunk_size = import_chunk_size
+        self.import_max_reported_rows = import_max_reported_rows
+        self.export_fetch_size = export_fetch_size
+        self.user_statistics_tracker = user_statistics_tracker or UserStatisticsTracker(
+            user_repository=user_repository,
+        )
 
     async def create_user(
         self,
         email: EmailStr,
         firstname: str,
         lastname: str,
-    ) -> None:
-        """Create a new user."""
-        # Check if user with the same email already exists.
-        email_exists = await self.user_repository.exists_user_by_email(
+    ) -> str:
+        """Create a new user and return its ID."""
+        user_id = await self.user_repository.create_user(
             email=email,
+            firstname=firstname,
+            lastname=lastname,
         )
-        if email_exists:
+
+        # Repository returns nothing if user with the same email already exists.
+        if user_id is None:
             raise DuplicateEmailError(f"User with email `{email}` already exists!")
 
-        # Create the user using repository.
-        await self.user_repository.create_user(
-            email=email,
-            firstname=firstname,
-            lastname=lastname,
+        # Counted once committed, so a rolled back request doesn't count a user that doesn't exist.
+        self.user_repository.on_unit_of_work_commit(
+            partial(self.user_statistics_tracker.add, email),
         )
+        return user_id
+
+    async def import_users(self, records: AsyncIterable[UserImportRecord]) -> UserImportSummary:
+        """Create users from a stream of records, inserting them in chunks.
+
+        Only one chunk is kept in memory at a time, so the stream can be arbitrarily large.
+        """
+        summary = UserImportSummary()
 
-    async def get_users(self, page: int) -> list[User]:
-        """Get list of users."""
-        offset = (page - 1) * self.PAGE_SIZE
-        return await self.user_repository.get_users(
+        chunk: list[UserImportRecord] = []
+        async for record in records:
+            if record.user is None:
+                self._add_import_result(
+                    summary=summary,
+                    result=UserImportRowResult(
+                        row=record.row,
+                        status=UserImportStatus.FAILED,
+                        error=record.error,
+                    ),
+                )
+                continue
+
+            chunk.append(record)
+            if len(chunk) >= self.import_chunk_size:
+                await self._import_users_chunk(chunk=chunk, summary=summary)
+                chunk = []
+
+        if chunk:
+            await self._import_users_chunk(chunk=chunk, summary=summary)
+
+        logger.info(
+            "Imported users: %d created, %d duplicates, %d failed",
+            summary.created,
+            summary.duplicates,
+            summary.failed,
+        )
+        return summary
+
+    def export_users(self) -> AsyncIterator[User]:
+        """Stream all users, reading them from repository in batches."""
+        return self.user_repository.stream_users(fetch_size=self.export_fetch_size)
+
+    async def get_users(
+        self,
+        page: int = 1,
+        cursor: str | None = None,
+        page_size: int | None = None,
+        sort_order: UserSortOrder = UserSortOrder.ID_ASC,
+        user_filter: UserFilter | None = None,
+    ) -> UsersPage:
+        """Get a page of users.
+
+        If `cursor` is given, the page right after it is returned using keyset pagination and
+        `page` is ignored, otherwise `page` is used as an offset (kept for older clients). Only
+        users matching `user_filter` are listed, cursors stay valid as long as it's the same.
+        """
+        offset, limit, after = self._get_page_bounds(
+            page=page,
+            cursor=cursor,
+            page_size=page_size,
+            sort_order=sort_order,
+        )
+
+        # Fetch one extra user to find out whether there is a next page.
+        users = await self.user_repository.get_users(
+            offset=offset,
+            limit=limit + 1,
+            sort_order=sort_order,
+            after=after,
+            user_filter=user_filter,
+        )
+
+        has_next_page = len(users) > limit
+        users = users[:limit]
+        next_cursor = None
+        if has_next_page:
+            next_cursor = self._encode_cursor(user=users[-1], sort_order=sort_order)
+
+        return UsersPage(
+            users=users,
+            next_cursor=next_cursor,
+            version=self._get_page_version(
+                user_versions=[(user.id, user.version) for user in users],
+                has_next_page=has_next_page,
+            ),
+        )
+
+    async def get_users_page_version(
+        self,
+        page: int = 1,
+        cursor: str | None = None,
+        page_size: int | None = None,
+        sort_order: UserSortOrder = UserSortOrder.ID_ASC,
+        user_filter: UserFilter | None = None,
+    ) -> str:
+        """Get version of the page `get_users` returns, only reading IDs and versions of users."""
+        offset, limit, after = self._get_page_bounds(
+            page=page,
+            cursor=cursor,
+            page_size=page_size,
+            sort_order=sort_order,
+        )
+
+        user_versions = await self.user_repository.get_user_versions(
             offset=offset,
-            limit=self.PAGE_SIZE,
+            limit=limit + 1,
+            sort_order=sort_order,
+            after=after,
+            user_filter=user_filter,
+        )
+
+        return self._get_page_version(
+            user_versions=user_versions[:limit],
+            has_next_page=len(user_versions) > limit,
         )
 
     async def get_user_by_id(self, user_id: str) -> User:
@@ -69,9 +206,44 @@ class UserManagementServices:
 
         return user
 
+    async def get_users_by_ids(self, user_ids: list[str]) -> tuple[list[User], list[str]]:
+        """Get users by IDs with a single lookup.
+
+        Returns found users in the order of `user_ids` (without repetitions) and IDs of users which
+        weren't found. At most `max_page_size` distinct IDs can be looked up at once.
+        """
+        unique_ids = list(dict.fromkeys(user_ids))
+        if len(unique_ids) > self.max_page_size:
+            raise TooManyUserIDsError(
+                f"At most {self.max_page_size} users can be looked up at once, "
+                f"got {len(unique_ids)}!",
+            )
+
+        users_by_id = {
+            user.id: user
+            for user in await self.user_repository.get_users_by_ids(user_ids=unique_ids)
+        }
+
+        return (
+            [users_by_id[user_id] for user_id in unique_ids if user_id in users_by_id],
+            [user_id for user_id in unique_ids if user_id not in users_by_id],
+        )
+
+    async def get_user_version_by_id(self, user_id: str) -> int:
+        """Get version of a single user by ID, without fetching the user."""
+        version = await self.user_repository.get_user_version_by_id(user_id=user_id)
+        if version is None:
+            raise UserNotFoundError(f"User with ID `{user_id}`not found!")
+
+        return version
+
     async def delete_user_by_id(self, user_id: str) -> None:
         """Delete a single user by ID."""
-        await self.user_repository.delete_user_by_id(user_id=user_id)
+        email = await self.user_repository.delete_user_by_id(user_id=user_id)
+        if email is not None:
+            self.user_repository.on_unit_of_work_commit(
+                partial(self.user_statistics_tracker.remove, email),
+            )
 
     async def update_user_by_id(
         self,
@@ -85,3 +257,107 @@ class UserManagementServices:
             firstname=firstname,
             lastname=lastname,
         )
+
+    async def get_user_statistics(
+        self,
+        mode: UserStatisticsMode = UserStatisticsMode.MAINTAINED,
+    ) -> UserStatistics:
+        """Get user counts without counting users.
+
+        Maintained counts are synced on first use if they haven't been yet. If the database has no
+        estimate for the approximate total, maintained statistics are returned instead.
+        """
+        if mode == UserStatisticsMode.APPROXIMATE:
+            estimate = await self.user_repository.estimate_user_count()
+            if estimate is not None:
+                total, estimated_at = estimate
+                return UserStatistics(
+                    mode=UserStatisticsMode.APPROXIMATE,
+                    total=total,
+                    synced_at=estimated_at,
+                )
+
+        await self.user_statistics_tracker.ensure_synced()
+
+        return self.user_statistics_tracker.get_statistics()
+
+    def _get_page_bounds(
+        self,
+        page: int,
+        cursor: str | None,
+        page_size: int | None,
+        sort_order: UserSortOrder,
+    ) -> tuple[int, int, str | None]:
+        limit = min(page_size or self.page_size, self.max_page_size)
+
+        if cursor is not None:
+            return 0, limit, self._decode_cursor(cursor=cursor, sort_order=sort_order)
+
+        return (page - 1) * limit, limit, None
+
+    @staticmethod
+    def _get_page_version(user_versions: list[tuple[str, int]], has_next_page: bool) -> str:
+        payload = json.dumps([user_versions, has_next_page], separators=(",", ":"))
+        return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
+    @staticmethod
+    def _encode_cursor(user: User, sort_order: UserSortOrder) -> str:
+        payload = json.dumps(
+            {"sort": sort_order.value, "key": getattr(user, sort_order.field)},
+            separators=(",", ":"),
+        )
+        return urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+    @staticmethod
+    def _decode_cursor(cursor: str, sort_order: UserSortOrder) -> str:
+        try:
+            payload = json.loads(urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+            cursor_sort_order = payload["sort"]
+            key = payload["key"]
+        except (binascii.Error, ValueError, TypeError, KeyError) as e:
+            raise InvalidCursorError(f"Cursor `{cursor}` is malformed!") from e
+
+        if cursor_sort_order != sort_order.value or not isinstance(key, str):
+            raise InvalidCursorError(f"Cursor `{cursor}` doesn't match sort order `{sort_order}`!")
+
+        if sort_order.field == "id" and not (key.isascii() and key.isdigit()):
+            raise InvalidCursorError(f"Cursor `{cursor}` is malformed!")
+
+        return key
+
+    async def _import_users_chunk(
+        self,
+        chunk: list[UserImportRecord],
+        summary: UserImportSummary,
+    ) -> None:
+        user_ids = await self.user_repository.create_users_bulk(
+            users=[record.user for record in chunk if record.user is not None],
+        )
+
+        for record, user_id in zip(chunk, user_ids, strict=True):
+            if user_id is not None and record.user is not None:
+                self.user_repository.on_unit_of_work_commit(
+                    partial(self.user_statistics_tracker.add, record.user.email),
+                )
+                summary.created += 1
+                continue
+
+            self._add_import_result(
+                summary=summary,
+                result=UserImportRowResult(
+                    row=record.row,
+                    status=UserImportStatus.DUPLICATE,
+                    email=record.user.email if record.user else None,
+                ),
+            )
+
+    def _add_import_result(self, summary: UserImportSummary, result: UserImportRowResult) -> None:
+        if result.status == UserImportStatus.DUPLICATE:
+            summary.duplicates += 1
+        else:
+            summary.failed += 1
+
+        if len(summary.rows) < self.import_max_reported_rows:
+            summary.rows.append(result)
+        else:
+            summary.truncated = True
@@ -0,0 +1,83 @@
+"""User statistics maintained in memory."""
+import asyncio
+import logging
+from collections import Counter
+from datetime import UTC, datetime
+
+from python_webapp.apps.user_management.domain import UserStatistics, UserStatisticsMode
+from python_webapp.apps.user_management.repositories.user_repository import (
+    UserRepository,
+    get_email_domain,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class UserStatisticsTracker:
+    """User counts by email domain, adjusted by writes of this process and re-synced periodically.
+
+    Reading the counts never touches the database. Writes of other processes (and rolled back
+    writes of this one) are only reflected after the next sync, `synced_at` of the statistics tells
+    how fresh they are.
+    """
+
+    def __init__(self, user_repository: UserRepository) -> None:
+        self.user_repository = user_repository
+
+        self._by_email_domain: Counter[str] = Counter()
+        self._synced_at: datetime | None = None
+        self._sync_lock = asyncio.Lock()
+        # Writes made while counting, the count may or may not include them.
+        self._pending: Counter[str] | None = None
+
+    async def ensure_synced(self) -> None:
+        """Sync the counts unless they have been synced already."""
+        if self._synced_at is None:
+            await self.sync(only_if_unsynced=True)
+
+    async def sync(self, only_if_unsynced: bool = False) -> None:
+        """Replace the counts with fresh ones counted in the database."""
+        async with self._sync_lock:
+            # Concurrent callers waiting for the first sync don't have to count again.
+            if only_if_unsynced and self._synced_at is not None:
+                return
+
+            self._pending = Counter()
+            try:
+                by_email_domain = Counter(await self.user_repository.count_users_by_email_domain())
+                # Writes committed before the count started are counted twice, but they are few
+                # and corrected by the next sync, missing the rest would be worse.
+                by_email_domain.update(self._pending)
+            finally:
+                self._pending = None
+
+            self._by_email_domain = +by_email_domain
+            self._synced_at = datetime.now(UTC)
+
+        logger.debug("Synced user statistics: %d users", self._by_email_domain.total())
+
+    def add(self, email: str) -> None:
+        """Count a created user."""
+        self._adjust(email, 1)
+
+    def remove(self, email: str) -> None:
+        """Stop counting a deleted user."""
+        self._adjust(email, -1)
+
+    def get_statistics(self) -> UserStatistics:
+        """Get the current counts."""
+        return UserStatistics(
+            mode=UserStatisticsMode.MAINTAINED,
+            total=self._by_email_domain.total(),
+            by_email_domain=dict(self._by_email_domain.most_common()),
+            synced_at=self._synced_at,
+        )
+
+    def _adjust(self, email: str, amount: int) -> None:
+        domain = get_email_domain(email)
+        self._by_email_domain[domain] += amount
+        if self._by_email_domain[domain] <= 0:
+            del self._by_email_domain[domain]
+
+        if self._pending is not None:
+            self._pending[domain] += amount
@@ -1,4 +1,6 @@
-from typer import Context, Typer
+import asyncio
+
+from typer import Context, Typer, echo
 
 cli = Typer()
 
@@ -6,5 +8,29 @@ cli = Typer()
 @cli.command()
 def run(ctx: Context) -> None:
     container = ctx.obj["container"]
+    if container.config().workers > 1:
+        supervisor = container.supervisor()
+        supervisor.run()
+        return
+
     runner = container.runner()
     runner.run()
+
+
+@cli.command()
+def migrate(ctx: Context) -> None:
+    """Upgrade database to the latest migration."""
+    container = ctx.obj["container"]
+    sqlalchemy_manager = container.sqlalchemy_manager()
+    asyncio.run(sqlalchemy_manager.migrate())
+
+
+@cli.command()
+def startup_profile(ctx: Context) -> None:
+    """Report how long each phase of application startup takes."""
+    from python_webapp.startup_profiler import StartupProfiler
+
+    container = ctx.obj["container"]
+    startup_profiler = StartupProfiler(container_factory=type(container))
+    for phase, duration in startup_profiler.run():
+        echo(f"{phase:<32}{duration * 1000:>10.1f} ms")
@@ -1,4 +1,8 @@
+from typing import Literal
+
+from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
+from uvicorn.config import HTTPProtocolType
 
 
 class Config(BaseSettings):
@@ -11,9 +15,36 @@ class Config(BaseSettings):
 
     system_name: str = "python-webapp-template"
     system_version: str = "0.1.0"
+    health_report_timeout: float = 2.0
+
+    event_loop: Literal["asyncio", "uvloop"] = "asyncio"
+    managers_setup_timeout: float | None = None
+    managers_teardown_timeout: float | None = 30.0
+
+    event_loop_monitor_interval: float = 0.25
+    event_loop_monitor_slow_callback_threshold: float = 0.1
+    event_loop_monitor_degraded_lag: float = 0.25
+    event_loop_monitor_window: float = 10.0
+
+    workers: int = 1
+    workers_graceful_timeout: float = 30.0
+    workers_min_uptime: float = 10.0
+    workers_restart_backoff: float = 1.0
+    workers_max_early_exits: int = 5
+
+    metrics_multiprocess_dir: str | None = None
+    metrics_flush_interval: float = 5.0
 
     api_host: str = "0.0.0.0"
     api_port: int = 8000
+    api_uds: str | None = None
+    api_http: HTTPProtocolType = "auto"
+    api_backlog: int = 2048
+    api_limit_concurrency: int | None = None
+    api_timeout_keep_alive: int = 5
+    api_access_log: bool = True
+    api_json_renderer: Literal["json", "orjson"] = "json"
+    api_openapi: Literal["lazy", "precompute", "disabled"] = "lazy"
     api_title: str = "API Title"
     api_summary: str = "API Summary"
     api_description: str = "API Description"
@@ -24,3 +55,35 @@ class Config(BaseSettings):
     postgres_user: str = "postgres"
     postgres_password: str = "postgres_pass"
     postgres_db_name: str = "python_webapp"
+    postgres_pool_size: int = 5
+    postgres_pool_max_overflow: int = 10
+    postgres_pool_timeout: float = 30.0
+    postgres_pool_recycle: int = -1
+    postgres_pool_pre_ping: bool = False
+    postgres_pool_use_lifo: bool = False
+    postgres_health_probe_interval: float = 5.0
+    postgres_health_max_staleness: float = 15.0
+    postgres_migrate_on_startup: bool = True
+    postgres_migrations_lock_id: int = 0x70795F6D6967
+    postgres_query_cache_size: int = 500
+    postgres_prepared_statements: bool = True
+    postgres_prepare_threshold: int = 5
+    postgres_replica_urls: list[str] = Field(default_factory=list)
+    postgres_read_your_writes_window: float = 0.0
+
+    user_cache_enabled: bool = False
+    user_cache_max_size: int = 10000
+    user_cache_ttl: float = 60.0
+    user_cache_negative_ttl: float = 5.0
+
+    user_repository_coalesce_get_by_id: bool = False
+    user_repository_batch_max_size: int = 100
+    user_repository_create_batch_window: float = 0.0
+    user_repository_create_batch_max_size: int = 100
+
+    user_management_page_size: int = 20
+    user_management_max_page_size: int = 100
+    user_management_import_chunk_size: int = 1000
+    user_management_import_max_reported_rows: int = 1000
+    user_management_export_fetch_size: int = 1000
+    user_management_statistics_sync_interval: float = 300.0
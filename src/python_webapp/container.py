@@ -1,23 +1,33 @@
+"""Application container.
+
+Managers, routers and apps are imported in their factories instead of at module level, so a command
+only pays for importing what it actually builds (e.g. `migrate` never imports FastAPI).
+"""
+from __future__ import annotations
+
+import socket
 from abc import ABC, abstractmethod
+from functools import partial
+from typing import TYPE_CHECKING
 
-from python_webapp.apps.system.api.router import (
-    router as system_router,
-)
-from python_webapp.apps.system.services import SystemServices
-from python_webapp.apps.user_management.api.router import router as user_management_router
-from python_webapp.apps.user_management.repositories.db_models import (
-    Base as UserManagementDeclarativeBase,
-)
-from python_webapp.apps.user_management.repositories.user_repository import (
-    SQLAlchemyUserRepository,
-    UserRepository,
-)
-from python_webapp.apps.user_management.services import UserManagementServices
 from python_webapp.config import Config
 from python_webapp.core.di import Container, singleton
-from python_webapp.managers.fastapi_manager import FastAPIManager
-from python_webapp.managers.sqlalchemy_manager import PostgresManager, SQLAlchemyManager
+from python_webapp.core.health import HealthReportable
+from python_webapp.core.manager import Manager
 from python_webapp.runner import Runner
+from python_webapp.supervisor import Supervisor
+
+if TYPE_CHECKING:
+    from python_webapp.apps.system.services import SystemServices
+    from python_webapp.apps.user_management.repositories.user_repository import UserRepository
+    from python_webapp.apps.user_management.services import UserManagementServices
+    from python_webapp.apps.user_management.statistics import UserStatisticsTracker
+    from python_webapp.core.metrics import MetricsRegistry
+    from python_webapp.managers.event_loop_monitor_manager import EventLoopMonitorManager
+    from python_webapp.managers.fastapi_manager import FastAPIManager
+    from python_webapp.managers.metrics_manager import MetricsManager
+    from python_webapp.managers.periodic_task_manager import PeriodicTaskManager
+    from python_webapp.managers.sqlalchemy_manager import SQLAlchemyManager
 
 
 class RootContainer(Container, ABC):
@@ -29,6 +39,22 @@ class RootContainer(Container, ABC):
     def runner(self) -> Runner:
         pass
 
+    @abstractmethod
+    def supervisor(self) -> Supervisor:
+        pass
+
+    @abstractmethod
+    def metrics_registry(self) -> MetricsRegistry:
+        pass
+
+    @abstractmethod
+    def metrics_manager(self) -> MetricsManager:
+        pass
+
+    @abstractmethod
+    def event_loop_monitor_manager(self) -> EventLoopMonitorManager:
+        pass
+
     @abstractmethod
     def fastapi_manager(self) -> FastAPIManager:
         pass
@@ -45,6 +71,14 @@ class RootContainer(Container, ABC):
     def user_repository(self) -> UserRepository:
         pass
 
+    @abstractmethod
+    def user_statistics_tracker(self) -> UserStatisticsTracker:
+        pass
+
+    @abstractmethod
+    def user_statistics_manager(self) -> PeriodicTaskManager:
+        pass
+
     @abstractmethod
     def user_management_services(self) -> UserManagementServices:
         pass
@@ -57,21 +91,97 @@ class AppRootContainer(RootContainer):
 
     @singleton
     def runner(self) -> Runner:
+        config = self.config()
+        managers: list[Manager] = [
+            self.event_loop_monitor_manager(),
+            self.fastapi_manager(),
+            self.sqlalchemy_manager(),
+            self.user_statistics_manager(),
+        ]
+
+        # Metrics only have to be written out when they're aggregated across worker processes.
+        if config.metrics_multiprocess_dir is not None:
+            managers.append(self.metrics_manager())
+
         return Runner(
-            managers=[
-                self.fastapi_manager(),
-                self.sqlalchemy_manager(),
-            ],
+            managers=managers,
+            event_loop=config.event_loop,
+            setup_timeout=config.managers_setup_timeout,
+            teardown_timeout=config.managers_teardown_timeout,
+        )
+
+    @singleton
+    def supervisor(self) -> Supervisor:
+        config = self.config()
+        return Supervisor(
+            worker_target=partial(run_worker, type(self)),
+            worker_count=config.workers,
+            host=config.api_host,
+            port=config.api_port,
+            uds=config.api_uds,
+            backlog=config.api_backlog,
+            graceful_timeout=config.workers_graceful_timeout,
+            min_uptime=config.workers_min_uptime,
+            restart_backoff=config.workers_restart_backoff,
+            max_early_exits=config.workers_max_early_exits,
+            metrics_multiprocess_dir=config.metrics_multiprocess_dir,
+        )
+
+    @singleton
+    def metrics_registry(self) -> MetricsRegistry:
+        from python_webapp.core.metrics import MetricsRegistry
+
+        config = self.config()
+        return MetricsRegistry(multiprocess_dir=config.metrics_multiprocess_dir)
+
+    @singleton
+    def metrics_manager(self) -> MetricsManager:
+        from python_webapp.managers.metrics_manager import MetricsManager
+
+        config = self.config()
+        return MetricsManager(
+            metrics_registry=self.metrics_registry(),
+            flush_interval=config.metrics_flush_interval,
+        )
+
+    @singleton
+    def event_loop_monitor_manager(self) -> EventLoopMonitorManager:
+        from python_webapp.managers.event_loop_monitor_manager import EventLoopMonitorManager
+
+        config = self.config()
+        return EventLoopMonitorManager(
+            interval=config.event_loop_monitor_interval,
+            slow_callback_threshold=config.event_loop_monitor_slow_callback_threshold,
+            degraded_lag=config.event_loop_monitor_degraded_lag,
+            window=config.event_loop_monitor_window,
+            metrics_registry=self.metrics_registry(),
         )
 
     @singleton
     def fastapi_manager(self) -> FastAPIManager:
+        from python_webapp.apps.system.api.router import router as system_router
+        from python_webapp.apps.user_management.api.router import (
+            router as user_management_router,
+        )
+        from python_webapp.managers.fastapi_manager import FastAPIManager
+
         config = self.config()
         return FastAPIManager(
             root_container=self,
             debug=config.debug,
             host=config.api_host,
             port=config.api_port,
+            uds=config.api_uds,
+            http=config.api_http,
+            backlog=config.api_backlog,
+            limit_concurrency=config.api_limit_concurrency,
+            timeout_keep_alive=config.api_timeout_keep_alive,
+            access_log=config.api_access_log,
+            json_renderer=config.api_json_renderer,
+            openapi=config.api_openapi,
+            # API is served from database, so it's set up after and torn down before it.
+            depends_on=[self.sqlalchemy_manager()],
+            metrics_registry=self.metrics_registry(),
             title=config.api_title,
             summary=config.api_summary,
             description=config.api_description,
@@ -84,6 +194,11 @@ class AppRootContainer(RootContainer):
 
     @singleton
     def sqlalchemy_manager(self) -> SQLAlchemyManager:
+        from python_webapp.apps.user_management.repositories.db_models import (
+            Base as UserManagementDeclarativeBase,
+        )
+        from python_webapp.managers.sqlalchemy_manager import PostgresManager
+
         config = self.config()
         return PostgresManager(
             host=config.postgres_host,
@@ -91,6 +206,21 @@ class AppRootContainer(RootContainer):
             db_name=config.postgres_db_name,
             user=config.postgres_user,
             password=config.postgres_password,
+            pool_size=config.postgres_pool_size,
+            pool_max_overflow=config.postgres_pool_max_overflow,
+            pool_timeout=config.postgres_pool_timeout,
+            pool_recycle=config.postgres_pool_recycle,
+            pool_pre_ping=config.postgres_pool_pre_ping,
+            pool_use_lifo=config.postgres_pool_use_lifo,
+            health_probe_interval=config.postgres_health_probe_interval,
+            health_max_staleness=config.postgres_health_max_staleness,
+            migrate_on_setup=config.postgres_migrate_on_startup,
+            migrations_lock_id=config.postgres_migrations_lock_id,
+            query_cache_size=config.postgres_query_cache_size,
+            prepared_statements=config.postgres_prepared_statements,
+            prepare_threshold=config.postgres_prepare_threshold,
+            replica_urls=config.postgres_replica_urls,
+            metrics_registry=self.metrics_registry(),
             declarative_base_classes=[
                 UserManagementDeclarativeBase,
             ],
@@ -98,22 +228,93 @@ class AppRootContainer(RootContainer):
 
     @singleton
     def system_services(self) -> SystemServices:
+        from python_webapp.apps.system.services import SystemServices
+
+        health_reportables: list[HealthReportable] = [
+            self.event_loop_monitor_manager(),
+            self.fastapi_manager(),
+            self.sqlalchemy_manager(),
+        ]
+
+        user_repository = self.user_repository()
+        if isinstance(user_repository, HealthReportable):
+            health_reportables.append(user_repository)
+
+        config = self.config()
         return SystemServices(
-            config=self.config(),
-            health_reportables=[
-                self.fastapi_manager(),
-                self.sqlalchemy_manager(),
-            ],
+            config=config,
+            health_reportables=health_reportables,
+            health_report_timeout=config.health_report_timeout,
+            metrics_registry=self.metrics_registry(),
         )
 
     @singleton
     def user_repository(self) -> UserRepository:
-        return SQLAlchemyUserRepository(
+        from python_webapp.apps.user_management.repositories.user_repository import (
+            CachingUserRepository,
+            SQLAlchemyUserRepository,
+        )
+
+        config = self.config()
+        user_repository = SQLAlchemyUserRepository(
+            sqlalchemy_manager=self.sqlalchemy_manager(),
+            coalesce_get_by_id=config.user_repository_coalesce_get_by_id,
+            batch_max_size=config.user_repository_batch_max_size,
+            create_batch_window=config.user_repository_create_batch_window,
+            create_batch_max_size=config.user_repository_create_batch_max_size,
+            metrics_registry=self.metrics_registry(),
+        )
+
+        if not config.user_cache_enabled:
+            return user_repository
+
+        return CachingUserRepository(
+            user_repository=user_repository,
             sqlalchemy_manager=self.sqlalchemy_manager(),
+            max_size=config.user_cache_max_size,
+            ttl=config.user_cache_ttl,
+            negative_ttl=config.user_cache_negative_ttl,
+        )
+
+    @singleton
+    def user_statistics_tracker(self) -> UserStatisticsTracker:
+        from python_webapp.apps.user_management.statistics import UserStatisticsTracker
+
+        return UserStatisticsTracker(user_repository=self.user_repository())
+
+    @singleton
+    def user_statistics_manager(self) -> PeriodicTaskManager:
+        from python_webapp.managers.periodic_task_manager import PeriodicTaskManager
+
+        config = self.config()
+        return PeriodicTaskManager(
+            name="user statistics sync",
+            task=self.user_statistics_tracker().sync,
+            interval=config.user_management_statistics_sync_interval,
+            depends_on=[self.sqlalchemy_manager()],
         )
 
     @singleton
     def user_management_services(self) -> UserManagementServices:
+        from python_webapp.apps.user_management.services import UserManagementServices
+
+        config = self.config()
         return UserManagementServices(
             user_repository=self.user_repository(),
+            page_size=config.user_management_page_size,
+            max_page_size=config.user_management_max_page_size,
+            import_chunk_size=config.user_management_import_chunk_size,
+            import_max_reported_rows=config.user_management_import_max_reported_rows,
+            export_fetch_size=config.user_management_export_fetch_size,
+            user_statistics_tracker=self.user_statistics_tracker(),
         )
+
+
+def run_worker(container_class: type[RootContainer], sockets: list[socket.socket]) -> None:
+    """Run the application in a worker process started by supervisor.
+
+    Every worker builds its own container, so managers (and database pools) aren't shared.
+    """
+    container = container_class()
+    container.fastapi_manager().use_sockets(sockets)
+    container.runner().run()
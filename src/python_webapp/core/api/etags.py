@@ -0,0 +1,26 @@
+"""Helpers for conditional requests with entity tags (RFC 9110)."""
+from fastapi.responses import Response
+from starlette import status
+
+
+def make_etag(version: str) -> str:
+    """Make a strong entity tag of a representation version."""
+    return f'"{version}"'
+
+
+def is_not_modified(if_none_match: str | None, etag: str) -> bool:
+    """Check if any tag of an `If-None-Match` header matches the entity tag.
+
+    Tags are compared weakly (ignoring the `W/` prefix), as the header requires.
+    """
+    if if_none_match is None:
+        return False
+
+    if if_none_match.strip() == "*":
+        return True
+
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+
+def not_modified_response(etag: str) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
@@ -0,0 +1,61 @@
+import time
+
+from starlette import status
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from python_webapp.core.metrics import MetricsRegistry
+
+
+class MetricsMiddleware:
+    """ASGI middleware which records request counts, durations and requests in flight.
+
+    Requests are labeled with the path template of their route (e.g. `/api/v1/users/{id}`) instead
+    of the actual path, so the number of label values stays bounded.
+    """
+
+    def __init__(self, app: ASGIApp, metrics_registry: MetricsRegistry) -> None:
+        self.app = app
+
+        self._requests_total = metrics_registry.counter(
+            "http_requests_total",
+            "Number of handled HTTP requests.",
+            ("method", "route", "status"),
+        )
+        self._request_duration = metrics_registry.histogram(
+            "http_request_duration_seconds",
+            "Duration of handling HTTP requests, until the whole response is sent.",
+            ("method", "route"),
+        )
+        self._requests_in_flight = metrics_registry.gauge(
+            "http_requests_in_flight",
+            "Number of HTTP requests being handled.",
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        # Requests failing before the response is started are answered with 500.
+        status_code = status.HTTP_500_INTERNAL_SERVER_ERROR
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+
+            await send(message)
+
+        self._requests_in_flight.inc()
+        started_at = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            duration = time.perf_counter() - started_at
+            self._requests_in_flight.dec()
+
+            # Route is added to the scope by the router, it's missing if no route matched.
+            route = getattr(scope.get("route"), "path", "unmatched")
+            method = scope["method"]
+            self._requests_total.inc(method, route, str(status_code))
+            self._request_duration.observe(method, route, value=duration)
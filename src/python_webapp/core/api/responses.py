@@ -0,0 +1,19 @@
+from fastapi.responses import Response
+from pydantic import BaseModel
+
+
+class ModelResponse(Response):
+    """JSON response rendered straight from an already validated pydantic model.
+
+    Returning a response object makes FastAPI skip validating the return value against the
+    response model and running it through `jsonable_encoder`, and pydantic-core serializes the
+    model to JSON bytes in one pass. Set `response_model` on the route to keep the OpenAPI schema.
+    """
+
+    media_type = "application/json"
+
+    def render(self, content: object) -> bytes:
+        if isinstance(content, BaseModel):
+            return content.__pydantic_serializer__.to_json(content)
+
+        return super().render(content)
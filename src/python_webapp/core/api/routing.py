@@ -0,0 +1,44 @@
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from fastapi.requests import Request
+from fastapi.responses import Response
+from fastapi.routing import APIRoute
+
+BeforeResponseCallback = Callable[[], Awaitable[None]]
+
+
+def call_before_response(request: Request, callback: BeforeResponseCallback) -> None:
+    """Await `callback` after the route handler returns, before the response is sent.
+
+    Code after `yield` in dependencies only runs once the response is sent, so e.g. a commit
+    failing there can't change the response anymore. The route has to be a `BeforeResponseRoute`.
+    """
+    callbacks: list[BeforeResponseCallback] | None = getattr(
+        request.state,
+        "before_response_callbacks",
+        None,
+    )
+    if callbacks is None:
+        callbacks = request.state.before_response_callbacks = []
+
+    callbacks.append(callback)
+
+
+class BeforeResponseRoute(APIRoute):
+    """Route which awaits callbacks registered by `call_before_response` before responding.
+
+    If a callback fails, the error is handled like an error of the route handler.
+    """
+
+    def get_route_handler(self) -> Callable[[Request], Any]:
+        route_handler = super().get_route_handler()
+
+        async def handle_with_callbacks(request: Request) -> Response:
+            response = await route_handler(request)
+            for callback in getattr(request.state, "before_response_callbacks", ()):
+                await callback()
+
+            return response
+
+        return handle_with_callbacks
@@ -0,0 +1,165 @@
+import asyncio
+import contextvars
+from collections.abc import Awaitable, Callable, Coroutine, Hashable, Mapping
+from functools import partial
+from typing import Any, Generic, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class BatchLoader(Generic[K, V]):
+    """Loader which folds concurrent loads by key into batches (DataLoader style).
+
+    Keys requested within the same event loop iteration are loaded with a single `load_batch` call
+    (split into batches of at most `max_batch_size`), and concurrent loads of the same key share a
+    single lookup. Nothing is cached once a batch is loaded.
+
+    Batches run in an empty context, so they don't join the unit of work (or any other context
+    variable) of whichever caller happened to come first.
+    """
+
+    def __init__(
+        self,
+        load_batch: Callable[[list[K]], Awaitable[Mapping[K, V]]],
+        max_batch_size: int = 100,
+    ) -> None:
+        self.load_batch = load_batch
+        self.max_batch_size = max_batch_size
+
+        self._pending: dict[K, asyncio.Future[V | None]] = {}
+        self._in_flight: dict[K, asyncio.Future[V | None]] = {}
+        self._tasks: set[asyncio.Task[Mapping[K, V]]] = set()
+
+    async def load(self, key: K) -> V | None:
+        """Load value of the key, `None` if `load_batch` didn't return it."""
+        future = self._in_flight.get(key) or self._pending.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            if not self._pending:
+                loop.call_soon(self._dispatch, context=contextvars.Context())
+
+            future = self._pending[key] = loop.create_future()
+
+        # Shielded, so a cancelled caller doesn't cancel the load for everyone else waiting on it.
+        return await asyncio.shield(future)
+
+    def _dispatch(self) -> None:
+        pending, self._pending = self._pending, {}
+        keys = list(pending)
+        for start in range(0, len(keys), self.max_batch_size):
+            batch = {key: pending[key] for key in keys[start : start + self.max_batch_size]}
+            self._in_flight.update(batch)
+
+            task = asyncio.create_task(self._load_batch(list(batch)))
+            # Event loop only keeps weak references to tasks.
+            self._tasks.add(task)
+            task.add_done_callback(partial(self._resolve, batch))
+
+    async def _load_batch(self, keys: list[K]) -> Mapping[K, V]:
+        return await self.load_batch(keys)
+
+    def _resolve(
+        self,
+        batch: dict[K, asyncio.Future[V | None]],
+        task: asyncio.Task[Mapping[K, V]],
+    ) -> None:
+        self._tasks.discard(task)
+        for key, future in batch.items():
+            if self._in_flight.get(key) is future:
+                del self._in_flight[key]
+
+            if future.done():
+                continue
+
+            if task.cancelled():
+                future.cancel()
+            elif (exception := task.exception()) is not None:
+                future.set_exception(exception)
+            else:
+                future.set_result(task.result().get(key))
+
+
+class BatchWriter(Generic[T, R]):
+    """Writer which collects concurrent writes and writes them in batches (write-behind).
+
+    A batch is written once it has `max_batch_size` items or `max_delay` seconds after its first
+    item, whichever comes first. Every caller waits until its batch is written and gets its own
+    result, `write_batch` has to return results in the order of the items.
+
+    Batches run in an empty context, like in `BatchLoader`. A cancelled caller's item is still
+    written, `close` writes the pending items right away and waits for all batches.
+    """
+
+    def __init__(
+        self,
+        write_batch: Callable[[list[T]], Coroutine[Any, Any, list[R]]],
+        max_delay: float,
+        max_batch_size: int = 100,
+    ) -> None:
+        self.write_batch = write_batch
+        self.max_delay = max_delay
+        self.max_batch_size = max_batch_size
+
+        self._items: list[T] = []
+        self._futures: list[asyncio.Future[R]] = []
+        self._flush_handle: asyncio.TimerHandle | None = None
+        self._tasks: set[asyncio.Task[list[R]]] = set()
+
+    async def write(self, item: T) -> R:
+        """Write the item with the next batch and return its result."""
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future[R] = loop.create_future()
+        self._items.append(item)
+        self._futures.append(future)
+
+        if len(self._items) >= self.max_batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.max_delay, self._flush)
+
+        return await asyncio.shield(future)
+
+    async def close(self) -> None:
+        """Write the pending items without waiting for `max_delay` and wait for all batches."""
+        if self._items:
+            self._flush()
+
+        # Errors are passed to the callers of `write`.
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def _flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        items, futures = self._items, self._futures
+        self._items, self._futures = [], []
+
+        task: asyncio.Task[list[R]] = asyncio.create_task(
+            self.write_batch(items),
+            context=contextvars.Context(),
+        )
+        # Event loop only keeps weak references to tasks.
+        self._tasks.add(task)
+        task.add_done_callback(partial(self._resolve, futures))
+
+    def _resolve(self, futures: list[asyncio.Future[R]], task: asyncio.Task[list[R]]) -> None:
+        self._tasks.discard(task)
+        if task.cancelled():
+            for future in futures:
+                future.cancel()
+            return
+
+        exception = task.exception()
+        if exception is not None:
+            for future in futures:
+                if not future.done():
+                    future.set_exception(exception)
+            return
+
+        for future, result in zip(futures, task.result(), strict=True):
+            if not future.done():
+                future.set_result(result)
@@ -0,0 +1,21 @@
+import importlib
+from types import ModuleType
+
+DISTRIBUTION_NAME = "python-webapp-template"
+
+
+def require_extra(module_name: str, extra: str) -> ModuleType:
+    """Import a module of an optional extra, with an error telling how to install it if missing.
+
+    Meant to be called on startup when an option needing the extra is selected, so a missing
+    package fails the app right away instead of on the first use.
+    """
+    try:
+        return importlib.import_module(module_name)
+    except ImportError as e:
+        raise ImportError(
+            f"`{module_name}` is required by the selected options but isn't installed, install the "
+            f"`{extra}` extra (e.g. `pip install {DISTRIBUTION_NAME}[{extra}]` or "
+            f"`poetry install --extras {extra}`).",
+            name=module_name,
+        ) from e
@@ -1,4 +1,6 @@
 from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import ClassVar
 
 from pydantic import BaseModel
 
@@ -6,9 +8,14 @@ from pydantic import BaseModel
 class HealthReport(BaseModel):
     component: str
     is_healthy: bool
+    latency_ms: float | None = None
+    checked_at: datetime | None = None
+    details: dict[str, int | float | str | bool] = {}
 
 
 class HealthReportable(ABC):
+    component: ClassVar[str]
+
     @abstractmethod
     async def get_health_report(self) -> HealthReport:
         pass
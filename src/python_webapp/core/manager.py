@@ -1,14 +1,18 @@
 from abc import ABC, abstractmethod
+from collections.abc import Sequence
 
 
 class Manager(ABC):
+    depends_on: Sequence["Manager"] = ()
+    """Managers which are set up before and torn down after this manager."""
+
     @abstractmethod
     async def setup(self) -> None:
         pass
 
     @abstractmethod
     async def run(self) -> None:
-        pass
+        """Run the manager, returning from it stops the whole application."""
 
     @abstractmethod
     async def teardown(self) -> None:
@@ -0,0 +1,297 @@
+"""Metrics in Prometheus text exposition format.
+
+Every metric keeps its values per label values as a list of floats (a single value for counters and
+gauges, bucket counts followed by sum and count for histograms), so values of different processes
+can be merged by adding them up.
+
+In multi-process mode every process writes a snapshot of its metrics to a shared directory and
+rendering merges snapshots of all processes. Counters and histograms of exited processes are kept,
+so totals don't go backwards when a worker is restarted, but their gauges are dropped.
+"""
+import json
+import logging
+import math
+import os
+from bisect import bisect_left
+from collections.abc import Callable, Iterator, Sequence
+from pathlib import Path
+from typing import ClassVar, Final, TypeVar
+
+logger = logging.getLogger(__name__)
+
+LabelValues = tuple[str, ...]
+M = TypeVar("M", bound="Metric")
+
+CONTENT_TYPE: Final[str] = "text/plain; version=0.0.4"
+
+DEFAULT_BUCKETS: Final[tuple[float, ...]] = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+
+class Metric:
+    """Base of all metric types."""
+
+    type: ClassVar[str]
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+
+        self.values: dict[LabelValues, list[float]] = {}
+
+    def _get_values(self, label_values: LabelValues) -> list[float]:
+        values = self.values.get(label_values)
+        if values is None:
+            if len(label_values) != len(self.label_names):
+                raise ValueError(
+                    f"Metric `{self.name}` has labels {self.label_names}, got {label_values}!",
+                )
+
+            values = self.values[label_values] = self._initial_values()
+
+        return values
+
+    def _initial_values(self) -> list[float]:
+        return [0.0]
+
+    def render(self, values: dict[LabelValues, list[float]]) -> Iterator[str]:
+        for label_values, (value,) in sorted(values.items()):
+            yield f"{self.name}{_format_labels(self.label_names, label_values)} {_format(value)}"
+
+
+class Counter(Metric):
+    """Metric which only goes up, e.g. number of handled requests."""
+
+    type = "counter"
+
+    def inc(self, *label_values: str, amount: float = 1.0) -> None:
+        self._get_values(label_values)[0] += amount
+
+
+class Gauge(Metric):
+    """Metric which goes up and down, e.g. number of requests in flight."""
+
+    type = "gauge"
+
+    def set(self, *label_values: str, value: float) -> None:
+        self._get_values(label_values)[0] = value
+
+    def inc(self, *label_values: str, amount: float = 1.0) -> None:
+        self._get_values(label_values)[0] += amount
+
+    def dec(self, *label_values: str, amount: float = 1.0) -> None:
+        self._get_values(label_values)[0] -= amount
+
+
+class Histogram(Metric):
+    """Metric which counts observations in buckets, e.g. request durations."""
+
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        label_names: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name=name, documentation=documentation, label_names=label_names)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, *label_values: str, value: float) -> None:
+        values = self._get_values(label_values)
+        # Index of the first bucket with upper bound not less than the value, `+Inf` bucket if none.
+        values[bisect_left(self.buckets, value)] += 1
+        values[-2] += value
+        values[-1] += 1
+
+    def _initial_values(self) -> list[float]:
+        # Non-cumulative bucket counts (plus `+Inf`), sum and count.
+        return [0.0] * (len(self.buckets) + 3)
+
+    def render(self, values: dict[LabelValues, list[float]]) -> Iterator[str]:
+        for label_values, histogram_values in sorted(values.items()):
+            *bucket_counts, total, count = histogram_values
+            cumulative_count = 0.0
+            for upper_bound, bucket_count in zip(
+                (*self.buckets, math.inf),
+                bucket_counts,
+                strict=True,
+            ):
+                cumulative_count += bucket_count
+                labels = _format_labels(
+                    (*self.label_names, "le"),
+                    (*label_values, _format(upper_bound)),
+                )
+                yield f"{self.name}_bucket{labels} {_format(cumulative_count)}"
+
+            labels = _format_labels(self.label_names, label_values)
+            yield f"{self.name}_sum{labels} {_format(total)}"
+            yield f"{self.name}_count{labels} {_format(count)}"
+
+
+class MetricsRegistry:
+    """Registry of all metrics of the application."""
+
+    def __init__(self, multiprocess_dir: str | None = None) -> None:
+        self.multiprocess_dir = Path(multiprocess_dir) if multiprocess_dir is not None else None
+
+        self._metrics: dict[str, Metric] = {}
+        self._collectors: list[Callable[[], None]] = []
+
+    def counter(self, name: str, documentation: str, label_names: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, label_names))
+
+    def gauge(self, name: str, documentation: str, label_names: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, label_names))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        label_names: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, label_names, buckets))
+
+    def add_collector(self, collector: Callable[[], None]) -> None:
+        """Add a callback which updates metrics (e.g. gauges of pool sizes) before they're read."""
+        self._collectors.append(collector)
+
+    def write_snapshot(self) -> None:
+        """Write metrics of this process to the multi-process directory."""
+        if self.multiprocess_dir is None:
+            return
+
+        self._collect()
+        snapshot = {
+            name: [[list(label_values), values] for label_values, values in metric.values.items()]
+            for name, metric in self._metrics.items()
+        }
+
+        # Written to a temporary file first, so readers never see a partially written snapshot.
+        self.multiprocess_dir.mkdir(parents=True, exist_ok=True)
+        path = self.multiprocess_dir / f"{os.getpid()}.json"
+        temp_path = path.with_suffix(".tmp")
+        temp_path.write_text(json.dumps(snapshot))
+        temp_path.replace(path)
+
+    def render(self) -> str:
+        """Render metrics in Prometheus text format, merged across processes if multi-process."""
+        if self.multiprocess_dir is None:
+            self._collect()
+            merged = {name: metric.values for name, metric in self._metrics.items()}
+        else:
+            self.write_snapshot()
+            merged = self._read_snapshots()
+
+        lines = []
+        for name, metric in self._metrics.items():
+            lines.append(f"# HELP {name} {metric.documentation}")
+            lines.append(f"# TYPE {name} {metric.type}")
+            lines.extend(metric.render(merged.get(name, {})))
+
+        return "\n".join(lines) + "\n"
+
+    def _register(self, metric: M) -> M:
+        # Registering the same metric again returns the existing one, so components can be set up
+        # multiple times.
+        existing_metric = self._metrics.get(metric.name)
+        if existing_metric is None:
+            self._metrics[metric.name] = metric
+            return metric
+
+        if (
+            not isinstance(existing_metric, type(metric))
+            or existing_metric.label_names != metric.label_names
+        ):
+            raise ValueError(f"Metric `{metric.name}` is already registered with another type!")
+
+        return existing_metric
+
+    def _collect(self) -> None:
+        for collector in self._collectors:
+            collector()
+
+    def _read_snapshots(self) -> dict[str, dict[LabelValues, list[float]]]:
+        assert self.multiprocess_dir is not None
+
+        merged: dict[str, dict[LabelValues, list[float]]] = {}
+        for path in self.multiprocess_dir.glob("*.json"):
+            try:
+                snapshot = json.loads(path.read_text())
+            except (OSError, ValueError):
+                logger.warning("Reading metrics snapshot `%s` failed", path, exc_info=True)
+                continue
+
+            is_alive = _is_process_alive(int(path.stem))
+            for name, samples in snapshot.items():
+                metric = self._metrics.get(name)
+                if metric is None or (isinstance(metric, Gauge) and not is_alive):
+                    continue
+
+                metric_values = merged.setdefault(name, {})
+                for label_values, values in samples:
+                    _add_values(metric_values, tuple(label_values), values)
+
+        return merged
+
+
+def _add_values(
+    metric_values: dict[LabelValues, list[float]],
+    label_values: LabelValues,
+    values: list[float],
+) -> None:
+    existing_values = metric_values.get(label_values)
+    if existing_values is None or len(existing_values) != len(values):
+        metric_values[label_values] = list(values)
+        return
+
+    for index, value in enumerate(values):
+        existing_values[index] += value
+
+
+def _is_process_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+
+    return True
+
+
+def _format_labels(label_names: Sequence[str], label_values: Sequence[str]) -> str:
+    if not label_names:
+        return ""
+
+    labels = ",".join(
+        f'{name}="{_escape(value)}"' for name, value in zip(label_names, label_values, strict=True)
+    )
+    return f"{{{labels}}}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+
+    return repr(float(value))
@@ -0,0 +1,191 @@
+import asyncio
+import faulthandler
+import logging
+import tempfile
+import threading
+import time
+from collections import deque
+
+from python_webapp.core.health import HealthReport, HealthReportable
+from python_webapp.core.manager import Manager
+from python_webapp.core.metrics import MetricsRegistry
+
+logger = logging.getLogger(__name__)
+
+
+class SlowCallback:
+    """Callback which blocked the event loop, with the stack it was blocked at."""
+
+    def __init__(self, blocked_for: float, stack: str) -> None:
+        self.blocked_for = blocked_for
+        self.stack = stack
+
+
+class EventLoopMonitorManager(HealthReportable, Manager):
+    """Manager which measures event loop lag and catches callbacks blocking the event loop.
+
+    Lag is how late a sleep of `interval` wakes up. Blocking callbacks can't be caught from the
+    event loop itself, so a watchdog thread dumps the stack of the event loop thread when it
+    hasn't woken up `slow_callback_threshold` after it should have. Code holding the GIL (e.g. a
+    C extension) blocks the watchdog too, it's caught late, when the GIL is released.
+    """
+
+    component = "event_loop"
+
+    def __init__(
+        self,
+        interval: float = 0.25,
+        slow_callback_threshold: float = 0.1,
+        degraded_lag: float = 0.25,
+        window: float = 10.0,
+        max_slow_callbacks: int = 10,
+        metrics_registry: MetricsRegistry | None = None,
+    ) -> None:
+        self.interval = interval
+        self.slow_callback_threshold = slow_callback_threshold
+        self.degraded_lag = degraded_lag
+        self.window = window
+        self.max_slow_callbacks = max_slow_callbacks
+        self.metrics_registry = metrics_registry
+
+        self._is_setup = False
+        self._loop_thread_id = 0
+        self._heartbeat = 0.0
+        self._lags: deque[float] = deque(maxlen=max(int(window / interval), 1))
+        self._slow_callbacks: deque[SlowCallback] = deque(maxlen=max_slow_callbacks)
+        self._slow_callback_count = 0
+        self._should_stop_watchdog = threading.Event()
+        self._watchdog: threading.Thread | None = None
+
+        if self.metrics_registry is not None:
+            self._lag_histogram = self.metrics_registry.histogram(
+                "event_loop_lag_seconds",
+                "How late the event loop wakes up from a sleep.",
+            )
+            self._slow_callbacks_total = self.metrics_registry.counter(
+                "event_loop_slow_callbacks_total",
+                "Number of callbacks which blocked the event loop.",
+            )
+            # Counted from the watchdog thread, so it's created here instead of on first stall.
+            self._slow_callbacks_total.inc(amount=0)
+
+    async def setup(self) -> None:
+        """Start the watchdog thread."""
+        logger.info("Setting up `EventLoopMonitorManager`")
+        if self._is_setup:
+            logger.warning("Setup is called multiple times!")
+            return
+
+        self._loop_thread_id = threading.get_ident()
+        self._should_stop_watchdog.clear()
+        self._watchdog = threading.Thread(
+            target=self._watch,
+            name="event-loop-watchdog",
+            daemon=True,
+        )
+        self._watchdog.start()
+
+        self._is_setup = True
+
+    async def run(self) -> None:
+        """Measure event loop lag continuously."""
+        self._heartbeat = time.monotonic()
+        try:
+            while True:
+                started_at = time.monotonic()
+                await asyncio.sleep(self.interval)
+                self._heartbeat = time.monotonic()
+
+                lag = max(self._heartbeat - started_at - self.interval, 0.0)
+                self._lags.append(lag)
+                if self.metrics_registry is not None:
+                    self._lag_histogram.observe(value=lag)
+        finally:
+            # Watchdog only watches while lag is measured, setup and teardown may take long.
+            self._heartbeat = 0.0
+
+    async def teardown(self) -> None:
+        """Stop the watchdog thread."""
+        logger.info("Tearing down `EventLoopMonitorManager`")
+        if not self._is_setup:
+            logger.warning("Teardown is called before setup!")
+            return
+
+        self._should_stop_watchdog.set()
+        if self._watchdog is not None:
+            await asyncio.to_thread(self._watchdog.join)
+            self._watchdog = None
+
+        self._is_setup = False
+
+    async def get_health_report(self) -> HealthReport:
+        """Get event loop health report, which is degraded if the loop lagged recently.
+
+        It's unhealthy if the max lag of the samples taken in the last `window` seconds is more
+        than `degraded_lag`. Stacks of slow callbacks are only logged (and kept for
+        `get_slow_callbacks`), they aren't exposed in the report, which may be public.
+        """
+        if not self._is_setup:
+            return HealthReport(
+                component=self.component,
+                is_healthy=False,
+            )
+
+        max_lag = max(self._lags, default=0.0)
+        details: dict[str, int | float | str | bool] = {
+            "lag_ms": self._lags[-1] * 1000 if self._lags else 0.0,
+            "max_lag_ms": max_lag * 1000,
+            "slow_callbacks": self._slow_callback_count,
+        }
+        if self._slow_callbacks:
+            last_slow_callback = self._slow_callbacks[-1]
+            details["last_slow_callback_ms"] = last_slow_callback.blocked_for * 1000
+
+        return HealthReport(
+            component=self.component,
+            is_healthy=max_lag <= self.degraded_lag,
+            details=details,
+        )
+
+    def get_slow_callbacks(self) -> list[SlowCallback]:
+        """Get the latest callbacks which blocked the event loop, oldest first."""
+        return list(self._slow_callbacks)
+
+    def _watch(self) -> None:
+        is_reported = False
+        while not self._should_stop_watchdog.wait(self.slow_callback_threshold / 2):
+            heartbeat = self._heartbeat
+            blocked_for = time.monotonic() - heartbeat - self.interval
+            if not heartbeat or blocked_for <= self.slow_callback_threshold:
+                is_reported = False
+                continue
+
+            # Every stall is reported once, with the stack it was first caught at.
+            if is_reported:
+                continue
+
+            is_reported = True
+            stack = self._dump_loop_thread_stack()
+            self._slow_callbacks.append(SlowCallback(blocked_for=blocked_for, stack=stack))
+            self._slow_callback_count += 1
+            if self.metrics_registry is not None:
+                self._slow_callbacks_total.inc()
+
+            logger.warning(
+                "Event loop is blocked for more than %.1fms at:\n%s",
+                blocked_for * 1000,
+                stack,
+            )
+
+    def _dump_loop_thread_stack(self) -> str:
+        with tempfile.TemporaryFile(mode="w+") as file:
+            faulthandler.dump_traceback(file, all_threads=True)
+            file.seek(0)
+            dump = file.read()
+
+        thread_header = f"Thread 0x{self._loop_thread_id:016x}"
+        for thread_dump in dump.split("\n\n"):
+            if thread_dump.startswith(thread_header):
+                return thread_dump.strip()
+
+        return dump.strip()
@@ -1,15 +1,21 @@
 import logging
+import socket
+from collections.abc import Sequence
 
 import uvicorn
 from fastapi import APIRouter, FastAPI
 from fastapi.requests import Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse
+from uvicorn.config import HTTPProtocolType
 
 from python_webapp.core.api.api_models import ErrorResponse
+from python_webapp.core.api.middlewares import MetricsMiddleware
 from python_webapp.core.di import Container
 from python_webapp.core.errors import AppError
+from python_webapp.core.extras import require_extra
 from python_webapp.core.health import HealthReport, HealthReportable
 from python_webapp.core.manager import Manager
+from python_webapp.core.metrics import MetricsRegistry
 
 logger = logging.getLogger(__name__)
 
@@ -17,6 +23,8 @@ logger = logging.getLogger(__name__)
 class FastAPIManager(HealthReportable, Manager):
     """Manager class for API server using `FastAPI` library."""
 
+    component = "api"
+
     def __init__(
         self,
         root_container: Container,
@@ -28,6 +36,16 @@ class FastAPIManager(HealthReportable, Manager):
         host: str,
         port: int,
         routers: list[APIRouter],
+        uds: str | None = None,
+        http: HTTPProtocolType = "auto",
+        backlog: int = 2048,
+        limit_concurrency: int | None = None,
+        timeout_keep_alive: int = 5,
+        access_log: bool = True,
+        json_renderer: str = "json",
+        openapi: str = "lazy",
+        depends_on: Sequence[Manager] = (),
+        metrics_registry: MetricsRegistry | None = None,
     ) -> None:
         self.root_container = root_container
         self.debug = debug
@@ -38,8 +56,19 @@ class FastAPIManager(HealthReportable, Manager):
         self.host = host
         self.port = port
         self.routers = routers
+        self.uds = uds
+        self.http = http
+        self.backlog = backlog
+        self.limit_concurrency = limit_concurrency
+        self.timeout_keep_alive = timeout_keep_alive
+        self.access_log = access_log
+        self.json_renderer = json_renderer
+        self.openapi = openapi
+        self.depends_on = depends_on
+        self.metrics_registry = metrics_registry
 
         self._is_setup = False
+        self._sockets: list[socket.socket] | None = None
         self._app: FastAPI = None  # type: ignore
         self._uvicorn_server: uvicorn.Server = None  # type: ignore
 
@@ -50,6 +79,11 @@ class FastAPIManager(HealthReportable, Manager):
             logger.warning("Setup is called multiple times!")
             return
 
+        if self.json_renderer == "orjson":
+            require_extra("orjson", extra="orjson")
+        if self.http == "httptools":
+            require_extra("httptools", extra="httptools")
+
         logger.debug("- Setting up fastapi app")
         self._app = self._create_fastapi_app()
 
@@ -63,7 +97,7 @@ class FastAPIManager(HealthReportable, Manager):
         if not self._is_setup:
             raise Exception("Run is called before setup!")
 
-        await self._uvicorn_server.serve()
+        await self._uvicorn_server.serve(sockets=self._sockets)
 
     async def teardown(self) -> None:
         """Stop and teardown API server."""
@@ -77,6 +111,15 @@ class FastAPIManager(HealthReportable, Manager):
 
         self._is_setup = False
 
+    def stop(self) -> None:
+        """Ask the API server to gracefully shut down, which makes `run` return."""
+        if self._is_setup:
+            self._uvicorn_server.should_exit = True
+
+    def use_sockets(self, sockets: list[socket.socket]) -> None:
+        """Serve on already bound sockets (e.g. inherited from supervisor) instead of host/port."""
+        self._sockets = sockets
+
     async def get_health_report(self) -> HealthReport:
         """Get API health report."""
         is_healthy = True
@@ -85,7 +128,7 @@ class FastAPIManager(HealthReportable, Manager):
             is_healthy = False
 
         return HealthReport(
-            component="api",
+            component=self.component,
             is_healthy=is_healthy,
         )
 
@@ -96,15 +139,27 @@ class FastAPIManager(HealthReportable, Manager):
             summary=self.summary,
             description=self.description,
             version=self.version,
+            default_response_class=ORJSONResponse
+            if self.json_renderer == "orjson"
+            else JSONResponse,
+            # Docs routes are only added when OpenAPI schema is served.
+            openapi_url=None if self.openapi == "disabled" else "/openapi.json",
         )
 
         for router in self.routers:
             app.include_router(router=router)
 
+        if self.openapi == "precompute":
+            # Schema is cached on the app, so the first docs request doesn't have to build it.
+            app.openapi()
+
         app.state.root_container = self.root_container
 
         app.add_exception_handler(AppError, self._app_error_handler)
 
+        if self.metrics_registry is not None:
+            app.add_middleware(MetricsMiddleware, metrics_registry=self.metrics_registry)
+
         return app
 
     def _create_uvicorn_server(self) -> uvicorn.Server:
@@ -112,6 +167,12 @@ class FastAPIManager(HealthReportable, Manager):
             app=self._app,
             host=self.host,
             port=self.port,
+            uds=self.uds,
+            http=self.http,
+            backlog=self.backlog,
+            limit_concurrency=self.limit_concurrency,
+            timeout_keep_alive=self.timeout_keep_alive,
+            access_log=self.access_log,
         )
         return uvicorn.Server(config=uvicorn_config)
 
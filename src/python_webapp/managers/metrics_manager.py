@@ -0,0 +1,38 @@
+import asyncio
+import logging
+
+from python_webapp.core.manager import Manager
+from python_webapp.core.metrics import MetricsRegistry
+
+logger = logging.getLogger(__name__)
+
+
+class MetricsManager(Manager):
+    """Manager which periodically writes metrics of this process, so they can be aggregated.
+
+    Metrics of every worker process are written to the multi-process directory, the worker which
+    serves a scrape merges all of them.
+    """
+
+    def __init__(self, metrics_registry: MetricsRegistry, flush_interval: float = 5.0) -> None:
+        self.metrics_registry = metrics_registry
+        self.flush_interval = flush_interval
+
+    async def setup(self) -> None:
+        """Write the initial metrics snapshot."""
+        logger.info("Setting up `MetricsManager`")
+        self.metrics_registry.write_snapshot()
+
+    async def run(self) -> None:
+        """Write metrics snapshot periodically in background."""
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                self.metrics_registry.write_snapshot()
+            except OSError:
+                logger.exception("Writing metrics snapshot failed")
+
+    async def teardown(self) -> None:
+        """Write the final metrics snapshot, so counters of this process outlive it."""
+        logger.info("Tearing down `MetricsManager`")
+        self.metrics_registry.write_snapshot()
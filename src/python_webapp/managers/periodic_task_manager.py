@@ -0,0 +1,42 @@
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable, Sequence
+
+from python_webapp.core.manager import Manager
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicTaskManager(Manager):
+    """Manager which runs a task periodically in background.
+
+    The first run is after `interval`, so starting many workers at once doesn't run the task in all
+    of them at the same time. Failed runs are logged and retried in the next period.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        task: Callable[[], Awaitable[None]],
+        interval: float,
+        depends_on: Sequence[Manager] = (),
+    ) -> None:
+        self.name = name
+        self.task = task
+        self.interval = interval
+        self.depends_on = depends_on
+
+    async def setup(self) -> None:
+        logger.info("Setting up `PeriodicTaskManager` of `%s`", self.name)
+
+    async def run(self) -> None:
+        """Run the task every `interval` seconds."""
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.task()
+            except Exception:
+                logger.exception("Periodic task `%s` failed", self.name)
+
+    async def teardown(self) -> None:
+        logger.info("Tearing down `PeriodicTaskManager` of `%s`", self.name)
@@ -1,38 +1,240 @@
+import asyncio
 import logging
+import re
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from datetime import UTC, datetime
+from functools import cache, lru_cache, partial
 from pathlib import Path
+from typing import Any, Final
 
-from alembic.command import upgrade
-from alembic.config import Config as AlembicConfig
-from sqlalchemy import Connection, text
-from sqlalchemy.exc import OperationalError
+from sqlalchemy import (
+    AsyncAdaptedQueuePool,
+    Connection,
+    NullPool,
+    PoolProxiedConnection,
+    event,
+    inspect,
+    text,
+)
+from sqlalchemy.engine.interfaces import CacheStats, ExceptionContext
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from sqlalchemy.ext.asyncio import (
+    AsyncConnection,
     AsyncEngine,
     AsyncSession,
     async_sessionmaker,
     create_async_engine,
 )
 from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.pool import ConnectionPoolEntry
+from sqlalchemy.util.queue import AsyncAdaptedQueue
 
 from python_webapp.core.health import HealthReport, HealthReportable
 from python_webapp.core.manager import Manager
+from python_webapp.core.metrics import MetricsRegistry
 
 logger = logging.getLogger(__name__)
 
+MIGRATIONS_PATH: Final[Path] = Path(__file__).parent.parent / "migrations"
+ALEMBIC_INI_PATH: Final[Path] = Path(__file__).parent.parent.parent.parent / "alembic.ini"
+DEFAULT_MIGRATIONS_LOCK_ID: Final[int] = 0x70795F6D6967  # "py_mig"
+
+_REVISION_PATTERN = re.compile(r"^revision(?:\s*:[^=]*)?\s*=\s*[\"']([^\"']+)[\"']", re.MULTILINE)
+_DOWN_REVISION_PATTERN = re.compile(r"^down_revision(?:\s*:[^=]*)?\s*=(.*)$", re.MULTILINE)
+_QUOTED_PATTERN = re.compile(r"[\"']([^\"']+)[\"']")
+
+MAX_STATEMENT_LABEL_LENGTH: Final[int] = 200
+_STATEMENT_STARTED_AT_KEY: Final[str] = "python_webapp_statement_started_at"
+_PLACEHOLDER = r"(?:%\(\w+\)s|%s|\?|\$\d+|:\w+)"
+_PLACEHOLDER_LIST_PATTERN = re.compile(rf"\(\s*{_PLACEHOLDER}(?:\s*,\s*{_PLACEHOLDER})*\s*\)")
+_REPEATED_PLACEHOLDER_LIST_PATTERN = re.compile(r"\(\.\.\.\)(?:\s*,\s*\(\.\.\.\))+")
+_WHITESPACE_PATTERN = re.compile(r"\s+")
+
+
+@cache
+def get_head_revisions(versions_path: Path = MIGRATIONS_PATH / "versions") -> frozenset[str]:
+    """Get head revisions by reading identifiers from revision scripts, without importing them.
+
+    This is a lot cheaper than loading the script directory with Alembic, so it can be done on
+    every start.
+    """
+    revisions = set()
+    down_revisions = set()
+    for script_path in versions_path.glob("*.py"):
+        source = script_path.read_text()
+        revision = _REVISION_PATTERN.search(source)
+        down_revision = _DOWN_REVISION_PATTERN.search(source)
+        if revision is None or down_revision is None:
+            continue
+
+        revisions.add(revision.group(1))
+        down_revisions.update(_QUOTED_PATTERN.findall(down_revision.group(1)))
+
+    return frozenset(revisions - down_revisions)
+
+
+@lru_cache(maxsize=1024)
+def get_statement_label(statement: str) -> str:
+    """Get metrics label of a SQL statement.
+
+    Lists of placeholders (e.g. expanded `IN` parameters or rows of a multi-row insert) are
+    collapsed, so the same statement gets the same label regardless of the number of parameters.
+    """
+    label = _PLACEHOLDER_LIST_PATTERN.sub("(...)", statement)
+    label = _REPEATED_PLACEHOLDER_LIST_PATTERN.sub("(...)", label)
+    label = _WHITESPACE_PATTERN.sub(" ", label).strip()
+    return label[:MAX_STATEMENT_LABEL_LENGTH]
+
+
+class InstrumentedAsyncQueue(AsyncAdaptedQueue[ConnectionPoolEntry]):
+    """Queue of idle pooled connections which keeps track of time spent waiting for one."""
+
+    total_wait_time: float = 0.0
+    max_wait_time: float = 0.0
+
+    def get(self, block: bool = True, timeout: float | None = None) -> ConnectionPoolEntry:
+        started_at = time.perf_counter()
+        try:
+            return super().get(block=block, timeout=timeout)
+        finally:
+            wait_time = time.perf_counter() - started_at
+            self.total_wait_time += wait_time
+            self.max_wait_time = max(self.max_wait_time, wait_time)
+
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """Async queue pool which keeps track of checkouts, timeouts and wait and connect times.
+
+    Wait time is only the time spent waiting for an idle connection, opening a new connection
+    (when the pool isn't full yet) is counted as connect time instead.
+    """
+
+    _queue_class = InstrumentedAsyncQueue
+    _pool: InstrumentedAsyncQueue
+
+    checkouts: int = 0
+    timeouts: int = 0
+    connects: int = 0
+    total_connect_time: float = 0.0
+    max_connect_time: float = 0.0
+
+    @property
+    def total_wait_time(self) -> float:
+        return self._pool.total_wait_time
+
+    @property
+    def max_wait_time(self) -> float:
+        return self._pool.max_wait_time
+
+    def connect(self) -> PoolProxiedConnection:
+        try:
+            return super().connect()
+        except PoolTimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            self.checkouts += 1
+
+    def _create_connection(self) -> ConnectionPoolEntry:
+        started_at = time.perf_counter()
+        try:
+            return super()._create_connection()
+        finally:
+            connect_time = time.perf_counter() - started_at
+            self.connects += 1
+            self.total_connect_time += connect_time
+            self.max_connect_time = max(self.max_connect_time, connect_time)
+
+
+class UnitOfWork:
+    """Session shared by all database calls in a unit of work (e.g. a request)."""
+
+    def __init__(self, session: AsyncSession, read_only: bool, use_primary: bool = False) -> None:
+        self.session = session
+        self.read_only = read_only
+        self.use_primary = use_primary
+        self.is_started = False
+        self.commit_callbacks: list[Callable[[], None]] = []
+        self.end_callbacks: list[Callable[[], None]] = []
+
+    def run_commit_callbacks(self) -> None:
+        callbacks, self.commit_callbacks = self.commit_callbacks, []
+        for callback in callbacks:
+            callback()
+
+
+class Replica:
+    """Read replica of the primary database, which gets no traffic while it's unhealthy."""
+
+    def __init__(self, index: int, engine: AsyncEngine) -> None:
+        self.index = index
+        self.engine = engine
+        self.async_sessionmaker = async_sessionmaker(bind=engine)
+        self.is_healthy = False
+        self.probe_latency_ms = 0.0
+
 
 class SQLAlchemyManager(HealthReportable, Manager):
     """Manager for accessing database using `SQLAlchemy` library."""
 
+    component = "db"
+
     def __init__(
         self,
         sqlalchemy_url: str,
         declarative_base_classes: list[type[DeclarativeBase]],
+        pool_size: int = 5,
+        pool_max_overflow: int = 10,
+        pool_timeout: float = 30.0,
+        pool_recycle: int = -1,
+        pool_pre_ping: bool = False,
+        pool_use_lifo: bool = False,
+        health_probe_interval: float = 5.0,
+        health_max_staleness: float = 15.0,
+        migrate_on_setup: bool = True,
+        migrations_lock_id: int = DEFAULT_MIGRATIONS_LOCK_ID,
+        query_cache_size: int = 500,
+        connect_args: dict[str, Any] | None = None,
+        replica_urls: list[str] | None = None,
+        metrics_registry: MetricsRegistry | None = None,
     ) -> None:
         self.sqlalchemy_url = sqlalchemy_url
         self.declarative_base_classes = declarative_base_classes
+        self.pool_size = pool_size
+        self.pool_max_overflow = pool_max_overflow
+        self.pool_timeout = pool_timeout
+        self.pool_recycle = pool_recycle
+        self.pool_pre_ping = pool_pre_ping
+        self.pool_use_lifo = pool_use_lifo
+        self.health_probe_interval = health_probe_interval
+        self.health_max_staleness = health_max_staleness
+        self.migrate_on_setup = migrate_on_setup
+        self.migrations_lock_id = migrations_lock_id
+        self.query_cache_size = query_cache_size
+        self.connect_args = connect_args or {}
+        self.replica_urls = replica_urls or []
+        self.metrics_registry = metrics_registry
 
         self._is_setup = False
         self._engine: AsyncEngine = None  # type: ignore
         self._async_sessionmaker: async_sessionmaker = None  # type: ignore
+        self._replicas: list[Replica] = []
+        self._next_replica = 0
+        self._health_report: HealthReport | None = None
+        self._health_report_updated_at = 0.0
+        self._compiled_cache_hits = 0
+        self._compiled_cache_misses = 0
+        self._teardown_callbacks: list[Callable[[], Awaitable[None]]] = []
+        self._unit_of_work: ContextVar[UnitOfWork | None] = ContextVar(
+            f"unit_of_work_{id(self)}",
+            default=None,
+        )
+
+        if self.metrics_registry is not None:
+            self._register_metrics(self.metrics_registry)
 
     async def setup(self) -> None:
         """Setup database manager."""
@@ -41,17 +243,35 @@ class SQLAlchemyManager(HealthReportable, Manager):
             logger.warning("Setup is called multiple times!")
             return
 
-        logger.debug("- Creating SQLAlchemy engine and session maker")
-        self._engine = create_async_engine(url=self.sqlalchemy_url)
+        logger.debug("- Creating SQLAlchemy engines and session makers")
+        self._engine = self._create_engine(self.sqlalchemy_url, "primary")
         self._async_sessionmaker = async_sessionmaker(bind=self._engine)
+        self._replicas = [
+            Replica(index=index, engine=self._create_engine(url, f"replica_{index}"))
+            for index, url in enumerate(self.replica_urls)
+        ]
 
-        logger.debug("- Running migrations")
-        await self._run_migrations()
+        if self.migrate_on_setup:
+            logger.debug("- Running migrations")
+            await self._run_migrations(self._engine)
 
         self._is_setup = True
 
+        logger.debug("- Probing database health")
+        await self._probe_health()
+
     async def run(self) -> None:
-        """Run doesn't do anything here."""
+        """Probe database health periodically in background.
+
+        Health reports are served from the latest probe result, so frequent health checks don't
+        take connections from the pool.
+        """
+        while True:
+            await asyncio.sleep(self.health_probe_interval)
+            try:
+                await self._probe_health()
+            except Exception:
+                logger.exception("Database health probe of `SQLAlchemyManager` failed")
 
     async def teardown(self) -> None:
         """Teardown database manager."""
@@ -60,57 +280,476 @@ class SQLAlchemyManager(HealthReportable, Manager):
             logger.warning("Teardown is called before setup!")
             return
 
+        results = await asyncio.gather(
+            *(callback() for callback in self._teardown_callbacks),
+            return_exceptions=True,
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                logger.error("Teardown callback of `SQLAlchemyManager` failed", exc_info=result)
+
+        logger.debug("- Disposing SQLAlchemy engines")
+        # Closes pooled connections, instead of leaving them to the database to time out.
+        await self._engine.dispose()
+        for replica in self._replicas:
+            await replica.engine.dispose()
+
         self._engine = None  # type: ignore
         self._async_sessionmaker = None  # type: ignore
+        self._replicas = []
+        self._health_report = None
 
         self._is_setup = False
 
     async def get_health_report(self) -> HealthReport:
-        """Get database health report."""
-        is_healthy = True
+        """Get the latest probed database health report, including connection pool statistics.
+
+        The report is unhealthy if the latest probe is older than `health_max_staleness`. Only the
+        primary database has to be healthy, unhealthy replicas are reported but don't get traffic.
+        """
+        if not self._is_setup or self._health_report is None:
+            return HealthReport(
+                component=self.component,
+                is_healthy=False,
+            )
+
+        age = time.monotonic() - self._health_report_updated_at
+        details = {
+            **self._health_report.details,
+            **self.get_pool_stats(),
+            **self.get_compiled_cache_stats(),
+            "age_s": age,
+        }
+        if age > self.health_max_staleness:
+            return self._health_report.model_copy(
+                update={"is_healthy": False, "details": {**details, "error": "stale"}},
+            )
 
+        return self._health_report.model_copy(update={"details": details})
+
+    def get_pool_stats(self) -> dict[str, int | float]:
+        """Get live statistics of the connection pool."""
         if not self._is_setup:
-            is_healthy = False
+            raise Exception("Setup is not called!")
+
+        pool: InstrumentedAsyncQueuePool = self._engine.pool  # type: ignore
+        replica_stats = {}
+        for replica in self._replicas:
+            replica_pool: InstrumentedAsyncQueuePool = replica.engine.pool  # type: ignore
+            replica_stats[f"replica_{replica.index}_checked_out"] = replica_pool.checkedout()
+
+        return {
+            **replica_stats,
+            "pool_size": pool.size(),
+            "checked_in": pool.checkedin(),
+            "checked_out": pool.checkedout(),
+            "overflow": pool.overflow(),
+            "checkouts": pool.checkouts,
+            "timeouts": pool.timeouts,
+            "avg_wait_ms": pool.total_wait_time / pool.checkouts * 1000 if pool.checkouts else 0.0,
+            "max_wait_ms": pool.max_wait_time * 1000,
+            "connects": pool.connects,
+            "avg_connect_ms": (
+                pool.total_connect_time / pool.connects * 1000 if pool.connects else 0.0
+            ),
+            "max_connect_ms": pool.max_connect_time * 1000,
+        }
+
+    def get_compiled_cache_stats(self) -> dict[str, int | float]:
+        """Get hit statistics of the compiled statement cache, since setup."""
+        lookups = self._compiled_cache_hits + self._compiled_cache_misses
+        return {
+            "compiled_cache_hits": self._compiled_cache_hits,
+            "compiled_cache_misses": self._compiled_cache_misses,
+            "compiled_cache_hit_ratio": self._compiled_cache_hits / lookups if lookups else 0.0,
+        }
+
+    def _count_compiled_cache_use(self, **kwargs: object) -> None:
+        cache_hit = getattr(kwargs["context"], "cache_hit", None)
+        if cache_hit == CacheStats.CACHE_HIT:
+            self._compiled_cache_hits += 1
+        elif cache_hit == CacheStats.CACHE_MISS:
+            self._compiled_cache_misses += 1
+
+    def _register_metrics(self, metrics_registry: MetricsRegistry) -> None:
+        self._statement_duration = metrics_registry.histogram(
+            "db_statement_duration_seconds",
+            "Duration of executing SQL statements.",
+            ("engine", "statement"),
+        )
+        self._statement_errors = metrics_registry.counter(
+            "db_statement_errors_total",
+            "Number of SQL statements which failed.",
+            ("engine", "statement"),
+        )
+        self._pool_gauges = {
+            name: metrics_registry.gauge(f"db_pool_{name}", documentation, ("engine",))
+            for name, documentation in (
+                ("size", "Number of connections the pool keeps open."),
+                ("checked_in", "Number of idle connections in the pool."),
+                ("checked_out", "Number of connections in use."),
+                ("overflow", "Number of connections opened over the pool size."),
+            )
+        }
+        metrics_registry.add_collector(self._collect_pool_metrics)
+
+    def _collect_pool_metrics(self) -> None:
+        if not self._is_setup:
+            return
+
+        engines = [("primary", self._engine)]
+        engines.extend((f"replica_{replica.index}", replica.engine) for replica in self._replicas)
+        for engine_name, engine in engines:
+            pool: InstrumentedAsyncQueuePool = engine.pool  # type: ignore
+            self._pool_gauges["size"].set(engine_name, value=pool.size())
+            self._pool_gauges["checked_in"].set(engine_name, value=pool.checkedin())
+            self._pool_gauges["checked_out"].set(engine_name, value=pool.checkedout())
+            self._pool_gauges["overflow"].set(engine_name, value=pool.overflow())
+
+    @staticmethod
+    def _start_statement_timer(conn: Connection, *_args: object) -> None:
+        conn.info.setdefault(_STATEMENT_STARTED_AT_KEY, []).append(time.perf_counter())
+
+    def _observe_statement(
+        self,
+        engine_name: str,
+        conn: Connection,
+        _cursor: object,
+        statement: str,
+        *_args: object,
+    ) -> None:
+        started_at = conn.info[_STATEMENT_STARTED_AT_KEY].pop()
+        self._statement_duration.observe(
+            engine_name,
+            get_statement_label(statement),
+            value=time.perf_counter() - started_at,
+        )
+
+    def _observe_statement_error(self, engine_name: str, context: ExceptionContext) -> None:
+        # Errors raised while connecting happen before the statement timer is started.
+        conn = context.connection
+        if (
+            conn is None
+            or context.statement is None
+            or not conn.info.get(_STATEMENT_STARTED_AT_KEY)
+        ):
+            return
+
+        conn.info[_STATEMENT_STARTED_AT_KEY].pop()
+        self._statement_errors.inc(engine_name, get_statement_label(context.statement))
 
+    async def _probe_health(self) -> None:
+        (is_healthy, latency_ms), *replica_results = await asyncio.gather(
+            self._probe_engine(self._engine),
+            *(self._probe_engine(replica.engine) for replica in self._replicas),
+        )
+
+        details: dict[str, int | float | str | bool] = {"probe_latency_ms": latency_ms}
+        for replica, (is_replica_healthy, replica_latency_ms) in zip(
+            self._replicas,
+            replica_results,
+            strict=True,
+        ):
+            if replica.is_healthy != is_replica_healthy:
+                logger.warning(
+                    "Replica %d is %s",
+                    replica.index,
+                    "back in rotation"
+                    if is_replica_healthy
+                    else "unhealthy, taking it out of rotation",
+                )
+
+            replica.is_healthy = is_replica_healthy
+            replica.probe_latency_ms = replica_latency_ms
+            details[f"replica_{replica.index}_healthy"] = is_replica_healthy
+            details[f"replica_{replica.index}_probe_latency_ms"] = replica_latency_ms
+
+        if self._replicas:
+            details["healthy_replicas"] = sum(replica.is_healthy for replica in self._replicas)
+
+        self._health_report = HealthReport(
+            component=self.component,
+            is_healthy=is_healthy,
+            checked_at=datetime.now(tz=UTC),
+            details=details,
+        )
+        self._health_report_updated_at = time.monotonic()
+
+    async def _probe_engine(self, engine: AsyncEngine) -> tuple[bool, float]:
+        is_healthy = True
+        started_at = time.perf_counter()
         try:
-            async with self._engine.connect() as connection:
-                await connection.execute(text("SELECT 1;"))
-        except OperationalError:
+            async with asyncio.timeout(self.health_probe_interval), engine.connect() as conn:
+                await conn.execute(text("SELECT 1;"))
+        except Exception:
+            # Any failure (e.g. driver errors, not just connection ones) means the engine can't
+            # serve traffic, the probe loop must keep running to put it back in rotation.
+            logger.exception("Database health probe failed")
             is_healthy = False
 
-        return HealthReport(
-            component="db",
-            is_healthy=is_healthy,
+        return is_healthy, (time.perf_counter() - started_at) * 1000
+
+    def _create_engine(self, url: str, engine_name: str) -> AsyncEngine:
+        engine = create_async_engine(
+            url=url,
+            poolclass=InstrumentedAsyncQueuePool,
+            pool_size=self.pool_size,
+            max_overflow=self.pool_max_overflow,
+            pool_timeout=self.pool_timeout,
+            pool_recycle=self.pool_recycle,
+            pool_pre_ping=self.pool_pre_ping,
+            pool_use_lifo=self.pool_use_lifo,
+            query_cache_size=self.query_cache_size,
+            connect_args=self.connect_args,
+        )
+        event.listen(
+            engine.sync_engine,
+            "before_cursor_execute",
+            self._count_compiled_cache_use,
+            named=True,
         )
 
-    def get_async_session(self) -> AsyncSession:
+        if self.metrics_registry is not None:
+            sync_engine = engine.sync_engine
+            event.listen(sync_engine, "before_cursor_execute", self._start_statement_timer)
+            event.listen(
+                sync_engine,
+                "after_cursor_execute",
+                partial(self._observe_statement, engine_name),
+            )
+            event.listen(
+                sync_engine,
+                "handle_error",
+                partial(self._observe_statement_error, engine_name),
+            )
+
+        return engine
+
+    def get_async_session(self, read_only: bool = False) -> AsyncSession:
+        """Get a new session, bound to a healthy replica (round robin) if it's read only.
+
+        Primary database is used when there are no healthy replicas.
+        """
         if not self._is_setup:
             raise Exception("Setup is not called!")
 
+        if read_only:
+            healthy_replicas = [replica for replica in self._replicas if replica.is_healthy]
+            if healthy_replicas:
+                self._next_replica += 1
+                return healthy_replicas[
+                    self._next_replica % len(healthy_replicas)
+                ].async_sessionmaker()
+
         return self._async_sessionmaker()
 
-    async def _run_migrations(self) -> None:
-        def run_alembic_upgrade(connection: Connection) -> None:
-            alembic_config = AlembicConfig(
-                file_=Path(__file__).parent.parent.parent.parent / "alembic.ini",
-            )
-            alembic_config.set_main_option(
-                name="script_location",
-                value=str(Path(__file__).parent.parent / "migrations"),
-            )
-            alembic_config.set_main_option(
-                name="sqlalchemy.url",
-                value=self.sqlalchemy_url,
-            )
-            alembic_config.attributes["connection"] = connection
+    @asynccontextmanager
+    async def unit_of_work(
+        self,
+        read_only: bool = False,
+        use_primary: bool = False,
+    ) -> AsyncIterator[None]:
+        """Run all database calls in this block with a single session, connection and transaction.
+
+        The transaction is committed when the block exits normally and rolled back otherwise. A
+        connection is only checked out on the first database call, so blocks without any (e.g.
+        served from cache) don't take one from the pool. Nested units of work join the outer one.
 
-            upgrade(
-                config=alembic_config,
-                revision="head",
+        Read only units of work go to a replica unless `use_primary` is set (e.g. to read the
+        client's own recent writes).
+        """
+        if self._unit_of_work.get() is not None:
+            yield
+            return
+
+        unit_of_work = UnitOfWork(
+            session=self.get_async_session(read_only=read_only and not use_primary),
+            read_only=read_only,
+            use_primary=use_primary,
+        )
+        token = self._unit_of_work.set(unit_of_work)
+        try:
+            async with unit_of_work.session:
+                yield
+                await unit_of_work.session.commit()
+                unit_of_work.run_commit_callbacks()
+        finally:
+            self._unit_of_work.reset(token)
+            for callback in unit_of_work.end_callbacks:
+                callback()
+
+    @asynccontextmanager
+    async def session(self, read_only: bool = False) -> AsyncIterator[AsyncSession]:
+        """Get session of the current unit of work.
+
+        Outside of a unit of work a new session is used (from a replica if it's read only), which
+        is committed at the end of this block.
+        """
+        unit_of_work = self._unit_of_work.get()
+        if unit_of_work is None:
+            async with self.get_async_session(read_only=read_only) as session:
+                yield session
+                await session.commit()
+
+            return
+
+        if not unit_of_work.is_started:
+            # Other dialects ignore this option, for PostgreSQL it makes the transaction read only.
+            await unit_of_work.session.connection(
+                execution_options={"postgresql_readonly": unit_of_work.read_only},
             )
+            unit_of_work.is_started = True
+
+        yield unit_of_work.session
+
+    async def commit_unit_of_work(self) -> None:
+        """Commit writes of the current unit of work so far, e.g. before a response is sent.
+
+        The unit of work goes on with a new transaction, which is committed when it ends. Outside
+        of a unit of work (or before its first database call) there is nothing to commit.
+        """
+        unit_of_work = self._unit_of_work.get()
+        if unit_of_work is None:
+            return
+
+        if unit_of_work.is_started:
+            await unit_of_work.session.commit()
+            # Options of the next transaction are set on its first database call again.
+            unit_of_work.is_started = False
+
+        unit_of_work.run_commit_callbacks()
+
+    def on_unit_of_work_commit(self, callback: Callable[[], None]) -> None:
+        """Call `callback` once writes of the current unit of work so far are committed.
+
+        It isn't called if the unit of work is rolled back. Outside of a unit of work it's called
+        right away.
+        """
+        unit_of_work = self._unit_of_work.get()
+        if unit_of_work is None:
+            callback()
+        else:
+            unit_of_work.commit_callbacks.append(callback)
+
+    def on_unit_of_work_end(self, callback: Callable[[], None]) -> None:
+        """Call `callback` after the current unit of work is committed or rolled back.
+
+        Outside of a unit of work it's called right away.
+        """
+        unit_of_work = self._unit_of_work.get()
+        if unit_of_work is None:
+            callback()
+        else:
+            unit_of_work.end_callbacks.append(callback)
+
+    def on_teardown(self, callback: Callable[[], Awaitable[None]]) -> None:
+        """Await `callback` on teardown, while the database can still be used (e.g. to flush)."""
+        self._teardown_callbacks.append(callback)
+
+    def get_detached_read_use_primary(self) -> bool | None:
+        """Get `use_primary` of a read only unit of work which can serve reads of this context.
+
+        Such reads can be run outside the current context (e.g. batched with reads of others).
+        Returns `None` inside a write unit of work, whose reads may depend on its own uncommitted
+        writes.
+        """
+        unit_of_work = self._unit_of_work.get()
+        if unit_of_work is None:
+            return False
+
+        if not unit_of_work.read_only:
+            return None
+
+        return unit_of_work.use_primary
+
+    def reads_use_primary(self) -> bool:
+        """Check if read only sessions of this context go to the primary database.
+
+        Reads from a replica may lag behind the primary, so e.g. they shouldn't fill a cache.
+        """
+        unit_of_work = self._unit_of_work.get()
+        if unit_of_work is not None and (not unit_of_work.read_only or unit_of_work.use_primary):
+            return True
+
+        return not self._replicas
+
+    async def migrate(self) -> None:
+        """Upgrade database to the head revision, can be called without setting up the manager."""
+        engine = create_async_engine(url=self.sqlalchemy_url, poolclass=NullPool)
+        try:
+            await self._run_migrations(engine)
+        finally:
+            await engine.dispose()
+
+    async def _run_migrations(self, engine: AsyncEngine) -> None:
+        head_revisions = get_head_revisions()
 
-        async with self._engine.connect() as conn:
-            await conn.run_sync(run_alembic_upgrade)
+        async with engine.connect() as conn:
+            if await self._get_current_revisions(conn) == head_revisions:
+                logger.debug("Database is at the head revision, skipping migrations")
+                return
+
+            async with self._migrations_lock(conn):
+                # Another process may have upgraded the database while waiting for the lock.
+                if await self._get_current_revisions(conn) == head_revisions:
+                    logger.debug("Database is upgraded by another process, skipping migrations")
+                    return
+
+                logger.info("Upgrading database to the head revision")
+                await conn.run_sync(self._run_alembic_upgrade)
+
+    @staticmethod
+    async def _get_current_revisions(conn: AsyncConnection) -> frozenset[str]:
+        has_version_table = await conn.run_sync(
+            lambda sync_conn: inspect(sync_conn).has_table("alembic_version"),
+        )
+        if not has_version_table:
+            return frozenset()
+
+        result = await conn.execute(text("SELECT version_num FROM alembic_version;"))
+        revisions = frozenset(result.scalars())
+        await conn.rollback()
+        return revisions
+
+    @asynccontextmanager
+    async def _migrations_lock(self, conn: AsyncConnection) -> AsyncIterator[None]:
+        """Hold a session level advisory lock, so only one process upgrades the database at once.
+
+        Other databases don't have advisory locks, so nothing is locked for them.
+        """
+        if conn.dialect.name != "postgresql":
+            yield
+            return
+
+        lock_params = {"lock_id": self.migrations_lock_id}
+        await conn.execute(text("SELECT pg_advisory_lock(:lock_id);"), lock_params)
+        await conn.commit()
+        try:
+            yield
+        finally:
+            await conn.execute(text("SELECT pg_advisory_unlock(:lock_id);"), lock_params)
+            await conn.commit()
+
+    def _run_alembic_upgrade(self, connection: Connection) -> None:
+        # Alembic is only imported when there is something to upgrade, it's slow to import.
+        from alembic.command import upgrade
+        from alembic.config import Config as AlembicConfig
+
+        alembic_config = AlembicConfig(file_=ALEMBIC_INI_PATH)
+        alembic_config.set_main_option(
+            name="script_location",
+            value=str(MIGRATIONS_PATH),
+        )
+        alembic_config.set_main_option(
+            name="sqlalchemy.url",
+            value=self.sqlalchemy_url,
+        )
+        alembic_config.attributes["connection"] = connection
+
+        upgrade(
+            config=alembic_config,
+            revision="head",
+        )
 
 
 class PostgresManager(SQLAlchemyManager):
@@ -122,8 +761,43 @@ class PostgresManager(SQLAlchemyManager):
         user: str,
         password: str,
         declarative_base_classes: list[type[DeclarativeBase]],
+        pool_size: int = 5,
+        pool_max_overflow: int = 10,
+        pool_timeout: float = 30.0,
+        pool_recycle: int = -1,
+        pool_pre_ping: bool = False,
+        pool_use_lifo: bool = False,
+        health_probe_interval: float = 5.0,
+        health_max_staleness: float = 15.0,
+        migrate_on_setup: bool = True,
+        migrations_lock_id: int = DEFAULT_MIGRATIONS_LOCK_ID,
+        query_cache_size: int = 500,
+        prepared_statements: bool = True,
+        prepare_threshold: int = 5,
+        replica_urls: list[str] | None = None,
+        metrics_registry: MetricsRegistry | None = None,
     ) -> None:
+        """Create manager for PostgreSQL using `psycopg` driver.
+
+        Statements are prepared server side after `prepare_threshold` executions. Turn
+        `prepared_statements` off behind a transaction pooler (e.g. PgBouncer in transaction
+        mode), where consecutive transactions may use different server connections.
+        """
         super().__init__(
             sqlalchemy_url=f"postgresql+psycopg://{user}:{password}@{host}:{port}/{db_name}",
+            replica_urls=replica_urls,
+            metrics_registry=metrics_registry,
             declarative_base_classes=declarative_base_classes,
+            pool_size=pool_size,
+            pool_max_overflow=pool_max_overflow,
+            pool_timeout=pool_timeout,
+            pool_recycle=pool_recycle,
+            pool_pre_ping=pool_pre_ping,
+            pool_use_lifo=pool_use_lifo,
+            health_probe_interval=health_probe_interval,
+            health_max_staleness=health_max_staleness,
+            migrate_on_setup=migrate_on_setup,
+            migrations_lock_id=migrations_lock_id,
+            query_cache_size=query_cache_size,
+            connect_args={"prepare_threshold": prepare_threshold if prepared_statements else None},
         )
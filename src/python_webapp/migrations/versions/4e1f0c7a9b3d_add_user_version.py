@@ -0,0 +1,29 @@
+"""Add User version
+
+Revision ID: 4e1f0c7a9b3d
+Revises: dfbec4a2555c
+Create Date: 2026-10-18 09:12:41.503118+00:00
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "4e1f0c7a9b3d"
+down_revision: Union[str, None] = "dfbec4a2555c"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Existing rows get the initial version through the server default.
+    op.add_column(
+        "user",
+        sa.Column("version", sa.Integer(), server_default="1", nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("user", "version")
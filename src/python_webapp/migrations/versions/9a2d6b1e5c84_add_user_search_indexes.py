@@ -0,0 +1,57 @@
+"""Add User search indexes
+
+Revision ID: 9a2d6b1e5c84
+Revises: 4e1f0c7a9b3d
+Create Date: 2026-10-18 10:03:17.220945+00:00
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "9a2d6b1e5c84"
+down_revision: Union[str, None] = "4e1f0c7a9b3d"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Trigram operator classes come from `pg_trgm`, other databases get plain indexes.
+    if op.get_context().dialect.name == "postgresql":
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    # Concurrent builds don't lock the table against writes, but can't run in a transaction.
+    with op.get_context().autocommit_block():
+        # `text_pattern_ops` supports both equality and `LIKE 'prefix%'`, whatever the collation is.
+        op.create_index(
+            "ix_user_lower_email",
+            "user",
+            [sa.func.lower(sa.column("email")).label("lower_email")],
+            postgresql_ops={"lower_email": "text_pattern_ops"},
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_user_firstname_trgm",
+            "user",
+            ["firstname"],
+            postgresql_using="gin",
+            postgresql_ops={"firstname": "gin_trgm_ops"},
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_user_lastname_trgm",
+            "user",
+            ["lastname"],
+            postgresql_using="gin",
+            postgresql_ops={"lastname": "gin_trgm_ops"},
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index("ix_user_lastname_trgm", table_name="user", postgresql_concurrently=True)
+        op.drop_index("ix_user_firstname_trgm", table_name="user", postgresql_concurrently=True)
+        op.drop_index("ix_user_lower_email", table_name="user", postgresql_concurrently=True)
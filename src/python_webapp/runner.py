@@ -1,6 +1,10 @@
 import asyncio
 import logging
+import time
+from collections.abc import Iterator, Sequence
+from contextlib import contextmanager
 
+from python_webapp.core.extras import require_extra
 from python_webapp.core.manager import Manager
 
 logger = logging.getLogger(__name__)
@@ -12,8 +16,16 @@ class Runner:
     def __init__(
         self,
         managers: list[Manager],
+        event_loop: str = "asyncio",
+        setup_timeout: float | None = None,
+        teardown_timeout: float | None = None,
     ) -> None:
         self.managers = managers
+        self.event_loop = event_loop
+        self.setup_timeout = setup_timeout
+        self.teardown_timeout = teardown_timeout
+        # Duration of the latest setup of each manager, in seconds.
+        self.setup_durations: dict[Manager, float] = {}
 
     def run(self) -> None:
         """Run the whole application.
@@ -21,29 +33,143 @@ class Runner:
         This is the main entrypoint of the application.
         """
         logger.info("Starting the application")
-        loop = asyncio.new_event_loop()
+        managers = self.get_setup_order()
+        loop = self._new_event_loop()
 
         try:
-            logger.debug("- Running `setup` on all managers")
-            loop.run_until_complete(self._setup())
+            logger.debug("- Running `setup` on all managers (in dependency order)")
+            with _log_duration("setup"):
+                loop.run_until_complete(self.setup_managers(managers))
 
             logger.debug("- Running `run` on all managers (in parallel)")
-            loop.run_until_complete(self._run())
+            with _log_duration("run"):
+                loop.run_until_complete(self._run())
         finally:
-            logger.debug("- Running `teardown` on all managers")
-            loop.run_until_complete(self._teardown())
+            logger.debug("- Running `teardown` on all managers (in reverse dependency order)")
+            with _log_duration("teardown"):
+                loop.run_until_complete(self.teardown_managers(managers))
 
         loop.close()
 
-    async def _setup(self) -> None:
-        for manager in self.managers:
-            await manager.setup()
+    def _new_event_loop(self) -> asyncio.AbstractEventLoop:
+        if self.event_loop == "uvloop":
+            uvloop = require_extra("uvloop", extra="uvloop")
+            return uvloop.new_event_loop()
+
+        return asyncio.new_event_loop()
+
+    async def setup_managers(self, managers: list[Manager]) -> None:
+        """Set up managers, which have to be in setup order (see `get_setup_order`).
+
+        Every manager is set up as soon as all of its dependencies are, so independent managers
+        are set up concurrently.
+        """
+        tasks: dict[Manager, asyncio.Task] = {}
+        async with asyncio.TaskGroup() as tg:
+            for manager in managers:
+                dependency_tasks = [tasks[dependency] for dependency in manager.depends_on]
+                tasks[manager] = tg.create_task(self._setup_manager(manager, dependency_tasks))
+
+    async def _setup_manager(
+        self,
+        manager: Manager,
+        dependency_tasks: Sequence[asyncio.Task],
+    ) -> None:
+        if dependency_tasks:
+            await asyncio.gather(*dependency_tasks)
+
+        started_at = time.perf_counter()
+        try:
+            async with asyncio.timeout(self.setup_timeout):
+                await manager.setup()
+        except TimeoutError:
+            logger.error(
+                "Setup of `%s` timed out after %ss",
+                type(manager).__name__,
+                self.setup_timeout,
+            )
+            raise
+
+        self.setup_durations[manager] = time.perf_counter() - started_at
+        logger.info(
+            "Set up `%s` in %.1fms",
+            type(manager).__name__,
+            self.setup_durations[manager] * 1000,
+        )
 
     async def _run(self) -> None:
         async with asyncio.TaskGroup() as tg:
-            for manager in self.managers:
-                tg.create_task(manager.run())
+            tasks = [tg.create_task(manager.run()) for manager in self.managers]
+
+            # Application stops as soon as one of the managers stops running (e.g. API server
+            # received a shutdown signal), so background loops of other managers are cancelled.
+            await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            for task in tasks:
+                task.cancel()
+
+    async def teardown_managers(self, managers: list[Manager]) -> None:
+        """Tear down managers, which have to be in setup order (see `get_setup_order`).
+
+        Every manager is torn down as soon as all managers depending on it are, even if tearing
+        them down failed.
+        """
+        tasks: dict[Manager, asyncio.Task] = {}
+        for manager in reversed(managers):
+            dependent_tasks = [
+                tasks[dependent] for dependent in tasks if manager in dependent.depends_on
+            ]
+            tasks[manager] = asyncio.create_task(self._teardown_manager(manager, dependent_tasks))
+
+        await asyncio.gather(*tasks.values())
+
+    async def _teardown_manager(
+        self,
+        manager: Manager,
+        dependent_tasks: Sequence[asyncio.Task],
+    ) -> None:
+        if dependent_tasks:
+            await asyncio.wait(dependent_tasks)
+
+        started_at = time.perf_counter()
+        try:
+            async with asyncio.timeout(self.teardown_timeout):
+                await manager.teardown()
+        except Exception:
+            logger.exception("Teardown of `%s` failed", type(manager).__name__)
+            return
+
+        logger.info(
+            "Tore down `%s` in %.1fms",
+            type(manager).__name__,
+            (time.perf_counter() - started_at) * 1000,
+        )
+
+    def get_setup_order(self) -> list[Manager]:
+        """Sort managers so every manager comes after its dependencies, otherwise keeping order."""
+        ordered: list[Manager] = []
+        remaining = list(self.managers)
+        while remaining:
+            ready = [
+                manager
+                for manager in remaining
+                if all(dependency in ordered for dependency in manager.depends_on)
+            ]
+            if not ready:
+                raise ValueError(
+                    "Managers have circular or unknown dependencies: "
+                    f"{', '.join(type(manager).__name__ for manager in remaining)}",
+                )
+
+            ordered.extend(ready)
+            remaining = [manager for manager in remaining if manager not in ready]
+
+        return ordered
+
 
-    async def _teardown(self) -> None:
-        for manager in self.managers:
-            await manager.teardown()
+@contextmanager
+def _log_duration(phase: str) -> Iterator[None]:
+    started_at = time.perf_counter()
+    try:
+        yield
+    finally:
+        logger.info("Phase `%s` took %.1fms", phase, (time.perf_counter() - started_at) * 1000)
@@ -0,0 +1,130 @@
+import asyncio
+import importlib
+import logging
+import time
+from collections.abc import Callable, Sequence
+
+from python_webapp.container import RootContainer
+
+logger = logging.getLogger(__name__)
+
+# Modules imported lazily by factories of `AppRootContainer`.
+APP_MODULES = (
+    "python_webapp.core.metrics",
+    "python_webapp.managers.event_loop_monitor_manager",
+    "python_webapp.managers.fastapi_manager",
+    "python_webapp.managers.metrics_manager",
+    "python_webapp.managers.periodic_task_manager",
+    "python_webapp.managers.sqlalchemy_manager",
+    "python_webapp.apps.system.api.router",
+    "python_webapp.apps.system.services",
+    "python_webapp.apps.user_management.api.router",
+    "python_webapp.apps.user_management.repositories.db_models",
+    "python_webapp.apps.user_management.repositories.user_repository",
+    "python_webapp.apps.user_management.services",
+    "python_webapp.apps.user_management.statistics",
+)
+
+
+class StartupProfiler:
+    """Profiler for the time each phase of application startup takes.
+
+    Phases are importing application modules, building the container, setting up managers (the
+    way `Runner` does, concurrently in dependency order) and serving the first request. Setup of
+    each manager is reported too, the setup phase is how long all of them took together. The
+    application is stopped as soon as the first request is served.
+    """
+
+    def __init__(
+        self,
+        container_factory: Callable[[], RootContainer],
+        modules: Sequence[str] = APP_MODULES,
+        probe_path: str = "/api/v1/system/info",
+        first_request_timeout: float = 30.0,
+    ) -> None:
+        self.container_factory = container_factory
+        self.modules = modules
+        self.probe_path = probe_path
+        self.first_request_timeout = first_request_timeout
+
+    def run(self) -> list[tuple[str, float]]:
+        """Start and stop the application, returning duration of each phase in seconds."""
+        # Modules already imported in this process (e.g. by the CLI) take no time here.
+        started_at = time.perf_counter()
+        for module in self.modules:
+            importlib.import_module(module)
+        import_time = time.perf_counter() - started_at
+
+        started_at = time.perf_counter()
+        container = self.container_factory()
+        container.runner()
+        container.system_services()
+        container.user_management_services()
+        build_time = time.perf_counter() - started_at
+
+        phases = [("import", import_time), ("container build", build_time)]
+        phases.extend(asyncio.run(self._profile_managers(container)))
+        # Setup of each manager is already part of the setup phase.
+        total = sum(duration for phase, duration in phases if not phase.startswith("- "))
+        phases.append(("total", total))
+        return phases
+
+    async def _profile_managers(self, container: RootContainer) -> list[tuple[str, float]]:
+        phases = []
+        runner = container.runner()
+        managers = runner.get_setup_order()
+        try:
+            started_at = time.perf_counter()
+            await runner.setup_managers(managers)
+            phases.append(("setup", time.perf_counter() - started_at))
+            phases.extend(
+                (f"- {type(manager).__name__}.setup", runner.setup_durations[manager])
+                for manager in managers
+            )
+
+            started_at = time.perf_counter()
+            fastapi_manager = container.fastapi_manager()
+            tasks = {manager: asyncio.create_task(manager.run()) for manager in managers}
+            try:
+                await self._wait_for_first_request(container)
+                phases.append(("first request", time.perf_counter() - started_at))
+            finally:
+                # API server is shut down gracefully, background loops of others are cancelled.
+                fastapi_manager.stop()
+                await asyncio.wait([tasks.pop(fastapi_manager)])
+                for task in tasks.values():
+                    task.cancel()
+                await asyncio.gather(*tasks.values(), return_exceptions=True)
+        finally:
+            await runner.teardown_managers(managers)
+
+        return phases
+
+    async def _wait_for_first_request(self, container: RootContainer) -> None:
+        fastapi_manager = container.fastapi_manager()
+        async with asyncio.timeout(self.first_request_timeout):
+            while True:
+                try:
+                    if fastapi_manager.uds is not None:
+                        reader, writer = await asyncio.open_unix_connection(fastapi_manager.uds)
+                    else:
+                        reader, writer = await asyncio.open_connection(
+                            fastapi_manager.host,
+                            fastapi_manager.port,
+                        )
+                except OSError:
+                    await asyncio.sleep(0.001)
+                    continue
+
+                writer.write(
+                    f"GET {self.probe_path} HTTP/1.1\r\n"
+                    f"Host: {fastapi_manager.host}\r\n"
+                    f"Connection: close\r\n\r\n".encode(),
+                )
+                await writer.drain()
+                status_line = await reader.readline()
+                writer.close()
+                await writer.wait_closed()
+
+                logger.debug("First request responded with `%s`", status_line.decode().strip())
+                return
@@ -0,0 +1,233 @@
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+import tempfile
+import threading
+import time
+from collections.abc import Callable, Iterator
+from contextlib import AbstractContextManager, contextmanager, nullcontext
+from multiprocessing.context import SpawnProcess
+from pathlib import Path
+from types import FrameType
+
+logger = logging.getLogger(__name__)
+
+WorkerTarget = Callable[[list[socket.socket]], None]
+
+
+class WorkerSlot:
+    """One of the worker processes, which is replaced by a new one when it dies."""
+
+    def __init__(self, process: SpawnProcess) -> None:
+        self.process = process
+        self.started_at = time.monotonic()
+        self.early_exits = 0
+        self.restart_at: float | None = None
+
+
+class Supervisor:
+    """Supervisor runs the application in multiple worker processes (prefork mode).
+
+    The listening socket is bound once here and inherited by every worker, so the kernel spreads
+    incoming connections between them. Crashed workers are restarted and shutdown signals are
+    forwarded to all workers.
+
+    Workers exiting within `min_uptime` of starting (e.g. failing their setup) are restarted with
+    exponential backoff, starting at `restart_backoff` up to `max_restart_backoff` seconds. After
+    `max_early_exits` such exits in a row of the same worker, `run` stops all workers and raises.
+
+    Metrics of workers are only aggregated through a shared directory, so when no
+    `metrics_multiprocess_dir` is given, a temporary one is used for the run. Either way it's
+    exported to workers in the `metrics_multiprocess_dir_env` environment variable.
+    """
+
+    def __init__(
+        self,
+        worker_target: WorkerTarget,
+        worker_count: int,
+        host: str,
+        port: int,
+        uds: str | None = None,
+        backlog: int = 2048,
+        graceful_timeout: float = 30.0,
+        check_interval: float = 1.0,
+        min_uptime: float = 10.0,
+        restart_backoff: float = 1.0,
+        max_restart_backoff: float = 30.0,
+        max_early_exits: int = 5,
+        metrics_multiprocess_dir: str | None = None,
+        metrics_multiprocess_dir_env: str = "PYTHON_WEBAPP_METRICS_MULTIPROCESS_DIR",
+    ) -> None:
+        self.worker_target = worker_target
+        self.worker_count = worker_count
+        self.host = host
+        self.port = port
+        self.uds = uds
+        self.backlog = backlog
+        self.graceful_timeout = graceful_timeout
+        self.check_interval = check_interval
+        self.min_uptime = min_uptime
+        self.restart_backoff = restart_backoff
+        self.max_restart_backoff = max_restart_backoff
+        self.max_early_exits = max_early_exits
+        self.metrics_multiprocess_dir = metrics_multiprocess_dir
+        self.metrics_multiprocess_dir_env = metrics_multiprocess_dir_env
+
+        self._should_exit = threading.Event()
+        self._context = multiprocessing.get_context("spawn")
+        self._workers: list[WorkerSlot] = []
+
+    def run(self) -> None:
+        """Start workers and supervise them until a shutdown signal is received."""
+        logger.info("Starting supervisor with %d workers", self.worker_count)
+        previous_handlers = {
+            sig: signal.signal(sig, self._handle_signal) for sig in (signal.SIGINT, signal.SIGTERM)
+        }
+
+        self._clear_metrics()
+        sockets = self._bind_sockets()
+        with self._export_metrics_dir():
+            try:
+                self._workers = [
+                    WorkerSlot(self._start_worker(sockets)) for _ in range(self.worker_count)
+                ]
+
+                while not self._should_exit.wait(self.check_interval):
+                    self._restart_dead_workers(sockets)
+            finally:
+                self._stop_workers()
+                for sock in sockets:
+                    sock.close()
+
+                if self.uds is not None:
+                    Path(self.uds).unlink(missing_ok=True)
+
+                for sig, handler in previous_handlers.items():
+                    signal.signal(sig, handler)
+
+        logger.info("Supervisor stopped")
+
+    def stop(self) -> None:
+        """Ask the supervisor to gracefully stop all workers and return from `run`."""
+        self._should_exit.set()
+
+    def _handle_signal(self, sig: int, _frame: FrameType | None) -> None:
+        logger.info("Received signal `%s`, shutting down", signal.Signals(sig).name)
+        self.stop()
+
+    def _clear_metrics(self) -> None:
+        """Remove metrics snapshots of a previous run, workers of this run write their own."""
+        if self.metrics_multiprocess_dir is None:
+            return
+
+        for path in Path(self.metrics_multiprocess_dir).glob("*.json"):
+            path.unlink(missing_ok=True)
+
+    @contextmanager
+    def _export_metrics_dir(self) -> Iterator[None]:
+        """Export metrics directory to workers, which inherit environment when they're spawned."""
+        metrics_dir_context: AbstractContextManager[str]
+        if self.metrics_multiprocess_dir is None:
+            metrics_dir_context = tempfile.TemporaryDirectory(prefix="python_webapp_metrics_")
+        else:
+            metrics_dir_context = nullcontext(self.metrics_multiprocess_dir)
+
+        previous_value = os.environ.get(self.metrics_multiprocess_dir_env)
+        with metrics_dir_context as metrics_multiprocess_dir:
+            logger.info("Aggregating metrics of workers in `%s`", metrics_multiprocess_dir)
+            os.environ[self.metrics_multiprocess_dir_env] = metrics_multiprocess_dir
+            try:
+                yield
+            finally:
+                if previous_value is None:
+                    os.environ.pop(self.metrics_multiprocess_dir_env, None)
+                else:
+                    os.environ[self.metrics_multiprocess_dir_env] = previous_value
+
+    def _bind_sockets(self) -> list[socket.socket]:
+        if self.uds is not None:
+            uds_path = Path(self.uds)
+            uds_path.unlink(missing_ok=True)
+
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.bind(self.uds)
+            uds_path.chmod(0o666)
+            sock.listen(self.backlog)
+        else:
+            sock = socket.create_server((self.host, self.port), backlog=self.backlog)
+
+        sock.set_inheritable(True)
+        return [sock]
+
+    def _start_worker(self, sockets: list[socket.socket]) -> SpawnProcess:
+        worker = self._context.Process(target=self.worker_target, args=(sockets,))
+        worker.start()
+        logger.info("Started worker with pid %d", worker.pid)
+        return worker
+
+    def _restart_dead_workers(self, sockets: list[socket.socket]) -> None:
+        now = time.monotonic()
+        for slot in self._workers:
+            if slot.restart_at is not None:
+                if now >= slot.restart_at:
+                    self._replace_worker(slot, sockets)
+                continue
+
+            worker = slot.process
+            if worker.is_alive():
+                continue
+
+            uptime = now - slot.started_at
+            if uptime >= self.min_uptime:
+                logger.warning(
+                    "Worker with pid %d exited with code %s, restarting",
+                    worker.pid,
+                    worker.exitcode,
+                )
+                slot.early_exits = 0
+                self._replace_worker(slot, sockets)
+                continue
+
+            slot.early_exits += 1
+            if slot.early_exits >= self.max_early_exits:
+                raise RuntimeError(
+                    f"Worker exited within {self.min_uptime}s of starting {slot.early_exits} "
+                    f"times in a row (last exit code {worker.exitcode}), giving up!",
+                )
+
+            delay = min(
+                self.restart_backoff * 2 ** (slot.early_exits - 1),
+                self.max_restart_backoff,
+            )
+            logger.warning(
+                "Worker with pid %d exited with code %s %.1fs after starting, restarting in %.1fs",
+                worker.pid,
+                worker.exitcode,
+                uptime,
+                delay,
+            )
+            slot.restart_at = now + delay
+
+    def _replace_worker(self, slot: WorkerSlot, sockets: list[socket.socket]) -> None:
+        slot.process.close()
+        slot.process = self._start_worker(sockets)
+        slot.started_at = time.monotonic()
+        slot.restart_at = None
+
+    def _stop_workers(self) -> None:
+        workers = [slot.process for slot in self._workers]
+        for worker in workers:
+            if worker.is_alive():
+                worker.terminate()
+
+        deadline = time.monotonic() + self.graceful_timeout
+        for worker in workers:
+            worker.join(timeout=max(deadline - time.monotonic(), 0))
+            if worker.is_alive():
+                logger.warning("Worker with pid %d didn't stop in time, killing", worker.pid)
+                worker.kill()
+                worker.join()
+
+        self._workers = []
@@ -0,0 +1,36 @@
+"""Fixtures of integration tests.
+
+These need the PostgreSQL database from `compose.yaml` (configured like the application) and are
+skipped when it isn't reachable.
+"""
+from collections.abc import AsyncIterator
+
+import pytest
+import pytest_asyncio
+from sqlalchemy.exc import OperationalError
+
+from python_webapp.apps.user_management.repositories.db_models import Base
+from python_webapp.config import Config
+from python_webapp.managers.sqlalchemy_manager import PostgresManager
+
+
+@pytest_asyncio.fixture(name="postgres_manager")
+async def fixture_postgres_manager() -> AsyncIterator[PostgresManager]:
+    config = Config()
+    postgres_manager = PostgresManager(
+        host=config.postgres_host,
+        port=config.postgres_port,
+        db_name=config.postgres_db_name,
+        user=config.postgres_user,
+        password=config.postgres_password,
+        declarative_base_classes=[Base],
+        prepared_statements=False,
+    )
+    try:
+        await postgres_manager.setup()
+    except (ImportError, OperationalError) as e:
+        pytest.skip(f"PostgreSQL isn't available: {e}")
+
+    yield postgres_manager
+
+    await postgres_manager.teardown()
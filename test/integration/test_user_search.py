@@ -0,0 +1,59 @@
+"""EXPLAIN based checks that user search filters are served by their indexes."""
+from collections.abc import Mapping
+
+import pytest
+from sqlalchemy import Connection, event, text
+
+from python_webapp.apps.user_management.domain import UserFilter
+from python_webapp.apps.user_management.repositories.user_repository import (
+    SQLAlchemyUserRepository,
+)
+from python_webapp.managers.sqlalchemy_manager import PostgresManager
+
+
+@pytest.mark.asyncio()
+@pytest.mark.parametrize(
+    ("user_filter", "expected_index"),
+    [
+        (UserFilter(email="Foo@Bar.com"), "ix_user_lower_email"),
+        (UserFilter(email_prefix="Foo"), "ix_user_lower_email"),
+        (UserFilter(firstname="mar"), "ix_user_firstname_trgm"),
+        (UserFilter(lastname="smi"), "ix_user_lastname_trgm"),
+    ],
+)
+async def test_user_filter_uses_index(
+    postgres_manager: PostgresManager,
+    user_filter: UserFilter,
+    expected_index: str,
+) -> None:
+    user_repository = SQLAlchemyUserRepository(sqlalchemy_manager=postgres_manager)
+    executed: list[tuple[str, Mapping[str, object]]] = []
+
+    def capture(
+        _conn: Connection,
+        _cursor: object,
+        statement: str,
+        params: Mapping[str, object],
+        *_args: object,
+    ) -> None:
+        executed.append((statement, params))
+
+    async with postgres_manager.session() as session:
+        sync_engine = session.get_bind()
+
+    event.listen(sync_engine, "before_cursor_execute", capture)
+    try:
+        await user_repository.get_users(offset=0, limit=10, user_filter=user_filter)
+    finally:
+        event.remove(sync_engine, "before_cursor_execute", capture)
+
+    ((statement, params),) = executed
+    async with postgres_manager.session() as session:
+        # The table may be (nearly) empty, where a sequential scan is always cheapest.
+        await session.execute(text("SET LOCAL enable_seqscan = off;"))
+        conn = await session.connection()
+        result = await conn.exec_driver_sql(f"EXPLAIN {statement}", dict(params))
+        plan = "\n".join(row[0] for row in result)
+        await session.rollback()
+
+    assert expected_index in plan
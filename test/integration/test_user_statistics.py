@@ -0,0 +1,25 @@
+"""Checks of user statistics queries which only PostgreSQL can answer."""
+import pytest
+from sqlalchemy import text
+
+from python_webapp.apps.user_management.repositories.user_repository import (
+    SQLAlchemyUserRepository,
+)
+from python_webapp.managers.sqlalchemy_manager import PostgresManager
+
+
+@pytest.mark.asyncio()
+async def test_estimate_user_count(postgres_manager: PostgresManager) -> None:
+    user_repository = SQLAlchemyUserRepository(sqlalchemy_manager=postgres_manager)
+    async with postgres_manager.session() as session:
+        # Unlike vacuum, analyze can run in a transaction.
+        await session.execute(text('ANALYZE "user"'))
+
+    estimate = await user_repository.estimate_user_count()
+    by_email_domain = await user_repository.count_users_by_email_domain()
+
+    assert estimate is not None
+    total, estimated_at = estimate
+    assert total >= 0
+    assert estimated_at is not None
+    assert all(count > 0 for count in by_email_domain.values())
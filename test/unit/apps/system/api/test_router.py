@@ -6,10 +6,11 @@ from fastapi import Response
 from starlette import status
 
 from python_webapp.apps.system.api.api_models import GetHealthReportsResponse, GetSystemInfoResponse
-from python_webapp.apps.system.api.router import get_health_reports, get_system_info
+from python_webapp.apps.system.api.router import get_health_reports, get_metrics, get_system_info
 from python_webapp.apps.system.domain import SystemInfo
 from python_webapp.apps.system.services import SystemServices
 from python_webapp.core.health import HealthReport
+from python_webapp.core.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE
 
 
 @pytest.fixture(name="response_mock")
@@ -106,3 +107,18 @@ async def test_get_health_reports_unhealthy(
         health_reports=health_reports,
     )
     assert response_mock.status_code == status.HTTP_409_CONFLICT
+
+
+@pytest.mark.asyncio()
+async def test_get_metrics(system_services_mock: Annotated[AsyncMock, SystemServices]) -> None:
+    metrics = "# HELP foo Foo.\n# TYPE foo counter\nfoo 1.0\n"
+    system_services_mock.get_metrics = AsyncMock(
+        return_value=metrics,
+    )
+
+    output = await get_metrics(
+        system_services=system_services_mock,
+    )
+
+    assert output.body == metrics.encode()
+    assert output.media_type == METRICS_CONTENT_TYPE
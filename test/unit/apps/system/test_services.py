@@ -1,3 +1,5 @@
+import asyncio
+import time
 from unittest.mock import AsyncMock, Mock
 
 import pytest
@@ -5,6 +7,7 @@ import pytest
 from python_webapp.apps.system.domain import SystemInfo
 from python_webapp.apps.system.services import SystemServices
 from python_webapp.core.health import HealthReport, HealthReportable
+from python_webapp.core.metrics import MetricsRegistry
 
 
 @pytest.mark.asyncio()
@@ -60,4 +63,60 @@ async def test_get_health_reports() -> None:
     )
     output = await system_services.get_health_reports()
 
-    assert output == expected_output
+    assert [hr.model_copy(update={"latency_ms": None}) for hr in output] == expected_output
+    assert all(hr.latency_ms is not None for hr in output)
+
+
+@pytest.mark.asyncio()
+async def test_get_health_reports_timeout_and_error() -> None:
+    async def get_slow_health_report() -> HealthReport:
+        await asyncio.sleep(10)
+        return HealthReport(component="slow", is_healthy=True)
+
+    health_reportable1 = AsyncMock(HealthReportable)
+    health_reportable1.component = "slow1"
+    health_reportable1.get_health_report = get_slow_health_report
+    health_reportable2 = AsyncMock(HealthReportable)
+    health_reportable2.component = "slow2"
+    health_reportable2.get_health_report = get_slow_health_report
+    health_reportable3 = AsyncMock(HealthReportable)
+    health_reportable3.component = "broken"
+    health_reportable3.get_health_report = AsyncMock(side_effect=ValueError("error"))
+
+    system_services = SystemServices(
+        config=Mock(),
+        health_reportables=[
+            health_reportable1,
+            health_reportable2,
+            health_reportable3,
+        ],
+        health_report_timeout=0.1,
+    )
+
+    started_at = time.perf_counter()
+    output = await system_services.get_health_reports()
+
+    # Checks run concurrently, so all of them together take about a single timeout.
+    assert time.perf_counter() - started_at < 1
+    assert [(hr.component, hr.is_healthy) for hr in output] == [
+        ("slow1", False),
+        ("slow2", False),
+        ("broken", False),
+    ]
+    assert output[0].latency_ms is not None
+    assert output[0].latency_ms >= system_services.health_report_timeout * 1000
+
+
+@pytest.mark.asyncio()
+async def test_get_metrics() -> None:
+    metrics_registry = MetricsRegistry()
+    metrics_registry.counter("requests_total", "Requests.").inc()
+
+    system_services = SystemServices(
+        config=Mock(),
+        health_reportables=[],
+        metrics_registry=metrics_registry,
+    )
+    output = await system_services.get_metrics()
+
+    assert output == metrics_registry.render()
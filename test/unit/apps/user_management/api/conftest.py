@@ -0,0 +1,52 @@
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from fastapi.requests import Request
+from fastapi.responses import JSONResponse
+
+from python_webapp.apps.user_management.api.router import router
+from python_webapp.config import Config
+from python_webapp.container import AppRootContainer
+from python_webapp.core.api.api_models import ErrorResponse
+from python_webapp.core.di import singleton
+from python_webapp.core.errors import AppError
+from python_webapp.managers.sqlalchemy_manager import SQLAlchemyManager
+
+
+@pytest.fixture(name="config")
+def fixture_config() -> Config:
+    return Config()
+
+
+@pytest.fixture(name="app")
+def fixture_app(config: Config, sqlalchemy_manager: SQLAlchemyManager) -> FastAPI:
+    class TestRootContainer(AppRootContainer):
+        @singleton
+        def config(self) -> Config:
+            return config
+
+        @singleton
+        def sqlalchemy_manager(self) -> SQLAlchemyManager:
+            return sqlalchemy_manager
+
+    app = FastAPI()
+    app.include_router(router)
+    app.state.root_container = TestRootContainer()
+    app.add_exception_handler(AppError, app_error_handler)
+    return app
+
+
+async def app_error_handler(_request: Request, exc: AppError) -> JSONResponse:
+    return JSONResponse(
+        content={"error": ErrorResponse(code=exc.code, message=exc.message).model_dump()},
+        status_code=exc.status,
+    )
+
+
+@pytest.fixture(name="client")
+def fixture_client(app: FastAPI) -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app, raise_app_exceptions=False),  # type: ignore
+        base_url="http://test",
+    )
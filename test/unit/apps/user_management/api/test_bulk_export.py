@@ -0,0 +1,47 @@
+from collections.abc import AsyncIterator
+
+import pytest
+
+from python_webapp.apps.user_management.api.bulk_export import ExportFormat, format_users
+from python_webapp.apps.user_management.domain import Profile, User
+
+USERS = [
+    User(id="1", email="foo@bar.com", profile=Profile(firstname="foo", lastname="bar")),
+    User(id="2", email="baz@bar.com", profile=Profile(firstname="baz, jr.")),
+]
+
+
+async def _stream(*users: User) -> AsyncIterator[User]:
+    for user in users:
+        yield user
+
+
+@pytest.mark.asyncio()
+async def test_format_users_ndjson() -> None:
+    chunks = [chunk async for chunk in format_users(_stream(*USERS), ExportFormat.NDJSON)]
+
+    assert b"".join(chunks) == (
+        b'{"id":"1","email":"foo@bar.com","profile":{"firstname":"foo","lastname":"bar"}}\n'
+        b'{"id":"2","email":"baz@bar.com","profile":{"firstname":"baz, jr.","lastname":""}}\n'
+    )
+
+
+@pytest.mark.asyncio()
+async def test_format_users_csv() -> None:
+    chunks = [chunk async for chunk in format_users(_stream(*USERS), ExportFormat.CSV)]
+
+    assert b"".join(chunks) == (
+        b"id,email,firstname,lastname\n" b"1,foo@bar.com,foo,bar\n" b'2,baz@bar.com,"baz, jr.",\n'
+    )
+
+
+@pytest.mark.asyncio()
+async def test_format_users_is_chunked() -> None:
+    chunks = [
+        chunk async for chunk in format_users(_stream(*USERS), ExportFormat.CSV, chunk_size=30)
+    ]
+
+    assert chunks == [
+        b"id,email,firstname,lastname\n1,foo@bar.com,foo,bar\n",
+        b'2,baz@bar.com,"baz, jr.",\n',
+    ]
@@ -0,0 +1,78 @@
+from collections.abc import AsyncIterator
+
+import pytest
+
+from python_webapp.apps.user_management.api.bulk_import import iter_lines, parse_csv, parse_ndjson
+from python_webapp.apps.user_management.domain import NewUser, Profile, UserImportRecord
+from python_webapp.apps.user_management.errors import InvalidImportError
+
+
+async def _stream(*chunks: bytes) -> AsyncIterator[bytes]:
+    for chunk in chunks:
+        yield chunk
+
+
+@pytest.mark.asyncio()
+async def test_iter_lines() -> None:
+    lines = [
+        line
+        async for line in iter_lines(
+            _stream(b"foo\r\nb", b"ar\n", b"x" * 5, b"x" * 5, b"\nbaz"),
+            max_line_length=8,
+        )
+    ]
+
+    assert lines == [b"foo", b"bar", None, b"baz"]
+
+
+@pytest.mark.asyncio()
+async def test_parse_ndjson() -> None:
+    records = [
+        record
+        async for record in parse_ndjson(
+            _stream(
+                b'{"email": "foo@bar.com", "profile": {"firstname": "foo"}}\n',
+                b"\n",
+                b'{"email": "not-an-email", "profile": {}}\n',
+                b"{broken",
+            ),
+        )
+    ]
+
+    assert records[0] == UserImportRecord(
+        row=1,
+        user=NewUser(email="foo@bar.com", profile=Profile(firstname="foo")),
+    )
+    assert [(record.row, record.user) for record in records[1:]] == [(3, None), (4, None)]
+    assert records[1].error is not None
+    assert records[1].error.startswith("email:")
+
+
+@pytest.mark.asyncio()
+async def test_parse_csv() -> None:
+    records = [
+        record
+        async for record in parse_csv(
+            _stream(
+                b"email,firstname\n",
+                b"foo@bar.com,foo\n",
+                b"baz@bar.com\n",
+                b"not-an-email,bar\n",
+            ),
+        )
+    ]
+
+    assert records[0] == UserImportRecord(
+        row=2,
+        user=NewUser(email="foo@bar.com", profile=Profile(firstname="foo")),
+    )
+    assert records[1] == UserImportRecord(row=3, error="Expected 2 values, got 1.")
+    assert (records[2].row, records[2].user) == (4, None)
+
+
+@pytest.mark.asyncio()
+async def test_parse_csv_invalid_header_error() -> None:
+    records = parse_csv(_stream(b"firstname,lastname\nfoo,bar\n"))
+
+    with pytest.raises(InvalidImportError):
+        await anext(records)
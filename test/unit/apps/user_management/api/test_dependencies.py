@@ -0,0 +1,74 @@
+import httpx
+import pytest
+from fastapi import FastAPI
+from sqlalchemy import Connection, event
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette import status
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from python_webapp.managers.sqlalchemy_manager import SQLAlchemyManager
+
+
+def create_client(app: ASGIApp) -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app, raise_app_exceptions=False),  # type: ignore
+        base_url="http://test",
+    )
+
+
+@pytest.mark.asyncio()
+async def test_unit_of_work_is_committed_before_response(
+    sqlalchemy_manager: SQLAlchemyManager,
+    app: FastAPI,
+) -> None:
+    events: list[str] = []
+
+    def record_commit(_conn: Connection) -> None:
+        events.append("commit")
+
+    async def recording_app(scope: Scope, receive: Receive, send: Send) -> None:
+        async def recording_send(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                events.append("response")
+
+            await send(message)
+
+        await app(scope, receive, recording_send)
+
+    client = create_client(recording_app)
+
+    async with sqlalchemy_manager.session() as session:
+        sync_engine = session.get_bind()
+
+    event.listen(sync_engine, "commit", record_commit)
+    try:
+        response = await client.post(
+            "/v1/user-management/users",
+            json={"email": "foo@bar.com", "profile": {}},
+        )
+    finally:
+        event.remove(sync_engine, "commit", record_commit)
+
+    assert response.status_code == status.HTTP_201_CREATED
+    assert events == ["commit", "response"]
+
+
+@pytest.mark.asyncio()
+async def test_failed_commit_is_answered_with_error(
+    client: httpx.AsyncClient,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    async def fail_commit(_session: AsyncSession) -> None:
+        raise OperationalError("COMMIT", {}, Exception("disk I/O error"))
+
+    monkeypatch.setattr(AsyncSession, "commit", fail_commit)
+    response = await client.post(
+        "/v1/user-management/users",
+        json={"email": "foo@bar.com", "profile": {}},
+    )
+    monkeypatch.undo()
+
+    assert response.status_code == status.HTTP_500_INTERNAL_SERVER_ERROR
+    users_response = await client.get("/v1/user-management/users")
+    assert users_response.json()["users"] == []
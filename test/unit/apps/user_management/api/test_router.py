@@ -1,12 +1,40 @@
+from datetime import UTC, datetime
 from typing import Annotated
 from unittest.mock import AsyncMock
 
+import httpx
 import pytest
+from starlette import status
 
-from python_webapp.apps.user_management.api.api_models import CreateUserBody, UserProfileAPIModel
-from python_webapp.apps.user_management.api.router import create_user
+from python_webapp.apps.user_management.api.api_models import (
+    CreateUserBody,
+    CreateUserResponse,
+    GetUserByIDResponse,
+    GetUsersResponse,
+    GetUserStatisticsResponse,
+    LookupUsersBody,
+    LookupUsersResponse,
+    UserAPIModel,
+    UserProfileAPIModel,
+)
+from python_webapp.apps.user_management.api.router import (
+    create_user,
+    get_user_by_id,
+    get_user_statistics,
+    get_users,
+    lookup_users,
+)
+from python_webapp.apps.user_management.domain import (
+    Profile,
+    User,
+    UserFilter,
+    UserSortOrder,
+    UsersPage,
+    UserStatistics,
+    UserStatisticsMode,
+)
 from python_webapp.apps.user_management.services import UserManagementServices
-from python_webapp.core.api.api_models import MessageResponse
+from python_webapp.config import Config
 
 
 @pytest.fixture(name="user_management_services_mock")
@@ -18,7 +46,7 @@ def fixture_user_management_services_mock() -> Annotated[AsyncMock, UserManageme
 async def test_create_user(
     user_management_services_mock: Annotated[AsyncMock, UserManagementServices],
 ) -> None:
-    user_management_services_mock.create_user = AsyncMock()
+    user_management_services_mock.create_user = AsyncMock(return_value="1")
 
     output = await create_user(
         user_management_services=user_management_services_mock,
@@ -31,11 +59,186 @@ async def test_create_user(
         ),
     )
 
-    assert output == MessageResponse(
+    assert output == CreateUserResponse(
         message="ok",
+        user_id="1",
     )
     user_management_services_mock.create_user.assert_called_once_with(
         email="foo@bar.com",
         firstname="foo",
         lastname="bar",
     )
+
+
+@pytest.mark.asyncio()
+async def test_get_users(
+    user_management_services_mock: Annotated[AsyncMock, UserManagementServices],
+) -> None:
+    user_management_services_mock.get_users = AsyncMock(
+        return_value=UsersPage(
+            users=[User(id="1", email="foo@bar.com", profile=Profile(firstname="foo"))],
+            next_cursor="abc",
+            version="v1",
+        ),
+    )
+
+    output = await get_users(
+        user_management_services=user_management_services_mock,
+        cursor="xyz",
+        sort=UserSortOrder.EMAIL_ASC,
+    )
+
+    assert output.status_code == status.HTTP_200_OK
+    assert output.media_type == "application/json"
+    assert GetUsersResponse.model_validate_json(output.body) == GetUsersResponse(
+        users=[
+            UserAPIModel(
+                id="1",
+                email="foo@bar.com",
+                profile=UserProfileAPIModel(firstname="foo", lastname=""),
+            ),
+        ],
+        next_cursor="abc",
+    )
+    assert output.headers["ETag"] == '"v1"'
+    user_management_services_mock.get_users.assert_called_once_with(
+        page=1,
+        cursor="xyz",
+        page_size=None,
+        sort_order=UserSortOrder.EMAIL_ASC,
+        user_filter=None,
+    )
+
+
+@pytest.mark.asyncio()
+async def test_get_users_not_modified(
+    user_management_services_mock: Annotated[AsyncMock, UserManagementServices],
+) -> None:
+    user_management_services_mock.get_users_page_version = AsyncMock(return_value="v1")
+
+    output = await get_users(
+        user_management_services=user_management_services_mock,
+        if_none_match='"v0", W/"v1"',
+    )
+
+    assert output.status_code == status.HTTP_304_NOT_MODIFIED
+    assert output.headers["ETag"] == '"v1"'
+    user_management_services_mock.get_users.assert_not_called()
+
+
+@pytest.mark.asyncio()
+@pytest.mark.parametrize(
+    ("if_none_match", "expected_status"),
+    [
+        (None, status.HTTP_200_OK),
+        ('"1.1"', status.HTTP_200_OK),
+        ('"1.2"', status.HTTP_304_NOT_MODIFIED),
+        ("*", status.HTTP_304_NOT_MODIFIED),
+    ],
+)
+async def test_get_user_by_id(
+    user_management_services_mock: Annotated[AsyncMock, UserManagementServices],
+    if_none_match: str | None,
+    expected_status: int,
+) -> None:
+    user = User(id="1", email="foo@bar.com", profile=Profile(firstname="foo"), version=2)
+    user_management_services_mock.get_user_version_by_id = AsyncMock(return_value=2)
+    user_management_services_mock.get_user_by_id = AsyncMock(return_value=user)
+
+    output = await get_user_by_id(
+        user_management_services=user_management_services_mock,
+        user_id="1",
+        if_none_match=if_none_match,
+    )
+
+    assert output.status_code == expected_status
+    assert output.headers["ETag"] == '"1.2"'
+    if expected_status == status.HTTP_200_OK:
+        assert GetUserByIDResponse.model_validate_json(output.body).user.id == "1"
+    else:
+        user_management_services_mock.get_user_by_id.assert_not_called()
+
+
+@pytest.mark.asyncio()
+async def test_get_users_with_filter(
+    user_management_services_mock: Annotated[AsyncMock, UserManagementServices],
+) -> None:
+    user_management_services_mock.get_users = AsyncMock(return_value=UsersPage(users=[]))
+
+    await get_users(
+        user_management_services=user_management_services_mock,
+        email_prefix="foo",
+        lastname="bar",
+    )
+
+    user_management_services_mock.get_users.assert_called_once_with(
+        page=1,
+        cursor=None,
+        page_size=None,
+        sort_order=UserSortOrder.ID_ASC,
+        user_filter=UserFilter(email_prefix="foo", lastname="bar"),
+    )
+
+
+@pytest.mark.asyncio()
+async def test_get_user_statistics(
+    user_management_services_mock: Annotated[AsyncMock, UserManagementServices],
+) -> None:
+    synced_at = datetime(2024, 1, 1, tzinfo=UTC)
+    user_management_services_mock.get_user_statistics = AsyncMock(
+        return_value=UserStatistics(
+            mode=UserStatisticsMode.MAINTAINED,
+            total=2,
+            by_email_domain={"bar.com": 2},
+            synced_at=synced_at,
+        ),
+    )
+
+    output = await get_user_statistics(
+        user_management_services=user_management_services_mock,
+        mode=UserStatisticsMode.MAINTAINED,
+    )
+
+    assert isinstance(output, GetUserStatisticsResponse)
+    assert output.total == output.by_email_domain["bar.com"]
+    assert output.synced_at == synced_at
+    assert output.age_seconds is not None
+    assert output.age_seconds > 0
+    user_management_services_mock.get_user_statistics.assert_called_once_with(
+        mode=UserStatisticsMode.MAINTAINED,
+    )
+
+
+@pytest.mark.asyncio()
+async def test_lookup_users(
+    user_management_services_mock: Annotated[AsyncMock, UserManagementServices],
+) -> None:
+    user = User(id="1", email="foo@bar.com", profile=Profile(firstname="foo"))
+    user_management_services_mock.get_users_by_ids = AsyncMock(return_value=([user], ["2"]))
+
+    output = await lookup_users(
+        user_management_services=user_management_services_mock,
+        body=LookupUsersBody(ids=["1", "2"]),
+    )
+
+    assert LookupUsersResponse.model_validate_json(output.body) == LookupUsersResponse(
+        users=[UserAPIModel.from_domain(user)],
+        missing_ids=["2"],
+    )
+    user_management_services_mock.get_users_by_ids.assert_called_once_with(user_ids=["1", "2"])
+
+
+@pytest.mark.asyncio()
+@pytest.mark.parametrize("coalesce_get_by_id", [False, True])
+@pytest.mark.parametrize("user_id", ["abc", "\u00b2", "1"])
+async def test_get_user_by_id_not_found(
+    config: Config,
+    client: httpx.AsyncClient,
+    coalesce_get_by_id: bool,
+    user_id: str,
+) -> None:
+    config.user_repository_coalesce_get_by_id = coalesce_get_by_id
+
+    response = await client.get(f"/v1/user-management/users/{user_id}")
+
+    assert response.status_code == status.HTTP_404_NOT_FOUND
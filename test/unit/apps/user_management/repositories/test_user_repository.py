@@ -0,0 +1,434 @@
+import asyncio
+import math
+from collections.abc import Sequence
+from pathlib import Path
+from typing import Annotated
+from unittest.mock import AsyncMock, call
+
+import pytest
+from sqlalchemy import Connection, event
+
+from python_webapp.apps.user_management.domain import (
+    NewUser,
+    Profile,
+    User,
+    UserFilter,
+    UserSortOrder,
+)
+from python_webapp.apps.user_management.repositories.user_repository import (
+    CachingUserRepository,
+    SQLAlchemyUserRepository,
+    UserRepository,
+)
+from python_webapp.core.metrics import MetricsRegistry
+from python_webapp.managers.sqlalchemy_manager import SQLAlchemyManager
+
+
+@pytest.fixture(name="user_repository_mock")
+def fixture_user_repository_mock() -> Annotated[AsyncMock, UserRepository]:
+    return AsyncMock(UserRepository)
+
+
+@pytest.fixture(name="caching_user_repository")
+def fixture_caching_user_repository(
+    user_repository_mock: Annotated[AsyncMock, UserRepository],
+    sqlalchemy_manager: SQLAlchemyManager,
+) -> CachingUserRepository:
+    return CachingUserRepository(
+        user_repository=user_repository_mock,
+        sqlalchemy_manager=sqlalchemy_manager,
+        max_size=10,
+        ttl=60,
+        negative_ttl=60,
+    )
+
+
+@pytest.mark.asyncio()
+@pytest.mark.parametrize(
+    ("user_filter", "expected_emails"),
+    [
+        (UserFilter(email="FOO@bar.com"), ["foo@bar.com"]),
+        (UserFilter(email_prefix="Foo"), ["foo@bar.com", "foo_baz@bar.com"]),
+        (UserFilter(email_prefix="foo_"), ["foo_baz@bar.com"]),
+        (UserFilter(firstname="AR"), ["foo@bar.com", "qux@bar.com"]),
+        (UserFilter(firstname="ar", lastname="smi"), ["qux@bar.com"]),
+        (UserFilter(lastname="%"), []),
+    ],
+)
+async def test_get_users_with_filter(
+    sqlalchemy_manager: SQLAlchemyManager,
+    user_filter: UserFilter,
+    expected_emails: list[str],
+) -> None:
+    user_repository = SQLAlchemyUserRepository(sqlalchemy_manager=sqlalchemy_manager)
+    await user_repository.create_users_bulk(
+        users=[
+            NewUser(email="foo@bar.com", profile=Profile(firstname="Mark", lastname="Doe")),
+            NewUser(email="foo_baz@bar.com", profile=Profile(firstname="Jane", lastname="Roe")),
+            NewUser(email="qux@bar.com", profile=Profile(firstname="Clare", lastname="Smith")),
+        ],
+    )
+
+    users = await user_repository.get_users(
+        offset=0,
+        limit=10,
+        sort_order=UserSortOrder.EMAIL_ASC,
+        user_filter=user_filter,
+    )
+    user_versions = await user_repository.get_user_versions(
+        offset=0,
+        limit=10,
+        sort_order=UserSortOrder.EMAIL_ASC,
+        user_filter=user_filter,
+    )
+
+    assert [user.email for user in users] == expected_emails
+    assert [user_id for user_id, _ in user_versions] == [user.id for user in users]
+
+
+@pytest.mark.asyncio()
+async def test_get_users_by_email_uses_index(sqlalchemy_manager: SQLAlchemyManager) -> None:
+    user_repository = SQLAlchemyUserRepository(sqlalchemy_manager=sqlalchemy_manager)
+    executed: list[tuple[str, Sequence[object]]] = []
+
+    def capture(
+        _conn: Connection,
+        _cursor: object,
+        statement: str,
+        params: Sequence[object],
+        *_args: object,
+    ) -> None:
+        executed.append((statement, params))
+
+    async with sqlalchemy_manager.session() as session:
+        sync_engine = session.get_bind()
+
+    event.listen(sync_engine, "before_cursor_execute", capture)
+    try:
+        await user_repository.get_users(
+            offset=0,
+            limit=10,
+            user_filter=UserFilter(email="FOO@bar.com"),
+        )
+    finally:
+        event.remove(sync_engine, "before_cursor_execute", capture)
+
+    ((statement, params),) = executed
+    async with sqlalchemy_manager.session() as session:
+        conn = await session.connection()
+        result = await conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", tuple(params))
+        plan = " ".join(str(row[-1]) for row in result)
+
+    assert "USING INDEX ix_user_lower_email" in plan
+
+
+@pytest.mark.asyncio()
+async def test_create_users_bulk_splits_statements(sqlalchemy_manager: SQLAlchemyManager) -> None:
+    user_repository = SQLAlchemyUserRepository(sqlalchemy_manager=sqlalchemy_manager)
+    user_repository.bulk_insert_max_rows = 2
+    statements: list[str] = []
+
+    def record_statement(_conn: Connection, *args: object) -> None:
+        statements.append(str(args[1]))
+
+    async with sqlalchemy_manager.session() as session:
+        sync_engine = session.get_bind()
+
+    emails = ["a@bar.com", "b@bar.com", "a@bar.com", "c@bar.com", "b@bar.com"]
+    event.listen(sync_engine, "before_cursor_execute", record_statement)
+    try:
+        user_ids = await user_repository.create_users_bulk(
+            users=[NewUser(email=email, profile=Profile()) for email in emails],
+        )
+    finally:
+        event.remove(sync_engine, "before_cursor_execute", record_statement)
+
+    inserts = [statement for statement in statements if statement.startswith("INSERT")]
+    assert len(inserts) == math.ceil(len(emails) / user_repository.bulk_insert_max_rows)
+    # Repeated emails are left out, even when they're in different statements.
+    assert [user_id is not None for user_id in user_ids] == [True, True, False, True, False]
+
+
+@pytest.mark.asyncio()
+async def test_count_users_by_email_domain(sqlalchemy_manager: SQLAlchemyManager) -> None:
+    user_repository = SQLAlchemyUserRepository(sqlalchemy_manager=sqlalchemy_manager)
+    user_ids = await user_repository.create_users_bulk(
+        users=[
+            NewUser(email="foo@bar.com", profile=Profile()),
+            NewUser(email="baz@Bar.com", profile=Profile()),
+            NewUser(email="qux@example.org", profile=Profile()),
+        ],
+    )
+    assert user_ids[2] is not None
+
+    deleted_email = await user_repository.delete_user_by_id(user_id=user_ids[2])
+
+    assert deleted_email == "qux@example.org"
+    assert await user_repository.delete_user_by_id(user_id=user_ids[2]) is None
+    assert await user_repository.count_users_by_email_domain() == {"bar.com": 2}
+    # Only PostgreSQL keeps an estimate.
+    assert await user_repository.estimate_user_count() is None
+
+
+@pytest.mark.asyncio()
+async def test_get_users_by_ids(sqlalchemy_manager: SQLAlchemyManager) -> None:
+    user_repository = SQLAlchemyUserRepository(sqlalchemy_manager=sqlalchemy_manager)
+    user_ids = await user_repository.create_users_bulk(
+        users=[
+            NewUser(email="foo@bar.com", profile=Profile()),
+            NewUser(email="baz@bar.com", profile=Profile()),
+            NewUser(email="qux@bar.com", profile=Profile()),
+        ],
+    )
+
+    users = await user_repository.get_users_by_ids(
+        user_ids=[user_ids[2], user_ids[0], user_ids[2], "999", "abc"],
+    )
+
+    assert sorted(user.email for user in users) == ["foo@bar.com", "qux@bar.com"]
+    assert await user_repository.get_users_by_ids(user_ids=[]) == []
+
+
+@pytest.mark.asyncio()
+async def test_get_user_by_id_coalesced(sqlalchemy_manager: SQLAlchemyManager) -> None:
+    user_repository = SQLAlchemyUserRepository(
+        sqlalchemy_manager=sqlalchemy_manager,
+        coalesce_get_by_id=True,
+    )
+    user_ids = await user_repository.create_users_bulk(
+        users=[
+            NewUser(email="foo@bar.com", profile=Profile()),
+            NewUser(email="baz@bar.com", profile=Profile()),
+        ],
+    )
+    executed: list[str] = []
+
+    def capture(
+        _conn: Connection,
+        _cursor: object,
+        statement: str,
+        *_args: object,
+    ) -> None:
+        executed.append(statement)
+
+    async with sqlalchemy_manager.session() as session:
+        sync_engine = session.get_bind()
+
+    async def get_user_by_id(user_id: str) -> User | None:
+        async with sqlalchemy_manager.unit_of_work(read_only=True):
+            return await user_repository.get_user_by_id(user_id=user_id)
+
+    event.listen(sync_engine, "before_cursor_execute", capture)
+    try:
+        users = await asyncio.gather(
+            get_user_by_id(str(user_ids[0])),
+            get_user_by_id(str(user_ids[1])),
+            get_user_by_id(str(user_ids[0])),
+            get_user_by_id("999"),
+        )
+        selects = len(executed)
+
+        # Write units of work read on their own.
+        async with sqlalchemy_manager.unit_of_work():
+            await user_repository.get_user_by_id(user_id=str(user_ids[0]))
+    finally:
+        event.remove(sync_engine, "before_cursor_execute", capture)
+
+    assert [user.email if user else None for user in users] == [
+        "foo@bar.com",
+        "baz@bar.com",
+        "foo@bar.com",
+        None,
+    ]
+    assert selects == 1
+    assert len(executed) == selects + 1
+
+
+@pytest.mark.asyncio()
+async def test_create_user_batched(sqlalchemy_manager: SQLAlchemyManager) -> None:
+    metrics_registry = MetricsRegistry()
+    user_repository = SQLAlchemyUserRepository(
+        sqlalchemy_manager=sqlalchemy_manager,
+        create_batch_window=0.01,
+        metrics_registry=metrics_registry,
+    )
+    await user_repository.create_user(email="foo@bar.com", firstname="foo", lastname="")
+
+    async def create_user(email: str) -> str | None:
+        # Batches are committed on their own, not with the caller's unit of work.
+        async with sqlalchemy_manager.unit_of_work():
+            return await user_repository.create_user(email=email, firstname="", lastname="")
+
+    user_ids = await asyncio.gather(
+        create_user("baz@bar.com"),
+        create_user("foo@bar.com"),
+        create_user("qux@bar.com"),
+        create_user("baz@bar.com"),
+    )
+
+    assert user_ids[0] is not None
+    assert user_ids[2] is not None
+    assert user_ids[1] is None
+    assert user_ids[3] is None
+    users = await user_repository.get_users_by_ids(user_ids=[user_ids[0], user_ids[2]])
+    assert sorted(user.email for user in users) == ["baz@bar.com", "qux@bar.com"]
+    assert "user_create_batch_size_count 2.0" in metrics_registry.render()
+    assert "user_create_batch_size_sum 5.0" in metrics_registry.render()
+
+
+@pytest.mark.asyncio()
+async def test_batched_create_user_is_not_atomic_with_caller(
+    sqlalchemy_manager: SQLAlchemyManager,
+) -> None:
+    user_repository = SQLAlchemyUserRepository(
+        sqlalchemy_manager=sqlalchemy_manager,
+        create_batch_window=0.01,
+    )
+
+    async def create_user_and_fail() -> None:
+        async with sqlalchemy_manager.unit_of_work():
+            await user_repository.create_user(email="foo@bar.com", firstname="", lastname="")
+            raise ValueError("rollback")
+
+    with pytest.raises(ValueError, match="rollback"):
+        await create_user_and_fail()
+
+    # The batch was committed on its own, so rolling back the caller doesn't undo it.
+    assert await user_repository.exists_user_by_email(email="foo@bar.com")
+
+
+@pytest.mark.asyncio()
+async def test_batched_create_user_is_written_on_teardown(
+    sqlalchemy_manager: SQLAlchemyManager,
+) -> None:
+    user_repository = SQLAlchemyUserRepository(
+        sqlalchemy_manager=sqlalchemy_manager,
+        create_batch_window=60,
+    )
+
+    create_user = asyncio.create_task(
+        user_repository.create_user(email="foo@bar.com", firstname="", lastname=""),
+    )
+    await asyncio.sleep(0)
+    await sqlalchemy_manager.teardown()
+
+    # Written without waiting for the batch window.
+    assert await create_user is not None
+    await sqlalchemy_manager.setup()
+    assert await user_repository.exists_user_by_email(email="foo@bar.com")
+
+
+@pytest.mark.asyncio()
+async def test_caching_get_user_by_id(
+    user_repository_mock: Annotated[AsyncMock, UserRepository],
+    caching_user_repository: CachingUserRepository,
+) -> None:
+    user = User(id="1", email="foo@bar.com", profile=Profile())
+    user_repository_mock.get_user_by_id = AsyncMock(side_effect=[user, None])
+
+    assert await caching_user_repository.get_user_by_id(user_id="1") == user
+    assert await caching_user_repository.get_user_by_id(user_id="1") == user
+    assert await caching_user_repository.get_user_by_id(user_id="2") is None
+    assert await caching_user_repository.get_user_by_id(user_id="2") is None
+
+    health_report = await caching_user_repository.get_health_report()
+    assert (health_report.details["hits"], health_report.details["misses"]) == (2, 2)
+    assert user_repository_mock.get_user_by_id.call_args_list == [
+        call(user_id="1"),
+        call(user_id="2"),
+    ]
+
+
+@pytest.mark.asyncio()
+async def test_caching_skips_replica_reads(
+    user_repository_mock: Annotated[AsyncMock, UserRepository],
+    tmp_path: Path,
+) -> None:
+    sqlalchemy_manager = SQLAlchemyManager(
+        sqlalchemy_url=f"sqlite+aiosqlite:///{tmp_path / 'primary.sqlite'}",
+        replica_urls=[f"sqlite+aiosqlite:///{tmp_path / 'replica.sqlite'}"],
+        declarative_base_classes=[],
+        migrate_on_setup=False,
+    )
+    await sqlalchemy_manager.setup()
+    caching_user_repository = CachingUserRepository(
+        user_repository=user_repository_mock,
+        sqlalchemy_manager=sqlalchemy_manager,
+        max_size=10,
+        ttl=60,
+        negative_ttl=60,
+    )
+    user = User(id="1", email="foo@bar.com", profile=Profile())
+    user_repository_mock.get_user_by_id = AsyncMock(return_value=user)
+
+    # Replica may not have caught up with an invalidated write yet, so its reads aren't cached.
+    async with sqlalchemy_manager.unit_of_work(read_only=True):
+        assert await caching_user_repository.get_user_by_id(user_id="1") == user
+    # Misses outside of a unit of work are read from the primary database.
+    assert await caching_user_repository.get_user_by_id(user_id="1") == user
+    assert await caching_user_repository.get_user_by_id(user_id="1") == user
+
+    expected_calls = 2
+    assert user_repository_mock.get_user_by_id.call_count == expected_calls
+
+    await sqlalchemy_manager.teardown()
+
+
+@pytest.mark.asyncio()
+async def test_caching_invalidation(
+    user_repository_mock: Annotated[AsyncMock, UserRepository],
+    caching_user_repository: CachingUserRepository,
+) -> None:
+    user = User(id="1", email="foo@bar.com", profile=Profile())
+    updated_user = User(id="1", email="foo@bar.com", profile=Profile(firstname="foo"))
+    user_repository_mock.get_user_by_id = AsyncMock(side_effect=[user, updated_user, None])
+
+    await caching_user_repository.get_user_by_id(user_id="1")
+    await caching_user_repository.update_user_by_id(user_id="1", firstname="foo")
+    assert await caching_user_repository.get_user_by_id(user_id="1") == updated_user
+
+    await caching_user_repository.delete_user_by_id(user_id="1")
+    assert await caching_user_repository.get_user_by_id(user_id="1") is None
+
+    user_repository_mock.update_user_by_id.assert_called_once_with(
+        user_id="1",
+        firstname="foo",
+        lastname=None,
+    )
+    user_repository_mock.delete_user_by_id.assert_called_once_with(user_id="1")
+
+
+@pytest.mark.asyncio()
+async def test_caching_get_user_version_by_id(
+    user_repository_mock: Annotated[AsyncMock, UserRepository],
+    caching_user_repository: CachingUserRepository,
+) -> None:
+    user = User(id="1", email="foo@bar.com", profile=Profile(), version=3)
+    user_repository_mock.get_user_by_id = AsyncMock(return_value=user)
+    stored_version = 4
+    user_repository_mock.get_user_version_by_id = AsyncMock(return_value=stored_version)
+
+    assert await caching_user_repository.get_user_version_by_id(user_id="1") == stored_version
+    await caching_user_repository.get_user_by_id(user_id="1")
+    assert await caching_user_repository.get_user_version_by_id(user_id="1") == user.version
+
+    user_repository_mock.get_user_version_by_id.assert_called_once_with(user_id="1")
+
+
+@pytest.mark.asyncio()
+async def test_caching_get_users_by_ids(
+    user_repository_mock: Annotated[AsyncMock, UserRepository],
+    caching_user_repository: CachingUserRepository,
+) -> None:
+    user1 = User(id="1", email="foo@bar.com", profile=Profile())
+    user2 = User(id="2", email="baz@bar.com", profile=Profile())
+    user_repository_mock.get_user_by_id = AsyncMock(return_value=user1)
+    user_repository_mock.get_users_by_ids = AsyncMock(return_value=[user2])
+
+    await caching_user_repository.get_user_by_id(user_id="1")
+    users = await caching_user_repository.get_users_by_ids(user_ids=["1", "2", "3"])
+    cached_users = await caching_user_repository.get_users_by_ids(user_ids=["3", "2", "1"])
+
+    assert users == [user1, user2]
+    assert cached_users == [user2, user1]
+    user_repository_mock.get_users_by_ids.assert_called_once_with(user_ids=["2", "3"])
@@ -1,10 +1,27 @@
+from base64 import urlsafe_b64encode
+from collections.abc import AsyncIterator
 from typing import Annotated
-from unittest.mock import AsyncMock
+from unittest.mock import AsyncMock, MagicMock
 
 import pytest
 
-from python_webapp.apps.user_management.domain import Profile, User
-from python_webapp.apps.user_management.errors import DuplicateEmailError, UserNotFoundError
+from python_webapp.apps.user_management.domain import (
+    NewUser,
+    Profile,
+    User,
+    UserImportRecord,
+    UserImportRowResult,
+    UserImportStatus,
+    UserImportSummary,
+    UserSortOrder,
+    UserStatisticsMode,
+)
+from python_webapp.apps.user_management.errors import (
+    DuplicateEmailError,
+    InvalidCursorError,
+    TooManyUserIDsError,
+    UserNotFoundError,
+)
 from python_webapp.apps.user_management.repositories.user_repository import UserRepository
 from python_webapp.apps.user_management.services import UserManagementServices
 
@@ -16,19 +33,20 @@ def fixture_user_repository_mock() -> Annotated[AsyncMock, UserRepository]:
 
 @pytest.mark.asyncio()
 async def test_create_user(user_repository_mock: Annotated[AsyncMock, UserRepository]) -> None:
-    user_repository_mock.exists_user_by_email = AsyncMock(return_value=False)
-    user_repository_mock.create_user = AsyncMock()
+    user_repository_mock.create_user = AsyncMock(return_value="1")
 
     user_services = UserManagementServices(
         user_repository=user_repository_mock,
     )
 
-    await user_services.create_user(
+    output = await user_services.create_user(
         email="foo@bar.com",
         firstname="foo",
         lastname="bar",
     )
 
+    assert output == "1"
+
     user_repository_mock.create_user.assert_called_once_with(
         email="foo@bar.com",
         firstname="foo",
@@ -40,8 +58,7 @@ async def test_create_user(user_repository_mock: Annotated[AsyncMock, UserReposi
 async def test_create_user_duplicate_email_error(
     user_repository_mock: Annotated[AsyncMock, UserRepository],
 ) -> None:
-    user_repository_mock.exists_user_by_email = AsyncMock(return_value=True)
-    user_repository_mock.create_user = AsyncMock()
+    user_repository_mock.create_user = AsyncMock(return_value=None)
 
     user_services = UserManagementServices(
         user_repository=user_repository_mock,
@@ -54,7 +71,65 @@ async def test_create_user_duplicate_email_error(
             lastname="bar",
         )
 
-    user_repository_mock.create_user.assert_not_called()
+    user_repository_mock.exists_user_by_email.assert_not_called()
+
+
+@pytest.mark.asyncio()
+async def test_import_users(user_repository_mock: Annotated[AsyncMock, UserRepository]) -> None:
+    new_users = [NewUser(email=f"foo{i}@bar.com", profile=Profile()) for i in range(3)]
+    user_repository_mock.create_users_bulk = AsyncMock(side_effect=[["1", None], ["3"]])
+
+    async def records() -> AsyncIterator[UserImportRecord]:
+        yield UserImportRecord(row=1, user=new_users[0])
+        yield UserImportRecord(row=2, error="broken")
+        yield UserImportRecord(row=3, user=new_users[1])
+        yield UserImportRecord(row=4, user=new_users[2])
+
+    user_services = UserManagementServices(
+        user_repository=user_repository_mock,
+        import_chunk_size=2,
+        import_max_reported_rows=1,
+    )
+
+    output = await user_services.import_users(records=records())
+
+    assert output == UserImportSummary(
+        created=2,
+        duplicates=1,
+        failed=1,
+        rows=[UserImportRowResult(row=2, status=UserImportStatus.FAILED, error="broken")],
+        truncated=True,
+    )
+    assert user_repository_mock.create_users_bulk.call_args_list[0].kwargs == {
+        "users": new_users[:2],
+    }
+    assert user_repository_mock.create_users_bulk.call_args_list[1].kwargs == {
+        "users": new_users[2:],
+    }
+
+
+@pytest.mark.asyncio()
+async def test_export_users(user_repository_mock: Annotated[AsyncMock, UserRepository]) -> None:
+    users = [
+        User(id="1", email="foo1@bar.com", profile=Profile()),
+        User(id="2", email="foo2@bar.com", profile=Profile()),
+    ]
+
+    async def stream_users() -> AsyncIterator[User]:
+        for user in users:
+            yield user
+
+    user_repository_mock.stream_users = MagicMock(return_value=stream_users())
+
+    user_services = UserManagementServices(
+        user_repository=user_repository_mock,
+        export_fetch_size=500,
+    )
+
+    output = [user async for user in user_services.export_users()]
+
+    assert output == users
+    user_repository_mock.stream_users.assert_called_once_with(fetch_size=500)
 
 
 @pytest.mark.asyncio()
@@ -71,12 +146,140 @@ async def test_get_users(user_repository_mock: Annotated[AsyncMock, UserReposito
 
     output = await user_services.get_users(page=3)
 
-    assert output == users
+    assert output.users == users
+    assert output.next_cursor is None
     user_repository_mock.get_users.assert_called_once_with(
         offset=40,
-        limit=20,
+        limit=21,
+        sort_order=UserSortOrder.ID_ASC,
+        after=None,
+        user_filter=None,
+    )
+
+
+@pytest.mark.asyncio()
+async def test_get_users_with_cursor(
+    user_repository_mock: Annotated[AsyncMock, UserRepository],
+) -> None:
+    users = [
+        User(id="1", email="foo1@bar.com", profile=Profile()),
+        User(id="2", email="foo2@bar.com", profile=Profile()),
+        User(id="3", email="foo3@bar.com", profile=Profile()),
+    ]
+    user_repository_mock.get_users = AsyncMock(side_effect=[users, users[2:]])
+
+    user_services = UserManagementServices(
+        user_repository=user_repository_mock,
+    )
+
+    first_page = await user_services.get_users(page_size=2, sort_order=UserSortOrder.EMAIL_DESC)
+    assert first_page.users == users[:2]
+    assert first_page.next_cursor is not None
+
+    second_page = await user_services.get_users(
+        cursor=first_page.next_cursor,
+        page_size=2,
+        sort_order=UserSortOrder.EMAIL_DESC,
+    )
+    assert second_page.users == users[2:]
+    assert second_page.next_cursor is None
+    user_repository_mock.get_users.assert_called_with(
+        offset=0,
+        limit=3,
+        sort_order=UserSortOrder.EMAIL_DESC,
+        after="foo2@bar.com",
+        user_filter=None,
+    )
+
+
+@pytest.mark.asyncio()
+async def test_get_users_page_version(
+    user_repository_mock: Annotated[AsyncMock, UserRepository],
+) -> None:
+    users = [
+        User(id="1", email="foo1@bar.com", profile=Profile()),
+        User(id="2", email="foo2@bar.com", profile=Profile(), version=3),
+        User(id="3", email="foo3@bar.com", profile=Profile()),
+    ]
+    user_repository_mock.get_users = AsyncMock(return_value=users)
+    user_repository_mock.get_user_versions = AsyncMock(
+        side_effect=[
+            [("1", 1), ("2", 3), ("3", 1)],
+            [("1", 1), ("2", 4), ("3", 1)],
+            [("1", 1), ("2", 3)],
+        ],
+    )
+
+    user_services = UserManagementServices(
+        user_repository=user_repository_mock,
+    )
+
+    users_page = await user_services.get_users(page=2, page_size=2)
+    version = await user_services.get_users_page_version(page=2, page_size=2)
+    updated_version = await user_services.get_users_page_version(page=2, page_size=2)
+    last_page_version = await user_services.get_users_page_version(page=2, page_size=2)
+
+    # Both paths agree on the version, which changes with user versions and the next page.
+    assert version == users_page.version
+    assert updated_version != version
+    assert last_page_version != version
+    user_repository_mock.get_user_versions.assert_called_with(
+        offset=2,
+        limit=3,
+        sort_order=UserSortOrder.ID_ASC,
+        after=None,
+        user_filter=None,
+    )
+
+
+@pytest.mark.asyncio()
+async def test_get_users_page_size_is_capped(
+    user_repository_mock: Annotated[AsyncMock, UserRepository],
+) -> None:
+    user_repository_mock.get_users = AsyncMock(return_value=[])
+
+    user_services = UserManagementServices(
+        user_repository=user_repository_mock,
+        max_page_size=50,
+    )
+
+    await user_services.get_users(page=2, page_size=1000)
+
+    user_repository_mock.get_users.assert_called_once_with(
+        offset=50,
+        limit=51,
+        sort_order=UserSortOrder.ID_ASC,
+        after=None,
+        user_filter=None,
+    )
+
+
+@pytest.mark.asyncio()
+@pytest.mark.parametrize(
+    ("cursor", "sort_order"),
+    [
+        ("not-a-cursor", UserSortOrder.ID_ASC),
+        (urlsafe_b64encode(b'{"sort":"email","key":"a@b.com"}').decode(), UserSortOrder.ID_ASC),
+        (urlsafe_b64encode(b'{"sort":"id","key":"foo"}').decode(), UserSortOrder.ID_ASC),
+        # Non-ASCII digits, which `str.isdigit` accepts but aren't valid IDs.
+        (urlsafe_b64encode('{"sort":"id","key":"\u00b2"}'.encode()).decode(), UserSortOrder.ID_ASC),
+        (urlsafe_b64encode('{"sort":"id","key":"\u0661"}'.encode()).decode(), UserSortOrder.ID_ASC),
+    ],
+)
+async def test_get_users_invalid_cursor_error(
+    user_repository_mock: Annotated[AsyncMock, UserRepository],
+    cursor: str,
+    sort_order: UserSortOrder,
+) -> None:
+    user_services = UserManagementServices(
+        user_repository=user_repository_mock,
     )
 
+    with pytest.raises(InvalidCursorError):
+        await user_services.get_users(cursor=cursor, sort_order=sort_order)
+
+    user_repository_mock.get_users.assert_not_called()
+
 
 @pytest.mark.asyncio()
 async def test_get_user_by_id(user_repository_mock: Annotated[AsyncMock, UserRepository]) -> None:
@@ -107,11 +310,25 @@ async def test_get_user_by_id_not_found_error(
         await user_services.get_user_by_id(user_id="1")
 
 
+@pytest.mark.asyncio()
+async def test_get_user_version_by_id_not_found_error(
+    user_repository_mock: Annotated[AsyncMock, UserRepository],
+) -> None:
+    user_repository_mock.get_user_version_by_id = AsyncMock(return_value=None)
+
+    user_services = UserManagementServices(
+        user_repository=user_repository_mock,
+    )
+
+    with pytest.raises(UserNotFoundError):
+        await user_services.get_user_version_by_id(user_id="1")
+
+
 @pytest.mark.asyncio()
 async def test_delete_user_by_id(
     user_repository_mock: Annotated[AsyncMock, UserRepository],
 ) -> None:
-    user_repository_mock.delete_user_by_id = AsyncMock()
+    user_repository_mock.delete_user_by_id = AsyncMock(return_value="foo@bar.com")
 
     user_services = UserManagementServices(
         user_repository=user_repository_mock,
@@ -139,3 +356,109 @@ async def test_update_user_by_id(
         firstname="foo",
         lastname="bar",
     )
+
+
+@pytest.mark.asyncio()
+async def test_get_user_statistics_maintained(
+    user_repository_mock: Annotated[AsyncMock, UserRepository],
+) -> None:
+    user_repository_mock.count_users_by_email_domain = AsyncMock(return_value={"bar.com": 1})
+    user_repository_mock.create_user = AsyncMock(return_value="2")
+    user_repository_mock.delete_user_by_id = AsyncMock(return_value="foo@bar.com")
+    user_repository_mock.on_unit_of_work_commit = MagicMock(side_effect=lambda callback: callback())
+
+    user_services = UserManagementServices(
+        user_repository=user_repository_mock,
+    )
+
+    statistics = await user_services.get_user_statistics()
+    assert statistics.by_email_domain == {"bar.com": 1}
+
+    await user_services.create_user(email="baz@example.org", firstname="", lastname="")
+    await user_services.delete_user_by_id(user_id="1")
+    statistics = await user_services.get_user_statistics()
+
+    assert statistics.mode == UserStatisticsMode.MAINTAINED
+    assert statistics.total == 1
+    assert statistics.by_email_domain == {"example.org": 1}
+    user_repository_mock.count_users_by_email_domain.assert_awaited_once()
+
+
+@pytest.mark.asyncio()
+async def test_get_user_statistics_maintained_ignores_uncommitted_users(
+    user_repository_mock: Annotated[AsyncMock, UserRepository],
+) -> None:
+    user_repository_mock.count_users_by_email_domain = AsyncMock(return_value={"bar.com": 1})
+    user_repository_mock.create_user = AsyncMock(return_value="2")
+    # Unit of work is rolled back, so the callbacks are never called.
+    user_repository_mock.on_unit_of_work_commit = MagicMock()
+
+    user_services = UserManagementServices(
+        user_repository=user_repository_mock,
+    )
+
+    await user_services.get_user_statistics()
+    await user_services.create_user(email="baz@example.org", firstname="", lastname="")
+    statistics = await user_services.get_user_statistics()
+
+    assert statistics.total == 1
+    assert statistics.by_email_domain == {"bar.com": 1}
+
+
+@pytest.mark.asyncio()
+async def test_get_user_statistics_approximate(
+    user_repository_mock: Annotated[AsyncMock, UserRepository],
+) -> None:
+    estimated_total = 1000
+    user_repository_mock.estimate_user_count = AsyncMock(return_value=(estimated_total, None))
+
+    user_services = UserManagementServices(
+        user_repository=user_repository_mock,
+    )
+
+    statistics = await user_services.get_user_statistics(mode=UserStatisticsMode.APPROXIMATE)
+
+    assert statistics.mode == UserStatisticsMode.APPROXIMATE
+    assert statistics.total == estimated_total
+    assert statistics.by_email_domain == {}
+    user_repository_mock.count_users_by_email_domain.assert_not_called()
+
+
+@pytest.mark.asyncio()
+async def test_get_user_statistics_approximate_without_estimate(
+    user_repository_mock: Annotated[AsyncMock, UserRepository],
+) -> None:
+    user_repository_mock.estimate_user_count = AsyncMock(return_value=None)
+    user_repository_mock.count_users_by_email_domain = AsyncMock(return_value={"bar.com": 1})
+
+    user_services = UserManagementServices(
+        user_repository=user_repository_mock,
+    )
+
+    statistics = await user_services.get_user_statistics(mode=UserStatisticsMode.APPROXIMATE)
+
+    assert statistics.mode == UserStatisticsMode.MAINTAINED
+    assert statistics.total == 1
+
+
+@pytest.mark.asyncio()
+async def test_get_users_by_ids(
+    user_repository_mock: Annotated[AsyncMock, UserRepository],
+) -> None:
+    user1 = User(id="1", email="foo@bar.com", profile=Profile())
+    user2 = User(id="2", email="baz@bar.com", profile=Profile())
+    user_repository_mock.get_users_by_ids = AsyncMock(return_value=[user1, user2])
+
+    user_services = UserManagementServices(
+        user_repository=user_repository_mock,
+        max_page_size=3,
+    )
+
+    users, missing_ids = await user_services.get_users_by_ids(user_ids=["2", "3", "1", "2"])
+
+    assert users == [user2, user1]
+    assert missing_ids == ["3"]
+    user_repository_mock.get_users_by_ids.assert_called_once_with(user_ids=["2", "3", "1"])
+
+    with pytest.raises(TooManyUserIDsError):
+        await user_services.get_users_by_ids(user_ids=["1", "2", "3", "4"])
@@ -0,0 +1,73 @@
+import asyncio
+from typing import Annotated
+from unittest.mock import AsyncMock
+
+import pytest
+
+from python_webapp.apps.user_management.domain import UserStatisticsMode
+from python_webapp.apps.user_management.repositories.user_repository import UserRepository
+from python_webapp.apps.user_management.statistics import UserStatisticsTracker
+
+
+@pytest.fixture(name="user_repository_mock")
+def fixture_user_repository_mock() -> Annotated[AsyncMock, UserRepository]:
+    return AsyncMock(UserRepository)
+
+
+@pytest.mark.asyncio()
+async def test_sync_and_adjust(
+    user_repository_mock: Annotated[AsyncMock, UserRepository],
+) -> None:
+    user_repository_mock.count_users_by_email_domain = AsyncMock(
+        return_value={"bar.com": 2, "example.org": 1},
+    )
+    tracker = UserStatisticsTracker(user_repository=user_repository_mock)
+    assert tracker.get_statistics().synced_at is None
+
+    await tracker.sync()
+    tracker.add("baz@Bar.com")
+    tracker.add("qux@new.com")
+    tracker.remove("foo@example.org")
+
+    statistics = tracker.get_statistics()
+    assert statistics.mode == UserStatisticsMode.MAINTAINED
+    assert statistics.by_email_domain == {"bar.com": 3, "new.com": 1}
+    assert statistics.total == sum(statistics.by_email_domain.values())
+    assert statistics.synced_at is not None
+
+
+@pytest.mark.asyncio()
+async def test_sync_keeps_writes_made_while_counting(
+    user_repository_mock: Annotated[AsyncMock, UserRepository],
+) -> None:
+    counting = asyncio.Event()
+    counted = asyncio.Event()
+
+    async def count_users_by_email_domain() -> dict[str, int]:
+        counting.set()
+        await counted.wait()
+        return {"bar.com": 1}
+
+    user_repository_mock.count_users_by_email_domain = count_users_by_email_domain
+    tracker = UserStatisticsTracker(user_repository=user_repository_mock)
+
+    sync_task = asyncio.create_task(tracker.sync())
+    await counting.wait()
+    tracker.add("foo@example.org")
+    counted.set()
+    await sync_task
+
+    assert tracker.get_statistics().by_email_domain == {"bar.com": 1, "example.org": 1}
+
+
+@pytest.mark.asyncio()
+async def test_ensure_synced_counts_once(
+    user_repository_mock: Annotated[AsyncMock, UserRepository],
+) -> None:
+    user_repository_mock.count_users_by_email_domain = AsyncMock(return_value={"bar.com": 1})
+    tracker = UserStatisticsTracker(user_repository=user_repository_mock)
+
+    await asyncio.gather(tracker.ensure_synced(), tracker.ensure_synced())
+    await tracker.ensure_synced()
+
+    user_repository_mock.count_users_by_email_domain.assert_awaited_once()
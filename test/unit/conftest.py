@@ -0,0 +1,23 @@
+from collections.abc import AsyncIterator
+from pathlib import Path
+
+import pytest_asyncio
+
+from python_webapp.apps.user_management.repositories.db_models import Base
+from python_webapp.managers.sqlalchemy_manager import SQLAlchemyManager
+
+
+@pytest_asyncio.fixture(name="sqlalchemy_manager")
+async def fixture_sqlalchemy_manager(tmp_path: Path) -> AsyncIterator[SQLAlchemyManager]:
+    sqlalchemy_manager = SQLAlchemyManager(
+        sqlalchemy_url=f"sqlite+aiosqlite:///{tmp_path / 'db.sqlite'}",
+        declarative_base_classes=[Base],
+        migrate_on_setup=False,
+    )
+    await sqlalchemy_manager.setup()
+    async with sqlalchemy_manager.session() as session:
+        await session.run_sync(lambda sync_session: Base.metadata.create_all(sync_session.bind))
+
+    yield sqlalchemy_manager
+
+    await sqlalchemy_manager.teardown()
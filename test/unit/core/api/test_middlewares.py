@@ -0,0 +1,29 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from python_webapp.core.api.middlewares import MetricsMiddleware
+from python_webapp.core.metrics import MetricsRegistry
+
+
+def test_metrics_middleware() -> None:
+    metrics_registry = MetricsRegistry()
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware, metrics_registry=metrics_registry)
+
+    @app.get("/items/{item_id}")
+    async def get_item(item_id: int) -> dict[str, int]:
+        return {"item_id": item_id}
+
+    with TestClient(app) as client:
+        client.get("/items/1")
+        client.get("/items/2")
+        client.get("/other")
+
+    output = metrics_registry.render()
+
+    assert 'http_requests_total{method="GET",route="/items/{item_id}",status="200"} 2.0' in output
+    assert 'http_requests_total{method="GET",route="unmatched",status="404"} 1.0' in output
+    assert (
+        'http_request_duration_seconds_count{method="GET",route="/items/{item_id}"} 2.0' in output
+    )
+    assert "http_requests_in_flight 0.0" in output
@@ -0,0 +1,127 @@
+import asyncio
+import contextvars
+from collections.abc import Mapping
+
+import pytest
+
+from python_webapp.core.batching import BatchLoader, BatchWriter
+
+request_id: contextvars.ContextVar[str | None] = contextvars.ContextVar("request_id", default=None)
+
+
+@pytest.mark.asyncio()
+async def test_batch_loader_coalesces_loads() -> None:
+    batches: list[list[int]] = []
+    contexts: list[str | None] = []
+
+    async def load_batch(keys: list[int]) -> Mapping[int, str]:
+        batches.append(keys)
+        contexts.append(request_id.get())
+        await asyncio.sleep(0)
+        return {key: str(key) for key in keys if key != 0}
+
+    batch_loader = BatchLoader(load_batch, max_batch_size=2)
+    request_id.set("first")
+
+    values = await asyncio.gather(
+        batch_loader.load(1),
+        batch_loader.load(2),
+        batch_loader.load(1),
+        batch_loader.load(0),
+    )
+
+    assert values == ["1", "2", "1", None]
+    assert batches == [[1, 2], [0]]
+    # Batches don't run in the context of the first caller.
+    assert contexts == [None, None]
+
+
+@pytest.mark.asyncio()
+async def test_batch_loader_shares_in_flight_loads() -> None:
+    started = asyncio.Event()
+    release = asyncio.Event()
+    batches: list[list[int]] = []
+
+    async def load_batch(keys: list[int]) -> Mapping[int, int]:
+        batches.append(keys)
+        started.set()
+        await release.wait()
+        return {key: key for key in keys}
+
+    batch_loader = BatchLoader(load_batch)
+
+    first = asyncio.create_task(batch_loader.load(1))
+    await started.wait()
+    second = asyncio.create_task(batch_loader.load(1))
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await asyncio.gather(first, second) == [1, 1]
+    assert batches == [[1]]
+
+
+@pytest.mark.asyncio()
+async def test_batch_loader_propagates_errors() -> None:
+    async def load_batch(keys: list[int]) -> Mapping[int, int]:
+        raise RuntimeError(f"Loading {keys} failed")
+
+    batch_loader = BatchLoader(load_batch)
+
+    results = await asyncio.gather(
+        batch_loader.load(1),
+        batch_loader.load(2),
+        return_exceptions=True,
+    )
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+
+@pytest.mark.asyncio()
+async def test_batch_writer_flushes_full_batches() -> None:
+    batches: list[list[str]] = []
+
+    async def write_batch(items: list[str]) -> list[str]:
+        batches.append(items)
+        return [item.upper() for item in items]
+
+    # The last, partial batch is written after the delay.
+    batch_writer = BatchWriter(write_batch, max_delay=0.05, max_batch_size=2)
+
+    results = await asyncio.gather(*(batch_writer.write(item) for item in "abc"))
+
+    assert results == ["A", "B", "C"]
+    assert batches == [["a", "b"], ["c"]]
+
+
+@pytest.mark.asyncio()
+async def test_batch_writer_propagates_errors() -> None:
+    async def write_batch(items: list[str]) -> list[str]:
+        raise RuntimeError(f"Writing {items} failed")
+
+    batch_writer = BatchWriter(write_batch, max_delay=0)
+
+    results = await asyncio.gather(
+        batch_writer.write("a"),
+        batch_writer.write("b"),
+        return_exceptions=True,
+    )
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+
+@pytest.mark.asyncio()
+async def test_batch_writer_close_writes_pending_items() -> None:
+    batches: list[list[str]] = []
+
+    async def write_batch(items: list[str]) -> list[str]:
+        batches.append(items)
+        return [item.upper() for item in items]
+
+    batch_writer = BatchWriter(write_batch, max_delay=60)
+
+    write = asyncio.create_task(batch_writer.write("a"))
+    await asyncio.sleep(0)
+    await batch_writer.close()
+
+    assert batches == [["a"]]
+    assert await write == "A"
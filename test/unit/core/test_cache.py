@@ -0,0 +1,35 @@
+from python_webapp.core.cache import TTLCache
+
+
+def test_ttl_cache_expiration() -> None:
+    now = 0.0
+    cache: TTLCache[str, int | None] = TTLCache(max_size=10, ttl=10, timer=lambda: now)
+
+    cache.set("foo", 1)
+    cache.set("bar", None, ttl=1)
+
+    assert cache.get("foo") == (True, 1)
+    assert cache.get("bar") == (True, None)
+
+    now = 5.0
+    assert cache.get("foo") == (True, 1)
+    assert cache.get("bar") == (False, None)
+
+    now = 10.0
+    assert cache.get("foo") == (False, None)
+    assert len(cache) == 0
+    assert (cache.hits, cache.misses) == (3, 2)
+
+
+def test_ttl_cache_lru_eviction() -> None:
+    cache: TTLCache[str, int] = TTLCache(max_size=2, ttl=10)
+
+    cache.set("foo", 1)
+    cache.set("bar", 2)
+    cache.get("foo")
+    cache.set("baz", 3)
+
+    assert cache.get("bar") == (False, None)
+    assert cache.get("foo") == (True, 1)
+    assert cache.get("baz") == (True, 3)
+    assert cache.evictions == 1
@@ -0,0 +1,12 @@
+import json
+
+import pytest
+
+from python_webapp.core.extras import require_extra
+
+
+def test_require_extra() -> None:
+    assert require_extra("json", extra="json") is json
+
+    with pytest.raises(ImportError, match=r"install the `missing` extra"):
+        require_extra("python_webapp_missing_module", extra="missing")
@@ -0,0 +1,71 @@
+import json
+import os
+from pathlib import Path
+
+import pytest
+
+from python_webapp.core.metrics import MetricsRegistry
+
+DEAD_PID = 2**22 + 1
+
+
+def test_render() -> None:
+    metrics_registry = MetricsRegistry()
+    counter = metrics_registry.counter("requests_total", "Requests.", ("route",))
+    histogram = metrics_registry.histogram("duration_seconds", "Duration.", buckets=(0.1, 1.0))
+    gauge = metrics_registry.gauge("in_flight", "In flight.")
+    metrics_registry.add_collector(lambda: gauge.set(value=3))
+
+    counter.inc('/a"b')
+    counter.inc('/a"b', amount=2)
+    histogram.observe(value=0.05)
+    histogram.observe(value=0.5)
+    histogram.observe(value=5)
+
+    assert metrics_registry.render() == (
+        "# HELP requests_total Requests.\n"
+        "# TYPE requests_total counter\n"
+        'requests_total{route="/a\\"b"} 3.0\n'
+        "# HELP duration_seconds Duration.\n"
+        "# TYPE duration_seconds histogram\n"
+        'duration_seconds_bucket{le="0.1"} 1.0\n'
+        'duration_seconds_bucket{le="1.0"} 2.0\n'
+        'duration_seconds_bucket{le="+Inf"} 3.0\n'
+        "duration_seconds_sum 5.55\n"
+        "duration_seconds_count 3.0\n"
+        "# HELP in_flight In flight.\n"
+        "# TYPE in_flight gauge\n"
+        "in_flight 3.0\n"
+    )
+
+
+def test_register_existing() -> None:
+    metrics_registry = MetricsRegistry()
+    counter = metrics_registry.counter("requests_total", "Requests.", ("route",))
+
+    assert metrics_registry.counter("requests_total", "Requests.", ("route",)) is counter
+    with pytest.raises(ValueError, match="already registered"):
+        metrics_registry.gauge("requests_total", "Requests.", ("route",))
+
+
+def test_render_multiprocess(tmp_path: Path) -> None:
+    metrics_registry = MetricsRegistry(multiprocess_dir=str(tmp_path))
+    counter = metrics_registry.counter("requests_total", "Requests.", ("route",))
+    gauge = metrics_registry.gauge("in_flight", "In flight.")
+    counter.inc("/a")
+    gauge.inc()
+
+    other_snapshot = {
+        "requests_total": [[["/a"], [2.0]], [["/b"], [1.0]]],
+        "in_flight": [[[], [4.0]]],
+    }
+    (tmp_path / f"{os.getppid()}.json").write_text(json.dumps(other_snapshot))
+    (tmp_path / f"{DEAD_PID}.json").write_text(json.dumps(other_snapshot))
+
+    output = metrics_registry.render()
+
+    # Gauges of the exited process are dropped, its counters are kept.
+    assert 'requests_total{route="/a"} 5.0\n' in output
+    assert 'requests_total{route="/b"} 2.0\n' in output
+    assert "in_flight 5.0\n" in output
+    assert (tmp_path / f"{os.getpid()}.json").exists()
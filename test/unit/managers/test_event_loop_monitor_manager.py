@@ -0,0 +1,44 @@
+import asyncio
+import time
+
+import pytest
+
+from python_webapp.core.metrics import MetricsRegistry
+from python_webapp.managers.event_loop_monitor_manager import EventLoopMonitorManager
+
+
+def _block_event_loop(duration: float) -> None:
+    time.sleep(duration)
+
+
+@pytest.mark.asyncio()
+async def test_event_loop_monitor() -> None:
+    metrics_registry = MetricsRegistry()
+    event_loop_monitor_manager = EventLoopMonitorManager(
+        interval=0.01,
+        slow_callback_threshold=0.05,
+        degraded_lag=0.1,
+        metrics_registry=metrics_registry,
+    )
+    await event_loop_monitor_manager.setup()
+    run_task = asyncio.create_task(event_loop_monitor_manager.run())
+
+    await asyncio.sleep(0.1)
+    health_report = await event_loop_monitor_manager.get_health_report()
+    assert health_report.is_healthy
+    assert health_report.details["slow_callbacks"] == 0
+
+    _block_event_loop(0.3)
+    await asyncio.sleep(0.05)
+
+    health_report = await event_loop_monitor_manager.get_health_report()
+    assert not health_report.is_healthy
+    assert health_report.details["slow_callbacks"] == 1
+    assert health_report.details["last_slow_callback_ms"] > 0
+    # Stack is logged, but not exposed in the health report.
+    assert not any("_block_event_loop" in str(value) for value in health_report.details.values())
+    assert "_block_event_loop" in event_loop_monitor_manager.get_slow_callbacks()[-1].stack
+    assert "event_loop_slow_callbacks_total 1.0" in metrics_registry.render()
+
+    run_task.cancel()
+    await event_loop_monitor_manager.teardown()
@@ -0,0 +1,31 @@
+import asyncio
+import contextlib
+
+import pytest
+
+from python_webapp.managers.periodic_task_manager import PeriodicTaskManager
+
+
+@pytest.mark.asyncio()
+async def test_periodic_task_manager_retries_failed_runs() -> None:
+    runs: list[int] = []
+    ran_again = asyncio.Event()
+
+    async def task() -> None:
+        runs.append(len(runs))
+        if len(runs) == 1:
+            raise RuntimeError("First run fails")
+
+        ran_again.set()
+
+    periodic_task_manager = PeriodicTaskManager(name="test", task=task, interval=0.01)
+    await periodic_task_manager.setup()
+    assert not runs
+
+    run_task = asyncio.create_task(periodic_task_manager.run())
+    await asyncio.wait_for(ran_again.wait(), timeout=5)
+    run_task.cancel()
+    with contextlib.suppress(asyncio.CancelledError):
+        await run_task
+
+    await periodic_task_manager.teardown()
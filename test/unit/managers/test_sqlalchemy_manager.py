@@ -0,0 +1,294 @@
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+from sqlalchemy import bindparam, literal_column, select, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+from python_webapp.core.metrics import MetricsRegistry
+from python_webapp.managers.sqlalchemy_manager import (
+    SQLAlchemyManager,
+    get_head_revisions,
+    get_statement_label,
+)
+
+
+def test_get_head_revisions(tmp_path: Path) -> None:
+    (tmp_path / "a_first.py").write_text('revision: str = "a"\ndown_revision = None\n')
+    (tmp_path / "b_second.py").write_text("revision = 'b'\ndown_revision: str | None = 'a'\n")
+    (tmp_path / "c_branch.py").write_text('revision = "c"\ndown_revision = "a"\n')
+    (tmp_path / "d_merge.py").write_text('revision = "d"\ndown_revision = ("b", "c")\n')
+    (tmp_path / "e_other.py").write_text('revision = "e"\ndown_revision = "d"\n')
+    (tmp_path / "f_other.py").write_text('revision = "f"\ndown_revision = "d"\n')
+
+    assert get_head_revisions(tmp_path) == frozenset({"e", "f"})
+
+
+@pytest.mark.parametrize(
+    ("statement", "expected_label"),
+    [
+        (
+            "SELECT id\n  FROM item\n WHERE id IN (%(id_1_1)s, %(id_1_2)s)",
+            "SELECT id FROM item WHERE id IN (...)",
+        ),
+        (
+            "INSERT INTO item (a, b) VALUES (?, ?), (?, ?), (?, ?) RETURNING id",
+            "INSERT INTO item (a, b) VALUES (...) RETURNING id",
+        ),
+        ("SELECT count(id) FROM item", "SELECT count(id) FROM item"),
+    ],
+)
+def test_get_statement_label(statement: str, expected_label: str) -> None:
+    assert get_statement_label(statement) == expected_label
+
+
+@pytest.mark.asyncio()
+@pytest.mark.parametrize(
+    ("version_num", "is_upgraded"),
+    [
+        (None, True),
+        ("old", True),
+        (next(iter(get_head_revisions())), False),
+    ],
+)
+async def test_migrate_skips_when_current(
+    tmp_path: Path,
+    version_num: str | None,
+    is_upgraded: bool,
+) -> None:
+    sqlalchemy_url = f"sqlite+aiosqlite:///{tmp_path / 'db.sqlite'}"
+    if version_num is not None:
+        engine = create_async_engine(sqlalchemy_url)
+        async with engine.begin() as conn:
+            await conn.execute(text("CREATE TABLE alembic_version (version_num VARCHAR(32));"))
+            await conn.execute(
+                text("INSERT INTO alembic_version VALUES (:version_num);"),
+                {"version_num": version_num},
+            )
+        await engine.dispose()
+
+    sqlalchemy_manager = SQLAlchemyManager(
+        sqlalchemy_url=sqlalchemy_url,
+        declarative_base_classes=[],
+    )
+    upgrade_mock = MagicMock()
+    with patch("alembic.command.upgrade", upgrade_mock):
+        await sqlalchemy_manager.migrate()
+
+    assert upgrade_mock.called is is_upgraded
+
+
+@pytest.mark.asyncio()
+async def test_unit_of_work(sqlalchemy_manager: SQLAlchemyManager) -> None:
+    async with sqlalchemy_manager.session() as session:
+        await session.execute(text("CREATE TABLE item (name VARCHAR(32));"))
+
+    checkouts = sqlalchemy_manager.get_pool_stats()["checkouts"]
+    callback = MagicMock()
+    commit_callback = MagicMock()
+    async with sqlalchemy_manager.unit_of_work():
+        sqlalchemy_manager.on_unit_of_work_end(callback)
+        sqlalchemy_manager.on_unit_of_work_commit(commit_callback)
+        async with sqlalchemy_manager.session() as session1:
+            await session1.execute(text("INSERT INTO item VALUES ('foo');"))
+        async with sqlalchemy_manager.session() as session2:
+            await session2.execute(text("INSERT INTO item VALUES ('bar');"))
+
+        assert session1 is session2
+        callback.assert_not_called()
+        commit_callback.assert_not_called()
+
+    callback.assert_called_once()
+    commit_callback.assert_called_once()
+    assert sqlalchemy_manager.get_pool_stats()["checkouts"] == checkouts + 1
+
+    async def insert_and_fail() -> None:
+        async with sqlalchemy_manager.unit_of_work():
+            async with sqlalchemy_manager.session() as session:
+                await session.execute(text("INSERT INTO item VALUES ('baz');"))
+            sqlalchemy_manager.on_unit_of_work_commit(commit_callback)
+            raise ValueError("rollback")
+
+    with pytest.raises(ValueError, match="rollback"):
+        await insert_and_fail()
+
+    commit_callback.assert_called_once()
+
+    assert sqlalchemy_manager.get_detached_read_use_primary() is False
+    async with sqlalchemy_manager.unit_of_work():
+        # Reads of a write unit of work may depend on its uncommitted writes.
+        assert sqlalchemy_manager.get_detached_read_use_primary() is None
+
+    async with sqlalchemy_manager.unit_of_work(read_only=True, use_primary=True):
+        assert sqlalchemy_manager.get_detached_read_use_primary() is True
+
+    async with sqlalchemy_manager.unit_of_work(read_only=True):
+        assert sqlalchemy_manager.get_detached_read_use_primary() is False
+
+    async with sqlalchemy_manager.session() as session:
+        names = await session.scalars(text("SELECT name FROM item ORDER BY name;"))
+        assert names.all() == ["bar", "foo"]
+
+    # Unit of work without any database calls doesn't check out a connection.
+    assert sqlalchemy_manager.get_pool_stats()["checkouts"] == checkouts + 3
+
+
+@pytest.mark.asyncio()
+async def test_pool(tmp_path: Path) -> None:
+    pool_timeout = 0.1
+    sqlalchemy_manager = SQLAlchemyManager(
+        sqlalchemy_url=f"sqlite+aiosqlite:///{tmp_path / 'db.sqlite'}",
+        declarative_base_classes=[],
+        migrate_on_setup=False,
+        pool_size=1,
+        pool_max_overflow=0,
+        pool_timeout=pool_timeout,
+        pool_use_lifo=True,
+    )
+    await sqlalchemy_manager.setup()
+    async with sqlalchemy_manager.session() as session:
+        pool = session.get_bind().pool
+
+    assert pool.size() == 1
+    assert pool.timeout() == pool_timeout
+    stats_before = sqlalchemy_manager.get_pool_stats()
+
+    async with sqlalchemy_manager.session() as session:
+        await session.execute(text("SELECT 1;"))
+        # Only connection of the pool is checked out, so the next checkout times out.
+        with pytest.raises(PoolTimeoutError):
+            async with sqlalchemy_manager.session() as other_session:
+                await other_session.execute(text("SELECT 1;"))
+
+    stats = sqlalchemy_manager.get_pool_stats()
+    assert stats["checkouts"] == stats_before["checkouts"] + 2
+    assert stats["timeouts"] == stats_before["timeouts"] + 1
+    assert stats["max_wait_ms"] >= pool_timeout * 1000
+    # Connection is opened once (by the setup health probe) and reused since.
+    assert stats["connects"] == stats_before["connects"] == 1
+    assert stats["max_connect_ms"] > 0
+
+    health_report = await sqlalchemy_manager.get_health_report()
+    assert health_report.details["pool_size"] == 1
+    assert health_report.details["timeouts"] == stats["timeouts"]
+    assert health_report.details["connects"] == 1
+    assert health_report.details["max_wait_ms"] == stats["max_wait_ms"]
+
+    await sqlalchemy_manager.teardown()
+
+
+@pytest.mark.asyncio()
+async def test_get_compiled_cache_stats(sqlalchemy_manager: SQLAlchemyManager) -> None:
+    statement = select(literal_column("1")).where(literal_column("1") == bindparam("value"))
+    stats_before = sqlalchemy_manager.get_compiled_cache_stats()
+
+    executions = 3
+    for value in range(executions):
+        async with sqlalchemy_manager.session() as session:
+            await session.execute(statement, {"value": value})
+
+    stats = sqlalchemy_manager.get_compiled_cache_stats()
+    assert stats["compiled_cache_hits"] - stats_before["compiled_cache_hits"] == executions - 1
+    assert stats["compiled_cache_misses"] - stats_before["compiled_cache_misses"] == 1
+
+
+@pytest.mark.asyncio()
+async def test_replica_routing(tmp_path: Path) -> None:
+    for name in ("primary", "replica"):
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / name}.sqlite")
+        async with engine.begin() as conn:
+            await conn.execute(text("CREATE TABLE item (name VARCHAR(32));"))
+            await conn.execute(text("INSERT INTO item VALUES (:name);"), {"name": name})
+        await engine.dispose()
+
+    sqlalchemy_manager = SQLAlchemyManager(
+        sqlalchemy_url=f"sqlite+aiosqlite:///{tmp_path / 'primary'}.sqlite",
+        replica_urls=[
+            f"sqlite+aiosqlite:///{tmp_path / 'replica'}.sqlite",
+            f"sqlite+aiosqlite:///{tmp_path / 'missing' / 'replica'}.sqlite",
+        ],
+        declarative_base_classes=[],
+        migrate_on_setup=False,
+    )
+    await sqlalchemy_manager.setup()
+
+    async def read_name(read_only: bool) -> str:
+        async with sqlalchemy_manager.session(read_only=read_only) as session:
+            return await session.scalar(text("SELECT name FROM item;"))
+
+    # Unreachable replica is taken out of rotation, so all reads go to the healthy one.
+    assert [await read_name(read_only=True) for _ in range(3)] == ["replica"] * 3
+    assert await read_name(read_only=False) == "primary"
+
+    async with sqlalchemy_manager.unit_of_work(read_only=True, use_primary=True):
+        assert await read_name(read_only=True) == "primary"
+
+    async with sqlalchemy_manager.unit_of_work(read_only=True):
+        assert await read_name(read_only=True) == "replica"
+
+    health_report = await sqlalchemy_manager.get_health_report()
+    assert health_report.is_healthy
+    assert health_report.details["replica_0_healthy"] is True
+    assert health_report.details["replica_1_healthy"] is False
+    assert health_report.details["healthy_replicas"] == 1
+
+    pools = [
+        sqlalchemy_manager.get_async_session(read_only=read_only).get_bind().pool
+        for read_only in (False, True)
+    ]
+    assert all(pool.checkedin() > 0 for pool in pools)
+
+    await sqlalchemy_manager.teardown()
+
+    # Pooled connections of the primary and replicas are closed.
+    assert all(pool.checkedin() == 0 for pool in pools)
+
+
+@pytest.mark.asyncio()
+async def test_health_probe_unexpected_error(tmp_path: Path) -> None:
+    sqlalchemy_manager = SQLAlchemyManager(
+        sqlalchemy_url=f"sqlite+aiosqlite:///{tmp_path / 'db.sqlite'}",
+        declarative_base_classes=[],
+        migrate_on_setup=False,
+    )
+    with patch.object(AsyncEngine, "connect", side_effect=RuntimeError("driver bug")):
+        await sqlalchemy_manager.setup()
+
+    health_report = await sqlalchemy_manager.get_health_report()
+    assert not health_report.is_healthy
+
+    await sqlalchemy_manager.teardown()
+
+
+@pytest.mark.asyncio()
+async def test_metrics(tmp_path: Path) -> None:
+    metrics_registry = MetricsRegistry()
+    sqlalchemy_manager = SQLAlchemyManager(
+        sqlalchemy_url=f"sqlite+aiosqlite:///{tmp_path / 'db.sqlite'}",
+        declarative_base_classes=[],
+        migrate_on_setup=False,
+        metrics_registry=metrics_registry,
+    )
+    await sqlalchemy_manager.setup()
+
+    async with sqlalchemy_manager.session() as session:
+        await session.execute(text("SELECT 1 WHERE 1 IN (:a, :b);"), {"a": 1, "b": 2})
+        await session.execute(text("SELECT 1 WHERE 1 IN (:a, :b, :c);"), {"a": 1, "b": 2, "c": 3})
+
+    with pytest.raises(OperationalError):
+        async with sqlalchemy_manager.session() as session:
+            await session.execute(text("SELECT * FROM missing;"))
+
+    output = metrics_registry.render()
+
+    label = 'engine="primary",statement="SELECT 1 WHERE 1 IN (...);"'
+    assert f"db_statement_duration_seconds_count{{{label}}} 2.0" in output
+    assert (
+        'db_statement_errors_total{engine="primary",statement="SELECT * FROM missing;"} 1.0'
+        in output
+    )
+    assert 'db_pool_checked_out{engine="primary"} 0.0' in output
+
+    await sqlalchemy_manager.teardown()
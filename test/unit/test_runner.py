@@ -1,3 +1,5 @@
+import asyncio
+import sys
 from unittest.mock import AsyncMock
 
 import pytest
@@ -48,3 +50,139 @@ def test_run_with_error() -> None:
     manager2.run.assert_called()
     manager1.teardown.assert_called()
     manager2.teardown.assert_called()
+
+
+def test_run_stops_when_a_manager_stops() -> None:
+    manager1 = AsyncMock(Manager)
+    manager2 = AsyncMock(Manager)
+    manager2_cancelled = asyncio.Event()
+
+    async def run_forever() -> None:
+        try:
+            await asyncio.Event().wait()
+        except asyncio.CancelledError:
+            manager2_cancelled.set()
+            raise
+
+    manager2.run = run_forever
+
+    runner = Runner(
+        managers=[
+            manager1,
+            manager2,
+        ],
+    )
+
+    runner.run()
+
+    assert manager2_cancelled.is_set()
+    manager1.teardown.assert_called()
+    manager2.teardown.assert_called()
+
+
+def test_run_sets_up_managers_in_dependency_order() -> None:
+    events = []
+
+    def create_manager(name: str, depends_on: list[Manager]) -> AsyncMock:
+        manager = AsyncMock(Manager)
+        manager.depends_on = depends_on
+
+        async def setup() -> None:
+            events.append(f"{name}.setup.start")
+            await asyncio.sleep(0)
+            events.append(f"{name}.setup.end")
+
+        async def teardown() -> None:
+            events.append(f"{name}.teardown")
+
+        manager.setup = setup
+        manager.teardown = teardown
+        return manager
+
+    db_manager = create_manager("db", [])
+    cache_manager = create_manager("cache", [])
+    api_manager = create_manager("api", [db_manager, cache_manager])
+
+    runner = Runner(
+        managers=[
+            api_manager,
+            db_manager,
+            cache_manager,
+        ],
+    )
+
+    runner.run()
+
+    # Independent managers are set up concurrently, dependents only after their dependencies.
+    assert events == [
+        "db.setup.start",
+        "cache.setup.start",
+        "db.setup.end",
+        "cache.setup.end",
+        "api.setup.start",
+        "api.setup.end",
+        "api.teardown",
+        "cache.teardown",
+        "db.teardown",
+    ]
+
+
+def test_run_with_setup_timeout() -> None:
+    manager1 = AsyncMock(Manager)
+    manager2 = AsyncMock(Manager)
+
+    async def setup_slowly() -> None:
+        await asyncio.sleep(1)
+
+    manager2.setup = setup_slowly
+
+    runner = Runner(
+        managers=[
+            manager1,
+            manager2,
+        ],
+        setup_timeout=0.01,
+    )
+
+    with pytest.raises(ExceptionGroup) as exc_info:
+        runner.run()
+
+    assert exc_info.value.subgroup(TimeoutError) is not None
+    manager1.run.assert_not_called()
+    manager1.teardown.assert_called()
+    manager2.teardown.assert_called()
+
+
+def test_run_with_circular_dependencies() -> None:
+    manager1 = AsyncMock(Manager)
+    manager2 = AsyncMock(Manager)
+    manager1.depends_on = [manager2]
+    manager2.depends_on = [manager1]
+
+    runner = Runner(
+        managers=[
+            manager1,
+            manager2,
+        ],
+    )
+
+    with pytest.raises(ValueError, match="circular"):
+        runner.run()
+
+    manager1.setup.assert_not_called()
+
+
+def test_run_with_missing_uvloop(monkeypatch: pytest.MonkeyPatch) -> None:
+    # Import of a module set to `None` in `sys.modules` fails, whether it's installed or not.
+    monkeypatch.setitem(sys.modules, "uvloop", None)
+    manager = AsyncMock(Manager)
+
+    runner = Runner(
+        managers=[manager],
+        event_loop="uvloop",
+    )
+
+    with pytest.raises(ImportError, match="`uvloop` extra"):
+        runner.run()
+
+    manager.setup.assert_not_called()
@@ -0,0 +1,81 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+from unittest.mock import AsyncMock
+
+import pytest
+
+from python_webapp.config import Config
+from python_webapp.container import AppRootContainer
+from python_webapp.core.di import singleton
+from python_webapp.managers.sqlalchemy_manager import SQLAlchemyManager
+from python_webapp.startup_profiler import StartupProfiler
+
+
+def test_startup_profiler(tmp_path: Path) -> None:
+    sqlalchemy_manager_mock = AsyncMock(SQLAlchemyManager)
+
+    class TestRootContainer(AppRootContainer):
+        @singleton
+        def config(self) -> Config:
+            return Config(api_uds=str(tmp_path / "api.sock"), api_access_log=False)
+
+        @singleton
+        def sqlalchemy_manager(self) -> SQLAlchemyManager:
+            return sqlalchemy_manager_mock
+
+    startup_profiler = StartupProfiler(container_factory=TestRootContainer)
+
+    phases = startup_profiler.run()
+
+    assert [phase for phase, _ in phases] == [
+        "import",
+        "container build",
+        "setup",
+        "- EventLoopMonitorManager.setup",
+        "- AsyncMock.setup",
+        "- FastAPIManager.setup",
+        "- PeriodicTaskManager.setup",
+        "first request",
+        "total",
+    ]
+    assert all(duration >= 0 for _, duration in phases)
+    durations = dict(phases)
+    # Managers are set up concurrently, so the setup phase takes as long as the slowest chain.
+    assert durations["setup"] >= durations["- FastAPIManager.setup"]
+    assert durations["total"] == pytest.approx(
+        durations["import"]
+        + durations["container build"]
+        + durations["setup"]
+        + durations["first request"],
+    )
+    sqlalchemy_manager_mock.setup.assert_awaited_once()
+    sqlalchemy_manager_mock.teardown.assert_awaited_once()
+
+
+def test_app_modules_cover_lazy_imports() -> None:
+    # Run in a fresh interpreter, as this one has imported most modules already.
+    script = (
+        "import importlib, sys\n"
+        "from python_webapp.startup_profiler import APP_MODULES\n"
+        "from python_webapp.container import AppRootContainer\n"
+        "for module in APP_MODULES:\n"
+        "    importlib.import_module(module)\n"
+        "imported = set(sys.modules)\n"
+        "container = AppRootContainer()\n"
+        "container.runner()\n"
+        "container.system_services()\n"
+        "container.user_management_services()\n"
+        "print(*sorted(set(sys.modules) - imported))\n"
+    )
+
+    output = subprocess.run(
+        [sys.executable, "-c", script],
+        capture_output=True,
+        check=True,
+        text=True,
+        env={**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)},
+    ).stdout
+
+    assert [module for module in output.split() if module.startswith("python_webapp.")] == []
@@ -0,0 +1,107 @@
+import os
+import socket
+import threading
+import time
+from functools import partial
+from pathlib import Path
+
+import pytest
+
+from python_webapp.supervisor import Supervisor
+
+
+def _exiting_worker(log_path: Path, sockets: list[socket.socket]) -> None:
+    with log_path.open("a") as f:
+        f.write(f"{sockets[0].getsockname()[1]}\n")
+
+
+def _metrics_dir_worker(log_path: Path, _sockets: list[socket.socket]) -> None:
+    metrics_multiprocess_dir = os.environ["PYTHON_WEBAPP_METRICS_MULTIPROCESS_DIR"]
+    log_path.write_text(f"{metrics_multiprocess_dir} {Path(metrics_multiprocess_dir).is_dir()}")
+    time.sleep(60)
+
+
+def _sleeping_worker(_sockets: list[socket.socket]) -> None:
+    time.sleep(60)
+
+
+def test_run_restarts_exited_workers(tmp_path: Path) -> None:
+    log_path = tmp_path / "workers.log"
+    supervisor = Supervisor(
+        worker_target=partial(_exiting_worker, log_path),
+        worker_count=2,
+        host="127.0.0.1",
+        port=0,
+        check_interval=0.1,
+        # Exits aren't early, so workers are restarted right away.
+        min_uptime=0,
+    )
+
+    threading.Timer(3, supervisor.stop).start()
+    supervisor.run()
+
+    ports = log_path.read_text().split()
+    assert len(ports) > supervisor.worker_count
+    assert len(set(ports)) == 1
+
+
+def test_run_gives_up_on_workers_exiting_early(tmp_path: Path) -> None:
+    log_path = tmp_path / "workers.log"
+    supervisor = Supervisor(
+        worker_target=partial(_exiting_worker, log_path),
+        worker_count=1,
+        host="127.0.0.1",
+        port=0,
+        check_interval=0.05,
+        min_uptime=60,
+        restart_backoff=0.1,
+        max_early_exits=3,
+    )
+
+    stop_timer = threading.Timer(30, supervisor.stop)
+    stop_timer.start()
+    started_at = time.monotonic()
+    with pytest.raises(RuntimeError, match="3 times in a row"):
+        supervisor.run()
+    stop_timer.cancel()
+
+    assert len(log_path.read_text().split()) == supervisor.max_early_exits
+    # Restarts are delayed by `restart_backoff` and then twice as much.
+    assert time.monotonic() - started_at >= supervisor.restart_backoff * 3
+
+
+def test_run_stops_workers() -> None:
+    supervisor = Supervisor(
+        worker_target=_sleeping_worker,
+        worker_count=2,
+        host="127.0.0.1",
+        port=0,
+        graceful_timeout=5,
+        check_interval=0.1,
+    )
+
+    threading.Timer(1, supervisor.stop).start()
+    started_at = time.monotonic()
+    supervisor.run()
+
+    assert time.monotonic() - started_at < supervisor.graceful_timeout
+
+
+def test_run_exports_temporary_metrics_dir(tmp_path: Path) -> None:
+    log_path = tmp_path / "workers.log"
+    supervisor = Supervisor(
+        worker_target=partial(_metrics_dir_worker, log_path),
+        worker_count=1,
+        host="127.0.0.1",
+        port=0,
+        check_interval=0.1,
+    )
+
+    threading.Timer(2, supervisor.stop).start()
+    supervisor.run()
+
+    metrics_multiprocess_dir, is_dir = log_path.read_text().split()
+    assert is_dir == "True"
+    # Temporary directory is removed with the run, and isn't left in environment of supervisor.
+    assert not Path(metrics_multiprocess_dir).exists()
+    assert "PYTHON_WEBAPP_METRICS_MULTIPROCESS_DIR" not in os.environ